@@ -1,11 +1,21 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlmodel import Session, select
-from typing import List, Dict, Any, Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 from datetime import date, timedelta, datetime
-from app.core.database import get_session
-from app.services.ai_service import AIService
+from app.core.config import settings
+from app.core.database import get_async_session
+from app.services.ai_cache import ai_response_cache
+from app.services.ai_context_builder import (
+    goal_briefs,
+    progress_briefs,
+    recent_completions,
+    task_briefs,
+    task_completion_rate,
+)
+from app.services.ai_service import AIService, capture_fallbacks, get_ai_service
 from app.models.user import User
-from app.models.goal import Goal
 from app.models.task import Task
 from app.schemas.user import PhaseEnum
 from app.schemas.goal import StatusEnum, GoalTypeEnum
@@ -52,8 +62,23 @@ class CareerTransitionRequest(BaseModel):
 class GoalsAnalysisRequest(BaseModel):
     user_id: str
 
-# Lazy creation in endpoints to avoid module import failures when GEMINI_API_KEY is missing
-ai_service = None
+
+async def _run_agent(name: str, call: Awaitable[Any], timeout: float) -> Tuple[str, Any, Optional[str]]:
+    """Await one agent call, returning ``(name, result, error)`` instead of raising.
+
+    ``result`` is None when the agent raised or timed out. An agent that
+    answered with its canned fallback keeps that result and also gets an error.
+    """
+    with capture_fallbacks() as fallbacks:
+        try:
+            result = await asyncio.wait_for(call, timeout=timeout)
+        except asyncio.TimeoutError:
+            return name, None, f"Timed out after {timeout:g}s"
+        except Exception as e:
+            return name, None, str(e) or e.__class__.__name__
+    return name, result, f"Fallback answer: {fallbacks[-1]}" if fallbacks else None
+
+
 def _normalize_tasks(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     normalized: List[Dict[str, Any]] = []
     for t in tasks:
@@ -72,18 +97,27 @@ def _normalize_tasks(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return normalized
 
 
+@router.get("/cache/stats", response_model=Dict[str, Any])
+def get_ai_cache_stats():
+    """Hit/miss counters and occupancy of the agent response cache."""
+    return ai_response_cache.stats()
+
+
 @router.post("/daily-tasks", response_model=List[Dict[str, Any]])
-async def generate_daily_tasks_endpoint(request: DailyTasksRequest, session: Session = Depends(get_session)):
-    user = session.get(User, request.user_id)
+async def generate_daily_tasks_endpoint(
+    request: DailyTasksRequest,
+    session: AsyncSession = Depends(get_async_session),
+    service: AIService = Depends(get_ai_service),
+):
+    user = await session.get(User, request.user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
     # gather goals and recent progress
-    goals = session.exec(select(Goal).where(Goal.user_id == request.user_id, Goal.status == StatusEnum.ACTIVE)).all()
-    progress_logs = session.exec(select(ProgressLog).where(ProgressLog.user_id == request.user_id).order_by(ProgressLog.date.desc()).limit(7)).all()
+    goals = await goal_briefs(session, request.user_id, status=StatusEnum.ACTIVE)
+    progress_logs = await progress_briefs(session, request.user_id, limit=7)
 
     try:
-        service = AIService()
         tasks = await service.generate_daily_tasks(
             user=user,
             recent_progress=progress_logs,
@@ -91,9 +125,7 @@ async def generate_daily_tasks_endpoint(request: DailyTasksRequest, session: Ses
             today_energy_level=request.energy_level,
         )
     except Exception:
-        # Fallback using the service's own fallback by instantiating with a fake model-less service
-        temp_service = AIService
-        # Use the method's fallback by simulating an exception path
+        # Fall back to a generic plan when generation fails
         tasks = [
             {
                 "description": "Review and prioritize today's goals",
@@ -112,10 +144,14 @@ async def generate_daily_tasks_endpoint(request: DailyTasksRequest, session: Ses
     return _normalize_tasks(tasks)
 
 @router.post("/motivation", response_model=str)
-async def generate_motivation(request: MotivationRequest, session: Session = Depends(get_session)):
+async def generate_motivation(
+    request: MotivationRequest,
+    session: AsyncSession = Depends(get_async_session),
+    service: AIService = Depends(get_ai_service),
+):
     """Generate AI-powered motivation message for a user."""
     # Verify user exists
-    user = session.get(User, request.user_id)
+    user = await session.get(User, request.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -124,9 +160,9 @@ async def generate_motivation(request: MotivationRequest, session: Session = Dep
     
     try:
         # Get AI context
-        ai_context = session.exec(
+        ai_context = (await session.exec(
             select(AIContext).where(AIContext.user_id == request.user_id)
-        ).first()
+        )).first()
         
         if not ai_context:
             # Create default AI context if none exists
@@ -136,23 +172,13 @@ async def generate_motivation(request: MotivationRequest, session: Session = Dep
                 motivation_triggers="Achievement, Progress, Recognition"
             )
         
-        # Get recent completed tasks (last 7 days)
-        start_date = date.today() - timedelta(days=7)
-        recent_completions = session.exec(
-            select(Task).where(
-                Task.user_id == request.user_id,
-                Task.completion_status == "Completed"
-            )
-        ).all()
-        
-        # Generate motivation message using AI
-        service = AIService()
+        # Generate motivation message using AI, citing tasks completed in the last 7 days
         motivation = await service.generate_motivation_message(
             user=user,
             ai_context=ai_context,
             current_challenge=request.current_challenge,
             stress_level=request.stress_level,
-            recent_completions=recent_completions
+            recent_completions=await recent_completions(session, request.user_id)
         )
         
         return motivation
@@ -164,10 +190,14 @@ async def generate_motivation(request: MotivationRequest, session: Session = Dep
         )
 
 @router.post("/deadline-reminder", response_model=str)
-async def generate_deadline_reminder(request: DeadlineReminderRequest, session: Session = Depends(get_session)):
+async def generate_deadline_reminder(
+    request: DeadlineReminderRequest,
+    session: AsyncSession = Depends(get_async_session),
+    service: AIService = Depends(get_ai_service),
+):
     """Generate AI-powered deadline reminder for a task."""
     # Get task
-    task = session.get(Task, request.task_id)
+    task = await session.get(Task, request.task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -182,24 +212,18 @@ async def generate_deadline_reminder(request: DeadlineReminderRequest, session:
             time_remaining = "No deadline set"
         
         # Get user's completion rate
-        user_tasks = session.exec(
-            select(Task).where(Task.user_id == task.user_id)
-        ).all()
-        
-        completed_tasks = [t for t in user_tasks if t.completion_status == "Completed"]
-        completion_rate = len(completed_tasks) / len(user_tasks) if user_tasks else 0.0
+        completion_rate = await task_completion_rate(session, task.user_id)
         
         # Get user's stress level from recent progress
-        recent_progress = session.exec(
+        recent_progress = (await session.exec(
             select(ProgressLog).where(
                 ProgressLog.user_id == task.user_id
             ).order_by(ProgressLog.date.desc()).limit(1)
-        ).first()
+        )).first()
         
         stress_level = recent_progress.mood_score if recent_progress else 5
         
         # Generate deadline reminder using AI
-        service = AIService()
         reminder = await service.generate_deadline_reminder(
             task=task,
             time_remaining=time_remaining,
@@ -217,10 +241,14 @@ async def generate_deadline_reminder(request: DeadlineReminderRequest, session:
         )
 
 @router.post("/weekly-analysis", response_model=Dict[str, Any])
-async def generate_weekly_analysis(request: WeeklyAnalysisRequest, session: Session = Depends(get_session)):
+async def generate_weekly_analysis(
+    request: WeeklyAnalysisRequest,
+    session: AsyncSession = Depends(get_async_session),
+    service: AIService = Depends(get_ai_service),
+):
     """Generate AI-powered weekly analysis for a user."""
     # Verify user exists
-    user = session.get(User, request.user_id)
+    user = await session.get(User, request.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -228,27 +256,13 @@ async def generate_weekly_analysis(request: WeeklyAnalysisRequest, session: Sess
         )
     
     try:
-        # Get progress logs for the specified weeks
+        # Get progress logs, goals and tasks for the specified weeks
         start_date = date.today() - timedelta(weeks=request.weeks)
-        progress_logs = session.exec(
-            select(ProgressLog).where(
-                ProgressLog.user_id == request.user_id,
-                ProgressLog.date >= start_date
-            ).order_by(ProgressLog.date.desc())
-        ).all()
-        
-        # Get goals for the period
-        goals = session.exec(
-            select(Goal).where(Goal.user_id == request.user_id)
-        ).all()
-        
-        # Get tasks for the period
-        tasks = session.exec(
-            select(Task).where(Task.user_id == request.user_id)
-        ).all()
+        progress_logs = await progress_briefs(session, request.user_id, start_date)
+        goals = await goal_briefs(session, request.user_id)
+        tasks = await task_briefs(session, request.user_id, start_date)
         
         # Generate weekly analysis using AI
-        service = AIService()
         analysis = await service.generate_weekly_analysis(
             progress_logs=progress_logs,
             goals=goals,
@@ -264,10 +278,14 @@ async def generate_weekly_analysis(request: WeeklyAnalysisRequest, session: Sess
         )
 
 @router.post("/phase-transition", response_model=Dict[str, Any])
-async def evaluate_phase_transition(request: PhaseTransitionRequest, session: Session = Depends(get_session)):
+async def evaluate_phase_transition(
+    request: PhaseTransitionRequest,
+    session: AsyncSession = Depends(get_async_session),
+    service: AIService = Depends(get_ai_service),
+):
     """Evaluate phase transition readiness for a user."""
     # Verify user exists
-    user = session.get(User, request.user_id)
+    user = await session.get(User, request.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -276,16 +294,13 @@ async def evaluate_phase_transition(request: PhaseTransitionRequest, session: Se
     
     try:
         # Get user goals
-        goals = session.exec(
-            select(Goal).where(Goal.user_id == request.user_id)
-        ).all()
+        goals = await goal_briefs(session, request.user_id)
         
         # Calculate time in current phase (simplified - assuming user creation date)
         # In a real app, you'd track phase transition dates
         time_in_phase_days = 30  # Default placeholder
         
         # Generate phase transition evaluation using AI
-        service = AIService()
         evaluation = await service.evaluate_phase_transition(
             user=user,
             goals=goals,
@@ -301,10 +316,14 @@ async def evaluate_phase_transition(request: PhaseTransitionRequest, session: Se
         )
 
 @router.post("/analyze-goals", response_model=Dict[str, Any])
-async def analyze_goals(request: GoalsAnalysisRequest, session: Session = Depends(get_session)):
+async def analyze_goals(
+    request: GoalsAnalysisRequest,
+    session: AsyncSession = Depends(get_async_session),
+    service: AIService = Depends(get_ai_service),
+):
     """Analyze goals progress and provide strategic insights."""
     # Verify user exists
-    user = session.get(User, request.user_id)
+    user = await session.get(User, request.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -313,20 +332,12 @@ async def analyze_goals(request: GoalsAnalysisRequest, session: Session = Depend
     
     try:
         # Get goals
-        goals = session.exec(
-            select(Goal).where(Goal.user_id == request.user_id)
-        ).all()
+        goals = await goal_briefs(session, request.user_id)
         
-        # Get progress logs for trend analysis
-        progress_logs = session.exec(
-            select(ProgressLog).where(
-                ProgressLog.user_id == request.user_id,
-                ProgressLog.date >= date.today() - timedelta(days=14)  # Last 2 weeks
-            ).order_by(ProgressLog.date.desc())
-        ).all()
+        # Get progress logs for trend analysis (last 2 weeks)
+        progress_logs = await progress_briefs(session, request.user_id, date.today() - timedelta(days=14))
         
         # Generate goals analysis using AI
-        service = AIService()
         analysis = await service.analyze_goals(
             goals=goals,
             progress_logs=progress_logs
@@ -341,10 +352,14 @@ async def analyze_goals(request: GoalsAnalysisRequest, session: Session = Depend
         )
 
 @router.post("/career-transition", response_model=Dict[str, Any])
-async def analyze_career_transition(request: CareerTransitionRequest, session: Session = Depends(get_session)):
+async def analyze_career_transition(
+    request: CareerTransitionRequest,
+    session: AsyncSession = Depends(get_async_session),
+    service: AIService = Depends(get_ai_service),
+):
     """Analyze career transition readiness for a user."""
     # Verify user exists
-    user = session.get(User, request.user_id)
+    user = await session.get(User, request.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -353,9 +368,9 @@ async def analyze_career_transition(request: CareerTransitionRequest, session: S
     
     try:
         # Get job metrics
-        job_metrics = session.exec(
+        job_metrics = (await session.exec(
             select(JobMetrics).where(JobMetrics.user_id == request.user_id)
-        ).first()
+        )).first()
         
         if not job_metrics:
             raise HTTPException(
@@ -364,7 +379,6 @@ async def analyze_career_transition(request: CareerTransitionRequest, session: S
             )
         
         # Generate career transition analysis using AI
-        service = AIService()
         analysis = await service.analyze_career_transition_readiness(
             user=user,
             job_metrics=job_metrics
@@ -380,10 +394,14 @@ async def analyze_career_transition(request: CareerTransitionRequest, session: S
 
 
 @router.post("/user/{user_id}/complete-analysis", response_model=Dict[str, Any])
-async def generate_complete_user_analysis(user_id: str, session: Session = Depends(get_session)):
+async def generate_complete_user_analysis(
+    user_id: str,
+    session: AsyncSession = Depends(get_async_session),
+    service: AIService = Depends(get_ai_service),
+):
     """Generate a complete AI analysis for a user combining all agents."""
     # Verify user exists
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -391,29 +409,19 @@ async def generate_complete_user_analysis(user_id: str, session: Session = Depen
         )
     
     try:
-        # Gather all user data
-        recent_progress = session.exec(
-            select(ProgressLog).where(
-                ProgressLog.user_id == user_id,
-                ProgressLog.date >= date.today() - timedelta(days=7)
-            )
-        ).all()
+        # Gather the last week of user data, oldest progress log first
+        week_start = date.today() - timedelta(days=7)
+        recent_progress = (await progress_briefs(session, user_id, week_start))[::-1]
+        goals = await goal_briefs(session, user_id)
+        tasks = await task_briefs(session, user_id, week_start)
         
-        goals = session.exec(
-            select(Goal).where(Goal.user_id == user_id)
-        ).all()
-        
-        tasks = session.exec(
-            select(Task).where(Task.user_id == user_id)
-        ).all()
-        
-        ai_context = session.exec(
+        ai_context = (await session.exec(
             select(AIContext).where(AIContext.user_id == user_id)
-        ).first()
+        )).first()
         
-        job_metrics = session.exec(
+        job_metrics = (await session.exec(
             select(JobMetrics).where(JobMetrics.user_id == user_id)
-        ).first()
+        )).first()
         
         # Generate comprehensive analysis
         analysis = {
@@ -422,52 +430,56 @@ async def generate_complete_user_analysis(user_id: str, session: Session = Depen
             "summary": "Complete AI-powered user analysis"
         }
         
-        # Add individual agent outputs if data is available
+        # Queue individual agents if data is available; they are independent, so run them together
+        agents: Dict[str, Awaitable[Any]] = {}
         if recent_progress and goals:
-            service = AIService()
-            daily_tasks = await service.generate_daily_tasks(
+            agents["recommended_daily_tasks"] = service.generate_daily_tasks(
                 user=user,
                 recent_progress=recent_progress,
                 pending_goals=[g for g in goals if g.status == StatusEnum.ACTIVE],
                 today_energy_level=7
             )
-            analysis["recommended_daily_tasks"] = daily_tasks
         
         if ai_context:
-            service = AIService()
-            motivation = await service.generate_motivation_message(
+            agents["motivation_message"] = service.generate_motivation_message(
                 user=user,
                 ai_context=ai_context,
                 current_challenge="Daily productivity optimization",
                 stress_level=5,
                 recent_completions=[t for t in tasks if t.completion_status == CompletionStatusEnum.COMPLETED]
             )
-            analysis["motivation_message"] = motivation
         
         if recent_progress and goals and tasks:
-            service = AIService()
-            weekly_analysis = await service.generate_weekly_analysis(
+            agents["weekly_insights"] = service.generate_weekly_analysis(
                 progress_logs=recent_progress,
                 goals=goals,
                 tasks=tasks
             )
-            analysis["weekly_insights"] = weekly_analysis
         
-        service = AIService()
-        phase_evaluation = await service.evaluate_phase_transition(
+        agents["phase_transition_readiness"] = service.evaluate_phase_transition(
             user=user,
             goals=goals,
             time_in_phase_days=30
         )
-        analysis["phase_transition_readiness"] = phase_evaluation
         
         if job_metrics:
-            service = AIService()
-            career_analysis = await service.analyze_career_transition_readiness(
+            agents["career_transition_analysis"] = service.analyze_career_transition_readiness(
                 user=user,
                 job_metrics=job_metrics
             )
-            analysis["career_transition_analysis"] = career_analysis
+        
+        results = await asyncio.gather(
+            *(_run_agent(name, call, settings.AI_AGENT_TIMEOUT_SECONDS) for name, call in agents.items())
+        )
+        
+        # Keep whatever answered, fallbacks included; report failures instead of failing the whole analysis
+        failed_agents: List[Dict[str, str]] = []
+        for name, result, error in results:
+            if result is not None:
+                analysis[name] = result
+            if error is not None:
+                failed_agents.append({"agent": name, "error": error})
+        analysis["failed_agents"] = failed_agents
         
         return analysis
         
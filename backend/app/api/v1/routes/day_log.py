@@ -1,17 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlmodel import Session, select
-from typing import List
+from typing import AsyncIterator, List, Optional
 from datetime import date, datetime, timedelta
 
 from app.core.database import get_session
-from app.services.day_log_service import create_day_log, create_bulk_day_logs
-from app.services.ai_service import AIService
+from app.services.day_log_service import (
+    DAY_LOG_IMPORT_MODES,
+    DAY_LOG_INSERT_CHUNK_SIZE,
+    DAY_LOG_PAGE_KEYS,
+    DayLogImport,
+    create_day_log,
+    create_bulk_day_logs,
+    list_user_day_logs,
+    user_day_log_stats,
+)
+from app.services.export_service import EXPORT_FORMAT_PATTERN, export_headers, export_media_type, stream_export
+from app.services.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, next_cursor
+from app.services.ai_service import AIService, get_ai_service
 from app.models.day_log import DayLog
 from app.models.user import User
-from app.schemas.day_log import DayLogCreate, DayLogResponse, DayLogUpdate, DayLogBulkCreate
+from app.schemas.day_log import DayLogBase, DayLogCreate, DayLogResponse, DayLogUpdate, DayLogBulkCreate
 
 router = APIRouter()
-ai_service = AIService()
+
+IMPORT_MODE_PATTERN = "^(" + "|".join(DAY_LOG_IMPORT_MODES) + ")$"
 
 
 @router.post("/", response_model=DayLogResponse, status_code=status.HTTP_201_CREATED)
@@ -35,6 +51,13 @@ def create_day_log_endpoint(
             detail="End time must be after start time"
         )
 
+    # One day log per user per day
+    existing = session.exec(
+        select(DayLog).where(DayLog.user_id == day_log.user_id, DayLog.date == day_log.date)
+    ).first()
+    if existing:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Day log already exists for this date")
+
     db_day_log = DayLog.model_validate(day_log)
     session.add(db_day_log)
     session.commit()
@@ -61,13 +84,15 @@ def get_day_log(
 @router.get("/user/{user_id}", response_model=List[DayLogResponse])
 def get_user_day_logs(
     user_id: str,
+    response: Response,
     skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100),
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; takes precedence over skip"),
     location: str = None,
     weather: str = None,
     session: Session = Depends(get_session)
 ):
-    """Get all day logs for a specific user with optional filtering."""
+    """Get a user's day logs, newest first, with optional filtering."""
     # Verify user exists
     user = session.get(User, user_id)
     if not user:
@@ -76,16 +101,35 @@ def get_user_day_logs(
             detail="User not found"
         )
 
-    query = select(DayLog).where(DayLog.user_id == user_id)
+    try:
+        day_logs = list_user_day_logs(
+            session, user_id, skip=skip, limit=limit, location=location, weather=weather, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    token = next_cursor(day_logs, DAY_LOG_PAGE_KEYS, limit)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return day_logs
 
-    if location:
-        query = query.where(DayLog.location == location)
-    if weather:
-        query = query.where(DayLog.weather == weather)
 
-    query = query.offset(skip).limit(limit)
-    day_logs = session.exec(query).all()
-    return day_logs
+@router.get("/user/{user_id}/export")
+def export_user_day_logs(
+    user_id: str,
+    fmt: str = Query("ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN, description="ndjson or csv"),
+    gzip: bool = Query(False, description="Gzip the export"),
+    session: Session = Depends(get_session)
+):
+    """Stream all of a user's day logs, oldest first, as NDJSON or CSV."""
+    user = session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    return StreamingResponse(
+        stream_export(session, "day-logs", user_id, fmt, gzip),
+        media_type=export_media_type(fmt, gzip),
+        headers=export_headers("day-logs", user_id, fmt, gzip),
+    )
 
 
 @router.get("/user/{user_id}/date/{date}", response_model=DayLogResponse)
@@ -155,9 +199,11 @@ def get_user_day_logs_by_date_range(
 @router.get("/user/{user_id}/stats")
 def get_user_day_log_stats(
     user_id: str,
+    start_date: date | None = None,
+    end_date: date | None = None,
     session: Session = Depends(get_session)
 ):
-    """Get statistics about user's day logs."""
+    """Get statistics about user's day logs, optionally limited to a date range."""
     # Verify user exists
     user = session.get(User, user_id)
     if not user:
@@ -166,41 +212,14 @@ def get_user_day_log_stats(
             detail="User not found"
         )
 
-    day_logs = session.exec(
-        select(DayLog).where(DayLog.user_id == user_id)
-    ).all()
-
-    if not day_logs:
-        return {
-            "total_logs": 0,
-            "average_duration": 0,
-            "locations_summary": {},
-            "weather_summary": {}
-        }
-
-    # Calculate statistics
-    total_duration = 0
-    locations = {}
-    weather = {}
-    count_with_duration = 0
-
-    for log in day_logs:
-        if log.end_time and log.start_time:
-            duration = (log.end_time - log.start_time).total_seconds() / 3600  # hours
-            total_duration += duration
-            count_with_duration += 1
-
-        if log.location:
-            locations[log.location] = locations.get(log.location, 0) + 1
-        if log.weather:
-            weather[log.weather] = weather.get(log.weather, 0) + 1
-
-    return {
-        "total_logs": len(day_logs),
-        "average_duration": total_duration / count_with_duration if count_with_duration > 0 else 0,
-        "locations_summary": locations,
-        "weather_summary": weather
-    }
+    # Validate date range
+    if start_date and end_date and end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="End date must be after start date"
+        )
+
+    return user_day_log_stats(session, user_id, start_date=start_date, end_date=end_date)
 
 
 @router.patch("/{log_id}", response_model=DayLogResponse)
@@ -228,6 +247,14 @@ def update_day_log_endpoint(
                 detail="End time must be after start time"
             )
 
+    # Moving the log onto a day that already has one would break the one-per-day rule
+    if "date" in update_data and update_data["date"] != db_day_log.date:
+        clash = session.exec(
+            select(DayLog).where(DayLog.user_id == db_day_log.user_id, DayLog.date == update_data["date"])
+        ).first()
+        if clash:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Day log already exists for this date")
+
     for key, value in update_data.items():
         setattr(db_day_log, key, value)
 
@@ -258,9 +285,10 @@ def delete_day_log_endpoint(
 @router.post("/bulk", response_model=List[DayLogResponse], status_code=status.HTTP_201_CREATED)
 def create_bulk_day_logs_endpoint(
     bulk_data: DayLogBulkCreate,
+    mode: str = Query("error", pattern=IMPORT_MODE_PATTERN, description="Existing dates: error, skip or upsert"),
     session: Session = Depends(get_session)
 ):
-    """Create multiple day log entries for a user."""
+    """Create multiple day log entries for a user; ``mode=upsert`` overwrites logs for existing dates."""
     # Verify user exists
     user = session.get(User, bulk_data.user_id)
     if not user:
@@ -278,7 +306,7 @@ def create_bulk_day_logs_endpoint(
             )
 
     try:
-        db_logs = create_bulk_day_logs(session, bulk_data.user_id, bulk_data.day_logs)
+        db_logs = create_bulk_day_logs(session, bulk_data.user_id, bulk_data.day_logs, mode)
         return db_logs
     except ValueError as e:
         raise HTTPException(
@@ -287,11 +315,79 @@ def create_bulk_day_logs_endpoint(
         )
 
 
+async def _ndjson_day_logs(request: Request) -> AsyncIterator[List[DayLogBase]]:
+    """Parse an NDJSON body into chunks of day logs as it arrives."""
+    chunk: List[DayLogBase] = []
+    buffer = b""
+    line_number = 0
+
+    def parse(line: bytes) -> Optional[DayLogBase]:
+        if not line.strip():
+            return None
+        try:
+            return DayLogBase.model_validate(json.loads(line))
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Line {line_number}: {str(e)}"
+            )
+
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            log_data = parse(line)
+            if log_data is not None:
+                chunk.append(log_data)
+            if len(chunk) >= DAY_LOG_INSERT_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+    line_number += 1
+    log_data = parse(buffer)
+    if log_data is not None:
+        chunk.append(log_data)
+    if chunk:
+        yield chunk
+
+
+@router.post("/import/{user_id}")
+async def import_day_logs_endpoint(
+    user_id: str,
+    request: Request,
+    mode: str = Query("error", pattern=IMPORT_MODE_PATTERN, description="Existing dates: error, skip or upsert"),
+    session: Session = Depends(get_session)
+):
+    """
+    Import day logs streamed as NDJSON (one day log object per line).
+
+    The body is read and written in chunks, so a year of history is imported
+    in one pass without holding it in memory. The import is all or nothing.
+    Returns the received, created, updated and skipped counts.
+    """
+    user = await run_in_threadpool(session.get, User, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    day_log_import = await run_in_threadpool(DayLogImport, session, user_id, mode)
+    try:
+        async for chunk in _ndjson_day_logs(request):
+            await run_in_threadpool(day_log_import.write, chunk)
+        return await run_in_threadpool(day_log_import.finish)
+    except ValueError as e:
+        await run_in_threadpool(day_log_import.abort)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except BaseException:
+        await run_in_threadpool(day_log_import.abort)
+        raise
+
+
 @router.post("/generate/{user_id}", response_model=DayLogResponse, status_code=status.HTTP_201_CREATED)
 async def generate_day_log(
     user_id: str,
     date_value: date | None = None,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    ai_service: AIService = Depends(get_ai_service),
 ):
     """
     Generate a DayLog using AI for the given user and optional date (defaults to today).
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
 from sqlmodel import Session, select
 from typing import List, Optional
 from app.core.database import get_session
 from app.models.goal import Goal
 from app.models.user import User
 from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse, StatusEnum, GoalTypeEnum
+from app.services import goal_service
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, next_cursor
 
 router = APIRouter()
 
@@ -27,17 +29,21 @@ def create_goal(goal: GoalCreate, session: Session = Depends(get_session)):
 
 @router.get("/", response_model=List[GoalResponse])
 def read_goals(
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; takes precedence over skip"),
     user_id: Optional[str] = None,
     session: Session = Depends(get_session)
 ):
     """Get all goals with optional user filtering."""
-    statement = select(Goal)
-    if user_id:
-        statement = statement.where(Goal.user_id == user_id)
-    statement = statement.offset(skip).limit(limit)
-    goals = session.exec(statement).all()
+    try:
+        goals = goal_service.list_goals(session, skip=skip, limit=limit, user_id=user_id, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    token = next_cursor(goals, goal_service.GOAL_PAGE_KEYS, limit)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
     return goals
 
 @router.get("/{goal_id}", response_model=GoalResponse)
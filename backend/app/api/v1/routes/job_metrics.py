@@ -8,7 +8,7 @@ from app.models.job_metrics import JobMetrics
 from app.schemas.job_metrics import JobMetricsCreate, JobMetricsUpdate, JobMetricsResponse
 from app.models.user import User
 from app.services.job_metrics_service import analyze_job_metrics_with_ai, AIServiceError
-from app.services.ai_service import AIService
+from app.services.ai_service import AIService, get_ai_service
 
 router = APIRouter()
 
@@ -134,7 +134,11 @@ def get_user_job_metrics(user_id: str, session: Session = Depends(get_session)):
 
 
 @router.post("/user/{user_id}/generate", response_model=JobMetricsResponse, status_code=status.HTTP_201_CREATED)
-async def generate_job_metrics_for_user(user_id: str, session: Session = Depends(get_session)):
+async def generate_job_metrics_for_user(
+    user_id: str,
+    session: Session = Depends(get_session),
+    service: AIService = Depends(get_ai_service),
+):
     """
     Generate initial JobMetrics for a user using AI when none exist.
     """
@@ -146,7 +150,6 @@ async def generate_job_metrics_for_user(user_id: str, session: Session = Depends
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job metrics already exist for this user")
 
-    service = AIService()
     data = await service.generate_job_metrics_for_user(session=session, user_id=user_id)
 
     # Required fields: stress_level, job_satisfaction
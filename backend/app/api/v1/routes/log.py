@@ -1,11 +1,12 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlmodel import Session
 
 from app.core.database import get_session
 from app.schemas.log import LogCreate, LogResponse
-from app.services.log_service import create_log, get_log, list_logs
+from app.services.log_service import LOG_PAGE_KEYS, create_log, get_log, list_logs
+from app.services.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, next_cursor
 
 
 router = APIRouter()
@@ -23,7 +24,20 @@ def get_log_endpoint(log_id: int, session: Session = Depends(get_session)):
 
 
 @router.get("/", response_model=List[LogResponse])
-def list_logs_endpoint(skip: int = 0, limit: int = 10, session: Session = Depends(get_session)):
-    return list_logs(session, skip=skip, limit=limit)
+def list_logs_endpoint(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    try:
+        logs = list_logs(session, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    token = next_cursor(logs, LOG_PAGE_KEYS, limit)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return logs
 
 
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import date, datetime, timedelta
@@ -10,7 +11,15 @@ from app.schemas.progress_log import (
     ProgressLogResponse,
 )
 from app.models.user import User
-from app.services.ai_service import AIService
+from app.services.ai_service import AIService, get_ai_service
+from app.services.export_service import EXPORT_FORMAT_PATTERN, export_headers, export_media_type, stream_export
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, next_cursor
+from app.services.progress_log_service import (
+    PROGRESS_LOG_PAGE_KEYS,
+    list_progress_logs,
+    user_progress_stats_windows,
+    user_progress_weekly,
+)
 
 router = APIRouter()
 
@@ -47,25 +56,31 @@ def create_progress_log(progress_log: ProgressLogCreate, session: Session = Depe
 
 @router.get("/", response_model=List[ProgressLogResponse])
 def read_progress_logs(
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; takes precedence over skip"),
     user_id: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     session: Session = Depends(get_session)
 ):
-    """Get all progress logs with optional filtering."""
-    statement = select(ProgressLog)
-    
-    if user_id:
-        statement = statement.where(ProgressLog.user_id == user_id)
-    if start_date:
-        statement = statement.where(ProgressLog.date >= start_date)
-    if end_date:
-        statement = statement.where(ProgressLog.date <= end_date)
-    
-    statement = statement.order_by(ProgressLog.date.desc()).offset(skip).limit(limit)
-    progress_logs = session.exec(statement).all()
+    """Get all progress logs with optional filtering, newest first."""
+    try:
+        progress_logs = list_progress_logs(
+            session,
+            skip=skip,
+            limit=limit,
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    token = next_cursor(progress_logs, PROGRESS_LOG_PAGE_KEYS, limit)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
     return progress_logs
 
 @router.get("/{log_id}", response_model=ProgressLogResponse)
@@ -129,6 +144,24 @@ def get_user_progress_logs(user_id: str, session: Session = Depends(get_session)
     progress_logs = session.exec(statement).all()
     return progress_logs
 
+@router.get("/user/{user_id}/export")
+def export_user_progress_logs(
+    user_id: str,
+    fmt: str = Query("ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN, description="ndjson or csv"),
+    gzip: bool = Query(False, description="Gzip the export"),
+    session: Session = Depends(get_session)
+):
+    """Stream all of a user's progress logs, oldest first, as NDJSON or CSV."""
+    user = session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    return StreamingResponse(
+        stream_export(session, "progress-logs", user_id, fmt, gzip),
+        media_type=export_media_type(fmt, gzip),
+        headers=export_headers("progress-logs", user_id, fmt, gzip),
+    )
+
 @router.get("/user/{user_id}/recent", response_model=List[ProgressLogResponse])
 def get_user_recent_progress_logs(user_id: str, days: int = 7, session: Session = Depends(get_session)):
     """Get recent progress logs for a specific user."""
@@ -149,7 +182,13 @@ def get_user_recent_progress_logs(user_id: str, days: int = 7, session: Session
     return progress_logs
 
 @router.get("/user/{user_id}/stats", response_model=dict)
-def get_user_progress_stats(user_id: str, days: int = 30, session: Session = Depends(get_session)):
+def get_user_progress_stats(
+    user_id: str,
+    days: int = Query(30, ge=0),
+    windows: Optional[List[int]] = Query(None, description="Extra trailing windows in days, e.g. windows=7&windows=90"),
+    weekly: bool = Query(False, description="Include a per-week breakdown of the widest window"),
+    session: Session = Depends(get_session),
+):
     """Get progress statistics for a user over a specified period."""
     # Verify user exists
     user = session.get(User, user_id)
@@ -158,49 +197,27 @@ def get_user_progress_stats(user_id: str, days: int = 30, session: Session = Dep
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    
-    start_date = date.today() - timedelta(days=days)
-    statement = select(ProgressLog).where(
-        ProgressLog.user_id == user_id,
-        ProgressLog.date >= start_date
-    )
-    progress_logs = session.exec(statement).all()
-    
-    if not progress_logs:
-        return {
-            "period_days": days,
-            "total_entries": 0,
-            "avg_tasks_completed": 0,
-            "avg_tasks_planned": 0,
-            "avg_mood_score": 0,
-            "avg_energy_level": 0,
-            "avg_focus_score": 0,
-            "completion_rate": 0
-        }
-    
-    total_entries = len(progress_logs)
-    total_completed = sum(log.tasks_completed for log in progress_logs)
-    total_planned = sum(log.tasks_planned for log in progress_logs)
-    total_mood = sum(log.mood_score for log in progress_logs)
-    total_energy = sum(log.energy_level for log in progress_logs)
-    total_focus = sum(log.focus_score for log in progress_logs)
-    
-    return {
-        "period_days": days,
-        "total_entries": total_entries,
-        "avg_tasks_completed": round(total_completed / total_entries, 2),
-        "avg_tasks_planned": round(total_planned / total_entries, 2),
-        "avg_mood_score": round(total_mood / total_entries, 2),
-        "avg_energy_level": round(total_energy / total_entries, 2),
-        "avg_focus_score": round(total_focus / total_entries, 2),
-        "completion_rate": round((total_completed / max(total_planned, 1)) * 100, 2)
-    }
+    if windows and min(windows) < 0:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Windows must not be negative"
+        )
+
+    requested = [days, *(windows or [])]
+    by_window = user_progress_stats_windows(session, user_id, requested)
+    result = dict(by_window[days])
+    if windows:
+        result["windows"] = {str(w): by_window[w] for w in sorted(by_window)}
+    if weekly:
+        result["weekly"] = user_progress_weekly(session, user_id, max(requested))
+    return result
 
 @router.post("/generate/{user_id}", response_model=ProgressLogResponse, status_code=status.HTTP_201_CREATED)
 async def generate_progress_log(
     user_id: str,
     date: Optional[date] = None,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    service: AIService = Depends(get_ai_service),
 ):
     """
     Generate a progress log entry using AI based on user's activities, tasks, and metrics.
@@ -233,7 +250,6 @@ async def generate_progress_log(
     
     # Generate progress log content using AI
     try:
-        service = AIService()
         progress_data = await service.generate_progress_log_content(
             session=session,
             user_id=user_id,
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from typing import Optional
 
-from app.core.database import get_session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import get_async_session
 from app.models.prompt import Prompt
 from app.schemas.prompt import PromptCreate, PromptResponse, PromptUpdate
-from app.services.prompt_service import PromptService
+from app.services.export_service import EXPORT_FORMAT_PATTERN, export_headers, export_media_type, stream_export_async
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, next_cursor
+from app.services.prompt_service import PROMPT_PAGE_KEYS, PromptService
 
 router = APIRouter()
 prompt_service = PromptService()
@@ -12,7 +17,7 @@ prompt_service = PromptService()
 @router.post("/", response_model=PromptResponse, status_code=status.HTTP_201_CREATED)
 async def create_prompt(
     prompt_data: PromptCreate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> Prompt:
     try:
         # First create the prompt
@@ -29,15 +34,40 @@ async def create_prompt(
 @router.get("/user/{user_id}", response_model=list[PromptResponse])
 async def get_user_prompts(
     user_id: str,
-    session: Session = Depends(get_session)
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; takes precedence over skip"),
+    session: AsyncSession = Depends(get_async_session)
 ) -> list[Prompt]:
-    """Get all prompts for a specific user"""
-    return await prompt_service.get_user_prompts(session, user_id)
+    """Get a page of prompts for a specific user, newest first"""
+    try:
+        prompts = await prompt_service.get_user_prompts(session, user_id, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    token = next_cursor(prompts, PROMPT_PAGE_KEYS, limit)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return prompts
+
+@router.get("/user/{user_id}/export")
+async def export_user_prompts(
+    user_id: str,
+    fmt: str = Query("ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN, description="ndjson or csv"),
+    gzip: bool = Query(False, description="Gzip the export"),
+    session: AsyncSession = Depends(get_async_session)
+) -> StreamingResponse:
+    """Stream all of a user's prompts, oldest first, as NDJSON or CSV."""
+    return StreamingResponse(
+        stream_export_async(session, "prompts", user_id, fmt, gzip),
+        media_type=export_media_type(fmt, gzip),
+        headers=export_headers("prompts", user_id, fmt, gzip),
+    )
 
 @router.get("/{prompt_id}", response_model=PromptResponse)
 async def get_prompt(
     prompt_id: str,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> Prompt:
     try:
         return await prompt_service.get_prompt(session, prompt_id)
@@ -51,7 +81,7 @@ async def get_prompt(
 async def update_prompt(
     prompt_id: str,
     prompt_update: PromptUpdate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> Prompt:
     try:
         return await prompt_service.update_prompt(session, prompt_id, prompt_update)
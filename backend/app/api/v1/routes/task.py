@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, Response, status, Query
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime, date
@@ -9,6 +10,8 @@ from app.models.goal import Goal
 from app.schemas import task as schemas
 from app.schemas.task import CompletionStatusEnum, BulkTaskCreate, TaskCreate, TaskUpdate, TaskDiscard, TaskRestore
 from app.services import task_service
+from app.services.export_service import EXPORT_FORMAT_PATTERN, export_headers, export_media_type, stream_export
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, next_cursor
 
 router = APIRouter()
 
@@ -46,8 +49,10 @@ def create_task(
 
 @router.get("/", response_model=List[schemas.TaskResponse])
 def read_tasks(
+    response: Response,
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; takes precedence over skip"),
     user_id: Optional[str] = None,
     goal_id: Optional[int] = None,
     completion_status: Optional[CompletionStatusEnum] = None,
@@ -63,8 +68,12 @@ def read_tasks(
             user_id=user_id,
             goal_id=goal_id,
             completion_status=completion_status,
-            include_discarded=include_discarded
+            include_discarded=include_discarded,
+            cursor=cursor,
         )
+        token = next_cursor(tasks, task_service.TASK_PAGE_KEYS, limit)
+        if token:
+            response.headers[NEXT_CURSOR_HEADER] = token
         return tasks
     except Exception as e:
         raise HTTPException(
@@ -265,6 +274,25 @@ def get_user_today_tasks(
         )
 
 
+@router.get("/user/{user_id}/export")
+def export_user_tasks(
+    user_id: str,
+    fmt: str = Query("ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN, description="ndjson or csv"),
+    gzip: bool = Query(False, description="Gzip the export"),
+    session: Session = Depends(get_session)
+):
+    """Stream all of a user's tasks, oldest first, as NDJSON or CSV."""
+    user = session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    return StreamingResponse(
+        stream_export(session, "tasks", user_id, fmt, gzip),
+        media_type=export_media_type(fmt, gzip),
+        headers=export_headers("tasks", user_id, fmt, gzip),
+    )
+
+
 @router.patch("/{task_id}/complete", response_model=schemas.TaskResponse)
 def complete_task(
     task_id: int,
@@ -286,40 +314,12 @@ def create_bulk_tasks(
     bulk_tasks: BulkTaskCreate,
     session: Session = Depends(get_session)
 ):
-    """Create multiple tasks in a single request."""
-    created_tasks = []
+    """Create multiple tasks in a single request (all or nothing)."""
     try:
-        # Create all tasks
-        for task_data in bulk_tasks.tasks:
-            # Verify user exists for each task
-            user = session.get(User, task_data.user_id)
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-            db_task = Task(
-                user_id=task_data.user_id,
-                description=task_data.description,
-                priority=task_data.priority,
-                ai_generated=False,
-                completion_status=task_data.completion_status,
-                estimated_duration=task_data.estimated_duration,
-                actual_duration=task_data.actual_duration,
-                energy_required=task_data.energy_required,
-                scheduled_for_date=task_data.scheduled_for_date,
-                scheduled_for_time=getattr(task_data, "scheduled_for_time", None),
-            )
-            session.add(db_task)
-            created_tasks.append(db_task)
-        
-        session.commit()
-        
-        # Refresh all tasks to get their IDs
-        for task in created_tasks:
-            session.refresh(task)
-        
-        return created_tasks
-        
+        return task_service.create_tasks_bulk(session, bulk_tasks.tasks)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
-        session.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
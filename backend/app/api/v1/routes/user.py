@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
 from sqlmodel import Session, select
 from typing import List, Optional
+from datetime import date
 from app.core.database import get_session
 from app.models.user import User
 from app.schemas import user as user_schemas
+from app.schemas.user_daily_rollup import UserDailyRollupResponse
+from app.services import user_service
+from app.services.rollup_service import list_user_rollups
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, next_cursor
 
 router = APIRouter()
 
@@ -35,10 +40,21 @@ def create_user(user: user_schemas.UserCreate, session: Session = Depends(get_se
     return db_user
 
 @router.get("/", response_model=List[user_schemas.UserResponse])
-def read_users(skip: int = 0, limit: int = 100, session: Session = Depends(get_session)):
+def read_users(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; takes precedence over skip"),
+    session: Session = Depends(get_session),
+):
     """Get all users with pagination."""
-    statement = select(User).offset(skip).limit(limit)
-    users = session.exec(statement).all()
+    try:
+        users = user_service.get_users(session, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    token = next_cursor(users, user_service.USER_PAGE_KEYS, limit)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
     return users
 
 @router.get("/{telegram_id}", response_model=user_schemas.UserResponse)
@@ -95,4 +111,18 @@ def get_user_profile(telegram_id: str, session: Session = Depends(get_session)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return user 
\ No newline at end of file
+    return user
+
+
+@router.get("/{telegram_id}/daily", response_model=List[UserDailyRollupResponse])
+def get_user_daily_rollups(
+    telegram_id: str,
+    start_date: Optional[date] = Query(None, description="First day to include"),
+    end_date: Optional[date] = Query(None, description="Last day to include"),
+    session: Session = Depends(get_session)
+):
+    """Per-day totals for a user (tasks, durations, mood and day-log length), oldest first."""
+    user = session.get(User, telegram_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return list_user_rollups(session, telegram_id, start_date=start_date, end_date=end_date)
@@ -1,19 +1,50 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends
+import asyncio
 import logging
 import json
-from typing import Dict, Any
+from functools import partial
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from sqlmodel import Session
 
-from app.core.database import get_session
-from app.services.prompt_service import PromptService
-from app.schemas.prompt import PromptCreate
+from app.core.database import engine, get_session
+from app.models.prompt import Prompt
+from app.services.notification_broker import get_notification_broker
+from app.services.prompt_jobs import PromptJobQueue, get_prompt_jobs
+from app.services.ws_outbox import Outbox
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Dictionary to store active WebSocket connections
-connections: Dict[str, WebSocket] = {}
+# Dictionary to store active WebSocket connections; sockets accepted by the
+# endpoint are wrapped in an Outbox so sends only enqueue
+connections: Dict[str, Any] = {}
+
+
+async def broadcast_text(targets: Dict[str, Any], text: str) -> Tuple[List[str], List[str]]:
+    """Send ``text`` to every target concurrently; returns (delivered, failed) user ids."""
+    user_ids = list(targets)
+    results = await asyncio.gather(
+        *(targets[user_id].send_text(text) for user_id in user_ids),
+        return_exceptions=True,
+    )
+    delivered, failed = [], []
+    for user_id, result in zip(user_ids, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Failed to send to user {user_id}: {str(result) or type(result).__name__}")
+            failed.append(user_id)
+        else:
+            delivered.append(user_id)
+    return delivered, failed
+
+
+def forget_connections(user_ids: List[str], failed_targets: Dict[str, Any]) -> None:
+    """Drop connections that failed, unless the user has reconnected since."""
+    for user_id in user_ids:
+        if connections.get(user_id) is failed_targets.get(user_id):
+            del connections[user_id]
+            logger.info(f"Removed disconnected user {user_id}")
+
 
 async def handle_chat_message(websocket: WebSocket, user_id: str, message: Dict[str, Any]):
     """Handle chat messages - broadcast to other users"""
@@ -27,15 +58,31 @@ async def handle_chat_message(websocket: WebSocket, user_id: str, message: Dict[
     
     # Send to all connected users (including sender for confirmation)
     logger.info(f"Broadcasting to {len(connections)} connected users: {list(connections.keys())}")
-    for other_user_id, other_websocket in connections.items():
-        try:
-            await other_websocket.send_text(json.dumps(chat_message))
-            logger.info(f"Chat message sent to user {other_user_id}")
-        except Exception as e:
-            logger.error(f"Failed to send chat message to user {other_user_id}: {str(e)}")
-
-async def handle_prompt_message(websocket: WebSocket, user_id: str, message: Dict[str, Any], prompt_service: PromptService):
-    """Handle prompt messages - create and process with AI"""
+    targets = dict(connections)
+    delivered, failed = await broadcast_text(targets, json.dumps(chat_message))
+    forget_connections(failed, targets)
+    logger.info(f"Chat message sent to {len(delivered)} users")
+
+async def send_to_user(user_id: str, payload: Dict[str, Any]) -> None:
+    """Send to the user's current connection, which may be newer than the one that asked."""
+    connection = connections.get(user_id)
+    if connection is None:
+        raise ConnectionError(f"User {user_id} is not connected")
+    await connection.send_text(json.dumps(payload))
+
+
+async def handle_prompt_message(websocket: WebSocket, user_id: str, message: Dict[str, Any], prompt_jobs: PromptJobQueue):
+    """Handle prompt messages - queue for AI processing and acknowledge with the prompt id"""
+    if message.get("type") == "cancel":
+        cancelled = await prompt_jobs.cancel(user_id, str(message.get("prompt_id")))
+        if not cancelled:
+            error_response = {
+                "type": "error",
+                "message": f"No prompt {message.get('prompt_id')} in progress"
+            }
+            await websocket.send_text(json.dumps(error_response))
+        return
+
     # Validate required fields
     if "message" not in message:
         error_response = {
@@ -45,40 +92,21 @@ async def handle_prompt_message(websocket: WebSocket, user_id: str, message: Dic
         await websocket.send_text(json.dumps(error_response))
         return
     
-    # Create prompt data
-    prompt_data = PromptCreate(
-        user_id=user_id,
-        prompt_text=message["message"]
-    )
-    
-    # Get database session
-    session = next(get_session())
-    
     try:
-        # First create the prompt
-        prompt = await prompt_service.create_prompt(session, prompt_data)
-        logger.info(f"Created prompt {prompt.prompt_id} for user {user_id}")
-        
-        # Then process it with Gemini
-        processed_prompt = await prompt_service.process_prompt(session, prompt)
-        logger.info(f"Processed prompt {prompt.prompt_id} for user {user_id}")
-        
-        # Send the processed response
-        success_response = {
-            "message": processed_prompt.response_text
-        }
-        await websocket.send_text(json.dumps(success_response))
-        
+        # The response is pushed by a worker when ready; the socket keeps receiving meanwhile
+        prompt_id = await prompt_jobs.submit(
+            user_id, message["message"], partial(send_to_user, user_id), stream=message.get("stream")
+        )
     except ValueError as e:
         error_response = {
             "type": "error",
-            "message": f"Processing error: {str(e)}"
+            "message": str(e)
         }
         await websocket.send_text(json.dumps(error_response))
-        logger.error(f"Error processing prompt for user {user_id}: {str(e)}")
-    
-    finally:
-        session.close()
+        logger.warning(f"Rejected prompt from user {user_id}: {str(e)}")
+        return
+
+    await websocket.send_text(json.dumps({"type": "ack", "prompt_id": prompt_id}))
 
 @router.websocket("/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: str):
@@ -92,15 +120,17 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
     Features:
         - Accepts connections and processes incoming messages
         - Handles chat messages (broadcasts to other users)
-        - Handles prompt messages (creates and processes with AI)
+        - Handles prompt messages (acknowledged at once, answered by a prompt worker)
+        - Handles cancel messages for queued or running prompts
         - Handles connection lifecycle
     """
     await websocket.accept()
-    connections[user_id] = websocket
+    # All sends to this socket, replies included, go through one writer task
+    outbox = Outbox(websocket, user_id)
+    connections[user_id] = outbox
     logger.info(f"User {user_id} connected to WebSocket (chat + prompt mode)")
     
-    # Initialize prompt service
-    prompt_service = PromptService()
+    prompt_jobs = get_prompt_jobs()
     
     try:
         # Process incoming messages for chat and prompts
@@ -111,7 +141,7 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
             try:
                 message = json.loads(message_data)
                 logger.info(f"Parsed message from user {user_id}: {message}")
-                await handle_prompt_message(websocket, user_id, message, prompt_service)
+                await handle_prompt_message(outbox, user_id, message, prompt_jobs)
                
             except json.JSONDecodeError:
                 logger.warning(f"Invalid JSON from user {user_id}: {message_data}")
@@ -120,15 +150,16 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
                     "type": "error",
                     "message": "Invalid message format. Please send valid JSON."
                 }
-                await websocket.send_text(json.dumps(error_message))
+                await outbox.send_text(json.dumps(error_message))
                 
     except WebSocketDisconnect:
         logger.info(f"User {user_id} disconnected from WebSocket")
     except Exception as e:
         logger.error(f"Error in WebSocket connection for user {user_id}: {str(e)}")
     finally:
-        # Clean up connection
-        if user_id in connections:
+        await outbox.close()
+        # Clean up connection, unless the user has already reconnected
+        if connections.get(user_id) is outbox:
             del connections[user_id]
             logger.info(f"Cleaned up connection for user {user_id}")
 
@@ -143,76 +174,110 @@ async def get_websocket_status():
     return {
         "connected_users": len(connections),
         "status": "active",
-        "active_user_ids": list(connections.keys())
+        "active_user_ids": list(connections.keys()),
+        "send_queues": {
+            user_id: conn.stats() for user_id, conn in connections.items() if isinstance(conn, Outbox)
+        },
+        "prompt_jobs": get_prompt_jobs().stats(),
+    }
+def _store_notification_prompts(session: Optional[Session], user_ids: List[str], notification_message: str) -> None:
+    """Record a delivered notification as a prompt for each user, in one transaction."""
+    own_session = session is None
+    if own_session:
+        session = Session(engine)
+    try:
+        completed_at = datetime.now()
+        session.add_all([
+            Prompt(
+                user_id=user_id,
+                prompt_text=f"System notification: {notification_message}",
+                response_text=notification_message,
+                completed_at=completed_at,
+            )
+            for user_id in user_ids
+        ])
+        # One flush: the rows go out as a single multi-row INSERT
+        session.commit()
+        logger.info(f"Stored notification as prompt records for {len(user_ids)} users")
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Failed to store notification as prompts for {len(user_ids)} users: {str(e)}")
+    finally:
+        if own_session:
+            session.close()
+
+
+async def deliver_notification(notification: Dict[str, Any], session: Optional[Session] = None) -> Dict[str, int]:
+    """
+    Send a notification to the matching sockets held by this worker and store
+    a prompt record for each user it reached.
+
+    Args:
+        notification: ``message`` plus an optional ``user_id`` to target one user
+        session: Session for the prompt records; a fresh one is opened when omitted
+
+    Returns:
+        Dict with the ``sent`` and ``disconnected`` counts for this worker
+    """
+    target_user_id = notification.get("user_id")
+    notification_message = notification.get("message", "New notification")
+    # Prepare notification message with only message key
+    payload = json.dumps({"message": notification_message})
+
+    targets = {
+        user_id: websocket
+        for user_id, websocket in connections.items()
+        if not target_user_id or user_id == target_user_id
     }
+    delivered, disconnected_users = await broadcast_text(targets, payload)
+    # Clean up disconnected users
+    forget_connections(disconnected_users, targets)
+
+    if delivered:
+        _store_notification_prompts(session, delivered, notification_message)
+
+    return {"sent": len(delivered), "disconnected": len(disconnected_users)}
+
+
 async def send_notification_service(notification_data: Dict[str, Any], session: Session = Depends(get_session)):
     """
-    Send a notification to all connected WebSocket users via HTTP endpoint.
-    
+    Send a notification to connected WebSocket users on every worker.
+
+    Sockets held by this worker are served directly; the notification is then
+    published on the broker so other workers deliver it to theirs.
+
     Args:
         notification_data: Dictionary containing notification information
             - message: The notification message (required)
-    
+            - user_id: Only notify this user (optional)
+
     Returns:
-        Dict containing notification status and sent count
+        Dict containing notification status and this worker's sent count
     """
-    if not connections:
+    broker = get_notification_broker()
+    if not connections and not broker.distributed:
         raise HTTPException(status_code=404, detail="No active WebSocket connections")
-    
-    # Optional: filter by user_id to send to a specific user
-    target_user_id = notification_data.get("user_id")
-    
-    # Prepare notification message with only message key
-    notification_message = notification_data.get("message", "New notification")
+
     notification = {
-        "message": notification_message
+        "user_id": notification_data.get("user_id"),
+        "message": notification_data.get("message", "New notification"),
     }
-    
-    # Send to all connected users
-    sent_count = 0
-    disconnected_users = []
-    
-    for user_id, websocket in connections.items():
-        if target_user_id and user_id != target_user_id:
-            continue
-        try:
-            await websocket.send_text(json.dumps(notification))
-            sent_count += 1
-            logger.info(f"Notification sent to user {user_id}")
-            
-            # Store notification as prompt record for each user
-            try:
-                from app.models.prompt import Prompt
-                prompt = Prompt(
-                    user_id=user_id,
-                    prompt_text=f"System notification: {notification_message}",
-                    response_text=notification_message,
-                    completed_at=datetime.now()
-                )
-                session.add(prompt)
-                session.commit()
-                session.refresh(prompt)
-                logger.info(f"Stored notification as prompt record for user {user_id}")
-                
-            except Exception as e:
-                logger.error(f"Failed to store notification as prompt for user {user_id}: {str(e)}")
-                
-        except Exception as e:
-            logger.error(f"Failed to send notification to user {user_id}: {str(e)}")
-            disconnected_users.append(user_id)
-    
-    # Clean up disconnected users
-    for user_id in disconnected_users:
-        if user_id in connections:
-            del connections[user_id]
-            logger.info(f"Removed disconnected user {user_id}")
-    
+    local = await deliver_notification(notification, session)
+
+    published = True
+    try:
+        await broker.publish(notification)
+    except Exception as e:
+        published = False
+        logger.error(f"Failed to publish notification to other workers: {str(e)}")
+
     return {
         "status": "success",
-        "message": f"Notification sent to {sent_count} users",
-        "sent_count": sent_count,
+        "message": f"Notification sent to {local['sent']} users",
+        "sent_count": local["sent"],
         "total_connections": len(connections),
-        "disconnected_users": len(disconnected_users)
+        "disconnected_users": local["disconnected"],
+        "published": published,
     }
 
 @router.post("/notification")
@@ -7,6 +7,68 @@ load_dotenv()
 class Settings:
     # Prefer explicit DATABASE_URL; fall back to local SQLite for dev
     DATABASE_URL: str = os.getenv("DATABASE_URL") or "sqlite:///./diary.db"
+    # Async driver URL for the request path; derived from DATABASE_URL when unset
+    # (sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg)
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
 
+    # Engine tuning; pool settings apply to server databases and SQLite files
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() in {"1", "true", "yes"}
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in {"1", "true", "yes"}
+    # Per-statement timeout (PostgreSQL statement_timeout / SQLite busy timeout); 0 disables it
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    # Use WAL journaling for SQLite so readers do not block the writer
+    SQLITE_WAL: bool = os.getenv("SQLITE_WAL", "true").lower() in {"1", "true", "yes"}
 
-settings = Settings()
\ No newline at end of file
+    # Gemini client: max in-flight model calls per worker and per-call timeout
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+    # Budget for each agent in the complete-analysis fan-out
+    AI_AGENT_TIMEOUT_SECONDS: float = float(os.getenv("AI_AGENT_TIMEOUT_SECONDS", "30"))
+
+    # Agent response cache (weekly analysis, goals analysis, phase transition); 0 disables it
+    AI_CACHE_TTL_SECONDS: float = float(os.getenv("AI_CACHE_TTL_SECONDS", "900"))
+    AI_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_CACHE_MAX_ENTRIES", "1024"))
+
+    # Reminder job: due tasks are split into prompts of at most this many items / characters
+    # (a character budget stands in for tokens, roughly 4 characters per token)
+    REMINDER_BATCH_MAX_ITEMS: int = int(os.getenv("REMINDER_BATCH_MAX_ITEMS", "25"))
+    REMINDER_BATCH_MAX_CHARS: int = int(os.getenv("REMINDER_BATCH_MAX_CHARS", "12000"))
+    # Batches generated at once, and attempts per batch before falling back to default messages
+    REMINDER_CONCURRENCY: int = int(os.getenv("REMINDER_CONCURRENCY", "4"))
+    REMINDER_MAX_ATTEMPTS: int = int(os.getenv("REMINDER_MAX_ATTEMPTS", "3"))
+    REMINDER_RETRY_BACKOFF_SECONDS: float = float(os.getenv("REMINDER_RETRY_BACKOFF_SECONDS", "0.5"))
+
+    # WebSocket fan-out across workers: "memory" (single process) or "postgres" (LISTEN/NOTIFY).
+    # The postgres broker connects to NOTIFICATION_BROKER_URL, defaulting to DATABASE_URL
+    NOTIFICATION_BROKER: str = os.getenv("NOTIFICATION_BROKER", "memory")
+    NOTIFICATION_BROKER_URL: str = os.getenv("NOTIFICATION_BROKER_URL", "")
+    NOTIFICATION_CHANNEL: str = os.getenv("NOTIFICATION_CHANNEL", "ws_notifications")
+
+    # Per-socket outbound queue: frames buffered per connection, seconds a single send may take,
+    # and what to do when the queue is full ("drop_oldest" or "disconnect")
+    WS_SEND_QUEUE_SIZE: int = int(os.getenv("WS_SEND_QUEUE_SIZE", "100"))
+    WS_SEND_TIMEOUT_SECONDS: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+    WS_SLOW_CONSUMER_POLICY: str = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+
+    # WebSocket prompts: worker tasks per process, and queued plus running prompts allowed
+    # per user and across the process
+    PROMPT_WORKERS: int = int(os.getenv("PROMPT_WORKERS", "4"))
+    PROMPT_MAX_PER_USER: int = int(os.getenv("PROMPT_MAX_PER_USER", "3"))
+    PROMPT_MAX_IN_FLIGHT: int = int(os.getenv("PROMPT_MAX_IN_FLIGHT", "64"))
+    # Push partial answers as {"type": "delta"} frames while the model is still generating
+    PROMPT_STREAM_RESPONSES: bool = os.getenv("PROMPT_STREAM_RESPONSES", "true").lower() in {"1", "true", "yes"}
+    # Rolling prompt context per user: recent Q/A turns kept verbatim, older turns folded into a
+    # summary this many at a time and capped in characters, and users kept in memory
+    PROMPT_CONTEXT_WINDOW_TURNS: int = int(os.getenv("PROMPT_CONTEXT_WINDOW_TURNS", "6"))
+    PROMPT_CONTEXT_COMPACT_EVERY: int = int(os.getenv("PROMPT_CONTEXT_COMPACT_EVERY", "4"))
+    PROMPT_CONTEXT_SUMMARY_MAX_CHARS: int = int(os.getenv("PROMPT_CONTEXT_SUMMARY_MAX_CHARS", "2000"))
+    PROMPT_CONTEXT_MAX_USERS: int = int(os.getenv("PROMPT_CONTEXT_MAX_USERS", "1024"))
+    # Seconds a cached context is reused before reloading, so writes on other workers show up
+    PROMPT_CONTEXT_TTL_SECONDS: float = float(os.getenv("PROMPT_CONTEXT_TTL_SECONDS", "30"))
+
+
+settings = Settings()
@@ -1,4 +1,13 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Annotated
 from fastapi import Depends
 import os
@@ -13,16 +22,205 @@ from app.models.ai_context import AIContext
 from app.models.job_metrics import JobMetrics
 from app.models.day_log import DayLog
 from app.models.log import Log
+from app.models.reminder_ledger import ReminderLedger
+from app.models.user_daily_rollup import UserDailyRollup
+
+
+class PoolMetrics:
+    """Connection pool counters: checkout wait time and connections in use."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def checked_out(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def checked_in(self) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "avg_checkout_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+def pool_metrics(pool: Pool) -> PoolMetrics:
+    """The metrics of one pool, attached to it on first use."""
+    metrics = getattr(pool, "metrics", None)
+    if metrics is None:
+        metrics = pool.metrics = PoolMetrics()
+    return metrics
+
+
+class _TimedPoolMixin:
+    """Records how long each checkout waited for a connection; metrics survive ``recreate``."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics(self).record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = pool_metrics(self)
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool for sync engines, with checkout wait metrics."""
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool for async engines, with checkout wait metrics."""
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def build_engine(url: Optional[str] = None, echo: Optional[bool] = None) -> Engine:
+    """Create an engine tuned from settings.
+
+    Server databases and SQLite files get a bounded, pre-pinged, recycled
+    connection pool with checkout metrics. PostgreSQL connections carry a
+    statement_timeout; SQLite connections get WAL journaling and a busy timeout.
+    """
+    url = url or settings.DATABASE_URL
+    backend = make_url(url).get_backend_name()
+    kwargs: Dict[str, Any] = {"echo": settings.DB_ECHO if echo is None else echo}
+    connect_args: Dict[str, Any] = {}
+
+    if backend == "sqlite":
+        connect_args["check_same_thread"] = False
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["timeout"] = settings.DB_STATEMENT_TIMEOUT_MS / 1000
+    elif backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    if not _is_sqlite_memory(url):
+        kwargs.update(
+            poolclass=TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+
+    engine = create_engine(url, connect_args=connect_args, **kwargs)
+
+    if backend == "sqlite" and settings.SQLITE_WAL and not _is_sqlite_memory(url):
+        _use_sqlite_wal(engine)
+    _track_pool(engine)
+    return engine
+
+
+def _use_sqlite_wal(engine: Engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
+def _track_pool(engine: Engine) -> None:
+    """Count checkouts on the engine's own pool, so each engine reports separately."""
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_metrics(engine.pool).checked_out()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        pool_metrics(engine.pool).checked_in()
+
+
+def to_async_url(url: str) -> str:
+    """Swap a sync driver for its async counterpart (aiosqlite / asyncpg)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    elif backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+
+def build_async_engine(url: Optional[str] = None, echo: Optional[bool] = None) -> AsyncEngine:
+    """Async twin of ``build_engine``; the driver must be installed (aiosqlite or asyncpg)."""
+    url = url or settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL)
+    backend = make_url(url).get_backend_name()
+    kwargs: Dict[str, Any] = {"echo": settings.DB_ECHO if echo is None else echo}
+    connect_args: Dict[str, Any] = {}
+
+    if backend == "sqlite":
+        connect_args["check_same_thread"] = False
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["timeout"] = settings.DB_STATEMENT_TIMEOUT_MS / 1000
+    elif backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+
+    if not _is_sqlite_memory(url):
+        kwargs.update(
+            poolclass=TimedAsyncQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+
+    engine = create_async_engine(url, connect_args=connect_args, **kwargs)
+    if backend == "sqlite" and settings.SQLITE_WAL and not _is_sqlite_memory(url):
+        _use_sqlite_wal(engine.sync_engine)
+    _track_pool(engine.sync_engine)
+    return engine
+
+
+def engine_pool_status(engine: Engine) -> Dict[str, Any]:
+    """One engine's pool metrics plus the pool's own view of its size and checked-out connections."""
+    pool = engine.pool
+    status = pool_metrics(pool).snapshot()
+    if isinstance(pool, QueuePool):
+        status.update(pool_size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    return status
+
+
+def pool_status() -> Dict[str, Any]:
+    """Pool status of the sync engine and, once it has been created, the async engine."""
+    return {
+        "sync": engine_pool_status(engine),
+        "async": engine_pool_status(_async_engine.sync_engine) if _async_engine is not None else None,
+    }
+
 
 # Use SQLite for development, PostgreSQL for production
 database_url = settings.DATABASE_URL
 
 # Create engine
-connect_args = {}
-if database_url.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-
-engine = create_engine(database_url, connect_args=connect_args, echo=True)
+engine = build_engine(database_url)
 
 def create_db_and_tables():
     """Create database and all tables."""
@@ -32,3 +230,38 @@ def get_session():
     """Get database session."""
     with Session(engine) as session:
         yield session
+
+
+_async_engine: Optional[AsyncEngine] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """Return the shared async engine, creating it on first use."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = build_async_engine()
+    return _async_engine
+
+
+def use_async_engine(async_engine: Optional[AsyncEngine]) -> None:
+    """Point async sessions at another engine (tests); ``None`` rebuilds from settings on next use."""
+    global _async_engine
+    _async_engine = async_engine
+
+
+def async_session() -> AsyncSession:
+    """Open an AsyncSession outside a request, e.g. in WebSocket handlers."""
+    return AsyncSession(get_async_engine(), expire_on_commit=False)
+
+
+async def get_async_session():
+    """Get async database session."""
+    async with async_session() as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
@@ -12,9 +12,14 @@ from app.api.v1.routes import day_log
 from app.api.v1.routes import log
 from app.api.v1.routes import prompt
 from app.api.v1.routes import websocket
-from app.core.database import create_db_and_tables
+from app.core.database import create_db_and_tables, dispose_async_engine, pool_status
 from app.services.scheduler_service import SchedulerService
 from app.services.reminder_service import task_reminder_job
+from app.services.llm_client import shutdown_llm_client
+from app.services.ai_service import get_ai_service, reset_ai_service
+from app.services.pagination import NEXT_CURSOR_HEADER
+from app.services.notification_broker import get_notification_broker
+from app.services.prompt_jobs import get_prompt_jobs
 from fastapi_mcp import FastApiMCP
 
 app = FastAPI(
@@ -30,6 +35,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=[NEXT_CURSOR_HEADER],  # Lets browsers read pagination cursors
 )
 
 scheduler_service = SchedulerService()
@@ -38,11 +44,21 @@ scheduler_service = SchedulerService()
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
+    # Warm the shared AI service; without GEMINI_API_KEY the AI endpoints fail on first use instead
+    try:
+        get_ai_service()
+    except ValueError:
+        pass
     if os.getenv("ENABLE_SCHEDULER", "false").lower() in {"1", "true", "yes"}:
         scheduler_service.start()
         # Every 10 minutes, check for due reminders in IST
         scheduler_service.add_cron_job(task_reminder_job, id="task_reminders", minute="*/10", second="0")
 
+@app.on_event("startup")
+async def start_notification_broker():
+    # Deliver notifications published by other workers to this worker's sockets
+    await get_notification_broker().start(websocket.deliver_notification)
+
 # Include all API routes
 app.include_router(user.router, prefix="/users", tags=["users"])
 app.include_router(goal.router, prefix="/goals", tags=["goals"])
@@ -77,6 +93,11 @@ def read_root():
 def health_check():
     return {"status": "healthy", "service": "AI Productivity System"}
 
+@app.get("/health/db")
+def database_health():
+    """Connection pool metrics: checkout wait times and connections in use."""
+    return pool_status()
+
 
 mcp = FastApiMCP(
     app,
@@ -90,9 +111,14 @@ mcp.mount()
 
 # Graceful shutdown
 @app.on_event("shutdown")
-def on_shutdown():
+async def on_shutdown():
     if scheduler_service.scheduler:
         scheduler_service.shutdown()
+    reset_ai_service()
+    shutdown_llm_client()
+    await get_notification_broker().stop()
+    await get_prompt_jobs().stop()
+    await dispose_async_engine()
 
 if __name__ == "__main__":
     import uvicorn
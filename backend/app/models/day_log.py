@@ -1,4 +1,5 @@
 from sqlmodel import Field, Relationship, SQLModel
+from sqlalchemy import Index
 from typing import Optional, TYPE_CHECKING
 from datetime import date, datetime
 from app.models import TimestampModel
@@ -28,6 +29,8 @@ class DayLogCreate(DayLogBase):
 
 class DayLog(DayLogBase, table=True):
     __tablename__ = "day_logs"
+    # One log per user per day; also serves user_id and (user_id, date) lookups
+    __table_args__ = (Index("ix_day_logs_user_id_date", "user_id", "date", unique=True),)
     
     log_id: Optional[int] = Field(default=None, primary_key=True)
     
@@ -1,4 +1,5 @@
 from sqlmodel import Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List, TYPE_CHECKING
 from datetime import date
 from app.schemas.goal import GoalTypeEnum, StatusEnum, PhaseEnum, PriorityEnum
@@ -11,6 +12,11 @@ if TYPE_CHECKING:
 
 class Goal(TimestampModel, table=True):
     __tablename__ = "goals"
+    __table_args__ = (
+        Index("ix_goals_user_id_status", "user_id", "status"),
+        # Keyset pages of a user's goals walk this in (created_at, goal_id) order
+        Index("ix_goals_user_id_created_at_goal_id", "user_id", "created_at", "goal_id"),
+    )
     
     goal_id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(foreign_key="users.telegram_id")
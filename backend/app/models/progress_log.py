@@ -1,4 +1,5 @@
 from sqlmodel import Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, TYPE_CHECKING
 from datetime import date as dt_date
 from app.models import TimestampModel
@@ -9,6 +10,8 @@ if TYPE_CHECKING:
 
 class ProgressLog(TimestampModel, table=True):
     __tablename__ = "progress_logs"
+    # One log per user per day; also serves user_id and (user_id, date) lookups
+    __table_args__ = (Index("ix_progress_logs_user_id_date", "user_id", "date", unique=True),)
     
     log_id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(foreign_key="users.telegram_id")
@@ -1,11 +1,14 @@
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import Field
 import uuid
 from app.models import TimestampModel
 
 class Prompt(TimestampModel, table=True):
     __tablename__ = "prompts"
+    # Keyset pages and exports of a user's prompts walk this in (created_at, prompt_id) order
+    __table_args__ = (Index("ix_prompts_user_id_created_at_prompt_id", "user_id", "created_at", "prompt_id"),)
     
     prompt_id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     user_id: str = Field(..., index=True)
@@ -0,0 +1,32 @@
+from datetime import date, datetime, time
+from typing import Optional
+
+from sqlalchemy import Column, ForeignKey, Integer, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+from app.models import now
+
+
+class ReminderLedger(SQLModel, table=True):
+    """One row per reminder delivered for a task's scheduled slot.
+
+    The unique key makes each kind fire once per slot; rescheduling a task
+    gives it a new slot, and so a new reminder.
+    """
+
+    __tablename__ = "reminder_ledger"
+    __table_args__ = (
+        UniqueConstraint(
+            "task_id", "reminder_kind", "scheduled_for_date", "scheduled_for_time",
+            name="uq_reminder_ledger_task_id_kind_slot",
+        ),
+    )
+
+    reminder_id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("tasks.task_id", ondelete="CASCADE"), nullable=False)
+    )
+    reminder_kind: str
+    scheduled_for_date: Optional[date] = None
+    scheduled_for_time: Optional[time] = None
+    sent_at: datetime = Field(default_factory=now, nullable=False)
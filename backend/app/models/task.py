@@ -1,7 +1,7 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime, date, time
-from sqlalchemy import Column, String, Enum
+from sqlalchemy import Column, String, Enum, Index
 from app.schemas.task import TaskPriorityEnum, CompletionStatusEnum, EnergyRequiredEnum
 from app.models import TimestampModel
 
@@ -12,6 +12,14 @@ if TYPE_CHECKING:
 
 class Task(TimestampModel, table=True):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_user_id_scheduled_for_date", "user_id", "scheduled_for_date"),
+        Index("ix_tasks_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_tasks_user_id_completion_status", "user_id", "completion_status"),
+        Index("ix_tasks_scheduled_for_date_time", "scheduled_for_date", "scheduled_for_time"),
+        # Keyset pages of a user's tasks walk this in (created_at, task_id) order
+        Index("ix_tasks_user_id_created_at_task_id", "user_id", "created_at", "task_id"),
+    )
     
     task_id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(foreign_key="users.telegram_id")
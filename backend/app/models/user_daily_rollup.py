@@ -0,0 +1,34 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Column, ForeignKey, Index, String
+from sqlmodel import Field
+
+from app.models import TimestampModel
+
+
+class UserDailyRollup(TimestampModel, table=True):
+    """Per-user, per-day totals derived from tasks, progress logs and day logs.
+
+    Rows are rewritten by ``rollup_service`` whenever a source row for that
+    day changes, so readers never aggregate the raw tables themselves.
+    """
+
+    __tablename__ = "user_daily_rollups"
+    # One row per user per day; also serves user_id and (user_id, date) range reads
+    __table_args__ = (Index("ix_user_daily_rollups_user_id_date", "user_id", "date", unique=True),)
+
+    rollup_id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: str = Field(
+        sa_column=Column(String, ForeignKey("users.telegram_id", ondelete="CASCADE"), nullable=False)
+    )
+    date: date
+    # Tasks are planned on scheduled_for_date (or the day they were created) and completed on completed_at
+    tasks_planned: int = 0
+    tasks_completed: int = 0
+    tasks_discarded: int = 0
+    actual_duration_minutes: int = 0  # sum of actual_duration over tasks completed that day
+    mood_score: Optional[int] = None
+    energy_level: Optional[int] = None
+    focus_score: Optional[int] = None
+    day_log_minutes: Optional[int] = None  # end_time - start_time of the day log
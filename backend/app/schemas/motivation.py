@@ -33,6 +33,7 @@ class MotivationStatsResponse(BaseModel):
     pending_tasks: int = Field(..., description="Current pending tasks")
     completion_rate_30_days: float = Field(..., description="30-day task completion rate percentage")
     current_streak_days: int = Field(..., description="Current streak of days with completed tasks")
+    longest_streak_days: int = Field(0, description="Longest-ever streak of days with completed tasks")
     user_phase: str = Field(..., description="User's current entrepreneurial phase")
     days_until_target: Optional[int] = Field(None, description="Days until job transition target")
     
@@ -112,4 +112,4 @@ class TaskUpdate2(BaseModel):
 
 
 class BulkTaskCreate(BaseModel):
-    tasks: list[TaskCreate] = Field(..., min_items=1, max_items=100)  # Limit to 100 tasks per request
\ No newline at end of file
+    tasks: list[TaskCreate] = Field(..., min_items=1, max_items=5000)  # Inserted in chunks; see task_service.MAX_BULK_TASKS
\ No newline at end of file
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+
+class UserDailyRollupResponse(BaseModel):
+    user_id: str
+    date: date
+    tasks_planned: int
+    tasks_completed: int
+    tasks_discarded: int
+    actual_duration_minutes: int
+    mood_score: Optional[int] = None
+    energy_level: Optional[int] = None
+    focus_score: Optional[int] = None
+    day_log_minutes: Optional[int] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,128 @@
+import dataclasses
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.goal import Goal
+from app.models.progress_log import ProgressLog
+from app.models.task import Task
+from app.models.user import User
+
+
+def _serialize(value: Any) -> Any:
+    """Turn SQLModel rows and context briefs (and lists/dicts of them) into JSON-friendly data."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (list, tuple)):
+        return [_serialize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _serialize(v) for k, v in value.items()}
+    return value
+
+
+def context_user_ids(context: Any) -> Set[str]:
+    """Collect the user ids of every row in a prompt context."""
+    if isinstance(context, User):
+        return {context.telegram_id}
+    if isinstance(context, (list, tuple)):
+        return set().union(*(context_user_ids(v) for v in context))
+    if isinstance(context, dict):
+        return set().union(*(context_user_ids(v) for v in context.values()))
+    user_id = getattr(context, "user_id", None)
+    return {user_id} if user_id else set()
+
+
+def fingerprint(agent: str, model_name: str, context: Any) -> str:
+    """Stable hash of an agent call: agent name, model name and the serialized prompt inputs."""
+    payload = json.dumps(
+        {"agent": agent, "model": model_name, "context": _serialize(context)},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AIResponseCache:
+    """In-process TTL + LRU cache for agent responses.
+
+    Entries are tagged with the user ids whose rows went into the prompt so a
+    write to any of those rows can drop them early (see ``invalidate_user``).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any, frozenset]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, user_ids: Iterable[str] = ()) -> None:
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, frozenset(user_ids))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            stale = [key for key, (_, _, owners) in self._entries.items() if user_id in owners]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+ai_response_cache = AIResponseCache(
+    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_changed_users(session: Session, flush_context: Any) -> None:
+    """Drop cached responses for users whose goals, tasks, progress logs or profile changed."""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            ai_response_cache.invalidate_user(obj.telegram_id)
+        elif isinstance(obj, (Goal, Task, ProgressLog)):
+            ai_response_cache.invalidate_user(obj.user_id)
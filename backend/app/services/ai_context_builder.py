@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import case, func
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.goal import Goal
+from app.models.progress_log import ProgressLog
+from app.models.task import Task
+from app.models.user_daily_rollup import UserDailyRollup
+from app.schemas.goal import PhaseEnum, PriorityEnum, StatusEnum
+from app.schemas.task import CompletionStatusEnum
+
+# Most rows of each kind that go into one prompt, so long-time users don't blow up memory or tokens
+AI_CONTEXT_MAX_GOALS = 50
+AI_CONTEXT_MAX_TASKS = 100
+AI_CONTEXT_MAX_PROGRESS_LOGS = 90
+# Days of completed tasks the motivation agent looks back over
+AI_CONTEXT_RECENT_COMPLETIONS_DAYS = 7
+
+
+@dataclass(frozen=True, slots=True)
+class GoalBrief:
+    """The goal columns the AI agents read."""
+
+    goal_id: int
+    user_id: str
+    description: str
+    priority: PriorityEnum
+    phase: PhaseEnum
+    status: StatusEnum
+    completion_percentage: float
+    created_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class TaskBrief:
+    """The task columns the AI agents read."""
+
+    task_id: int
+    user_id: str
+    description: str
+    completion_status: CompletionStatusEnum
+    completed_at: Optional[datetime]
+
+
+@dataclass(frozen=True, slots=True)
+class ProgressBrief:
+    """The progress-log columns the AI agents read."""
+
+    user_id: str
+    date: date
+    tasks_planned: int
+    tasks_completed: int
+    mood_score: int
+    energy_level: int
+    focus_score: int
+    created_at: datetime
+
+
+async def goal_briefs(
+    session: AsyncSession,
+    user_id: str,
+    status: Optional[StatusEnum] = None,
+    limit: int = AI_CONTEXT_MAX_GOALS,
+) -> List[GoalBrief]:
+    """The user's most recently created goals, optionally of one status."""
+    statement = select(
+        Goal.goal_id, Goal.user_id, Goal.description, Goal.priority, Goal.phase,
+        Goal.status, Goal.completion_percentage, Goal.created_at,
+    ).where(Goal.user_id == user_id)
+    if status is not None:
+        statement = statement.where(Goal.status == status)
+    statement = statement.order_by(col(Goal.created_at).desc(), col(Goal.goal_id).desc()).limit(limit)
+    return [GoalBrief(*row) for row in (await session.exec(statement)).all()]
+
+
+async def progress_briefs(
+    session: AsyncSession,
+    user_id: str,
+    since: Optional[date] = None,
+    limit: int = AI_CONTEXT_MAX_PROGRESS_LOGS,
+) -> List[ProgressBrief]:
+    """Progress logs dated ``since`` or later (the latest ``limit`` when None), newest first."""
+    statement = select(
+        ProgressLog.user_id, ProgressLog.date, ProgressLog.tasks_planned, ProgressLog.tasks_completed,
+        ProgressLog.mood_score, ProgressLog.energy_level, ProgressLog.focus_score, ProgressLog.created_at,
+    ).where(ProgressLog.user_id == user_id)
+    if since is not None:
+        statement = statement.where(ProgressLog.date >= since)
+    statement = statement.order_by(col(ProgressLog.date).desc()).limit(limit)
+    return [ProgressBrief(*row) for row in (await session.exec(statement)).all()]
+
+
+async def task_briefs(
+    session: AsyncSession,
+    user_id: str,
+    since: date,
+    completed_only: bool = False,
+    limit: int = AI_CONTEXT_MAX_TASKS,
+) -> List[TaskBrief]:
+    """Tasks touched (or, with ``completed_only``, completed) on ``since`` or later.
+
+    The newest ``limit`` are kept and returned oldest first, so ``[-n:]`` are
+    the latest ones as the agents expect.
+    """
+    start = datetime.combine(since, datetime.min.time())
+    # completed_at is never later than updated_at, so the updated_at bound lets the index narrow the scan
+    touched = func.coalesce(Task.completed_at, Task.updated_at)
+    statement = (
+        select(Task.task_id, Task.user_id, Task.description, Task.completion_status, Task.completed_at)
+        .where(Task.user_id == user_id, Task.updated_at >= start)
+    )
+    if completed_only:
+        statement = statement.where(Task.completion_status == CompletionStatusEnum.COMPLETED, touched >= start)
+    statement = statement.order_by(touched.desc(), col(Task.task_id).desc()).limit(limit)
+    rows = (await session.exec(statement)).all()
+    return [TaskBrief(*row) for row in reversed(rows)]
+
+
+async def recent_completions(
+    session: AsyncSession,
+    user_id: str,
+    days: int = AI_CONTEXT_RECENT_COMPLETIONS_DAYS,
+    limit: int = AI_CONTEXT_MAX_TASKS,
+) -> List[TaskBrief]:
+    """Tasks completed in the last ``days`` days, oldest first."""
+    return await task_briefs(session, user_id, date.today() - timedelta(days=days), completed_only=True, limit=limit)
+
+
+async def task_completion_rate(session: AsyncSession, user_id: str) -> float:
+    """Share of all the user's tasks that are completed, read from the daily rollups.
+
+    A user with no rollup rows (history from before the rollups migration,
+    until ``backfill_rollups.py`` has run) is counted from the tasks instead.
+    """
+    completed, planned = (await session.exec(
+        select(func.sum(UserDailyRollup.tasks_completed), func.sum(UserDailyRollup.tasks_planned))
+        .where(UserDailyRollup.user_id == user_id)
+    )).one()
+    if planned is None:
+        completed, planned = (await session.exec(
+            select(func.count(case((Task.completion_status == CompletionStatusEnum.COMPLETED, 1))), func.count())
+            .where(Task.user_id == user_id)
+        )).one()
+    return (completed or 0) / planned if planned else 0.0
@@ -8,7 +8,9 @@ from app.models.user import User
 from app.models.goal import Goal
 from app.models.task import Task
 from app.models.progress_log import ProgressLog
+from app.models.job_metrics import JobMetrics
 from app.schemas.ai_context import AIContextCreate, AIContextUpdate
+from app.services.ai_service import get_ai_service
 
 
 async def create_ai_context(session: Session, ai_context_data: AIContextCreate) -> AIContext:
@@ -65,7 +67,7 @@ async def create_ai_context(session: Session, ai_context_data: AIContextCreate)
     ).all()
 
     # Initialize AI service
-    ai_service = AIService()
+    ai_service = get_ai_service()
 
     # Generate insights using AI
     goals_analysis = await ai_service.analyze_goals(goals, progress_logs)
@@ -1,7 +1,8 @@
-import google.generativeai as genai
-import os
+import copy
 import json
-from typing import Dict, Any, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime, date, timedelta
 from app.models.user import User
 from app.models.goal import Goal
@@ -13,18 +14,72 @@ from app.models.ai_context import AIContext
 from app.models.job_metrics import JobMetrics
 from app.models.day_log import DayLog
 from app.models.log import Log
+from app.services.ai_cache import ai_response_cache, context_user_ids, fingerprint
+from app.services.llm_client import get_llm_client
 from sqlmodel import Session, select
 from typing import Optional
 
+# Errors behind canned fallback answers, collected for callers inside ``capture_fallbacks``
+_fallback_errors: ContextVar[Optional[List[str]]] = ContextVar("ai_fallback_errors", default=None)
+
+
+@contextmanager
+def capture_fallbacks() -> Iterator[List[str]]:
+    """Collect the errors of agents that answer with their fallback inside this block.
+
+    The list is shared with tasks started inside the block, so an agent run
+    under ``asyncio.wait_for`` still reports to the caller.
+    """
+    errors: List[str] = []
+    token = _fallback_errors.set(errors)
+    try:
+        yield errors
+    finally:
+        _fallback_errors.reset(token)
+
+
+def _record_fallback(error: Exception) -> None:
+    errors = _fallback_errors.get()
+    if errors is not None:
+        errors.append(str(error) or error.__class__.__name__)
+
+
+def _extract_json(text: str) -> Any:
+    """Parse a model answer, unwrapping a ```json fence if present; raises ValueError if it is not JSON."""
+    text = text.strip()
+    if "```json" in text:
+        start = text.find("```json") + 7
+        end = text.find("```", start)
+        text = text[start:end].strip()
+    return json.loads(text)
+
 
 class AIService:
     def __init__(self):
-        """Initialize the AI service with Gemini API if available; otherwise run in fallback mode."""
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        """Bind the service to the shared Gemini model; raises ValueError if GEMINI_API_KEY is missing."""
+        client = get_llm_client()
+        self.model = client.model
+        self.model_name = client.model_name
+
+    async def _generate(self, prompt: str):
+        """Call the model through the shared non-blocking LLM client."""
+        return await get_llm_client().generate_content(prompt, model=self.model)
+
+    async def _generate_json(self, prompt: str, *, agent: str, context: Any) -> Any:
+        """Call the model and parse its JSON answer, caching only answers that parse.
+
+        Parsed results are cached under a fingerprint of ``(agent, model name,
+        context)`` and tagged with the user ids in ``context``; a malformed
+        answer raises and is not cached, so the next call asks the model again.
+        """
+        key = fingerprint(agent, self.model_name, context)
+        parsed = ai_response_cache.get(key)
+        if parsed is None:
+            response = await self._generate(prompt)
+            parsed = _extract_json(response.text)
+            ai_response_cache.set(key, parsed, context_user_ids(context))
+        # Callers may adjust the result; keep the cached copy intact
+        return copy.deepcopy(parsed)
 
     async def generate_daily_tasks(
         self,
@@ -93,7 +148,7 @@ class AIService:
             - Keep total duration realistic (4-6 hours max)
             """
             
-            response = self.model.generate_content(prompt)
+            response = await self._generate(prompt)
             
             # Extract JSON from response
             response_text = response.text.strip()
@@ -108,6 +163,7 @@ class AIService:
             return tasks_data
             
         except Exception as e:
+            _record_fallback(e)
             # Fallback: Generate basic tasks
             return [
                 {
@@ -159,10 +215,11 @@ class AIService:
             - Keep it concise (2-3 sentences)
             """
             
-            response = self.model.generate_content(prompt)
+            response = await self._generate(prompt)
             return response.text.strip()
             
         except Exception as e:
+            _record_fallback(e)
             return f"You're making progress on your entrepreneurial journey, {user.name}! Every challenge you face is building the resilience you'll need to successfully transition from your job. Keep focusing on your goals - you're closer than you think!"
 
 
@@ -210,18 +267,11 @@ class AIService:
             }}
             """
             
-            response = self.model.generate_content(prompt)
-            
-            # Extract JSON from response
-            response_text = response.text.strip()
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                json_text = response_text[json_start:json_end].strip()
-            else:
-                json_text = response_text
-            
-            analysis = json.loads(json_text)
+            analysis = await self._generate_json(
+                prompt,
+                agent="weekly_analysis",
+                context={"progress_logs": progress_logs, "goals": goals, "tasks": tasks},
+            )
             # Normalize completion_assessment to expected labels
             if isinstance(analysis, dict) and "completion_assessment" in analysis:
                 raw = str(analysis.get("completion_assessment", "")).lower()
@@ -234,6 +284,7 @@ class AIService:
             return analysis
             
         except Exception as e:
+            _record_fallback(e)
             return {
                 "overall_performance": "Good",
                 "key_insights": ["You're maintaining consistent progress", "Focus on completing planned tasks"],
@@ -291,21 +342,15 @@ class AIService:
             - Transition: Financial stability, sustainable revenue
             """
             
-            response = self.model.generate_content(prompt)
-            
-            # Extract JSON from response
-            response_text = response.text.strip()
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                json_text = response_text[json_start:json_end].strip()
-            else:
-                json_text = response_text
-            
-            evaluation = json.loads(json_text)
+            evaluation = await self._generate_json(
+                prompt,
+                agent="phase_transition",
+                context={"user": user, "goals": goals, "time_in_phase_days": time_in_phase_days},
+            )
             return evaluation
             
         except Exception as e:
+            _record_fallback(e)
             return {
                 "current_phase": current_phase,
                 "next_phase": next_phase,
@@ -368,7 +413,7 @@ class AIService:
             - Current business phase impacts timing
             """
             
-            response = self.model.generate_content(prompt)
+            response = await self._generate(prompt)
             
             # Extract JSON from response
             response_text = response.text.strip()
@@ -383,6 +428,7 @@ class AIService:
             return analysis
             
         except Exception as e:
+            _record_fallback(e)
             # Determine basic risk level
             if revenue_replacement_ratio >= 50 and runway_months >= 6:
                 risk_level = "Low"
@@ -480,21 +526,15 @@ class AIService:
             - Risk factors and mitigation strategies
             """
 
-            response = self.model.generate_content(prompt)
-
-            # Extract JSON from response
-            response_text = response.text.strip()
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                json_text = response_text[json_start:json_end].strip()
-            else:
-                json_text = response_text
-
-            analysis = json.loads(json_text)
+            analysis = await self._generate_json(
+                prompt,
+                agent="analyze_goals",
+                context={"goals": goals, "progress_logs": progress_logs},
+            )
             return analysis
 
         except Exception as e:
+            _record_fallback(e)
             # Calculate basic metrics even in error case
             total_goals = len(goals)
             completed_goals = len([g for g in goals if g.status == StatusEnum.COMPLETED])
@@ -669,7 +709,7 @@ class AIService:
             - Provide actionable productivity insights
             """
             
-            response = self.model.generate_content(prompt)
+            response = await self._generate(prompt)
             
             # Extract JSON from response
             response_text = response.text.strip()
@@ -752,7 +792,7 @@ class AIService:
             }}
             """
 
-            response = self.model.generate_content(prompt)
+            response = await self._generate(prompt)
             response_text = response.text.strip()
             if "```json" in response_text:
                 json_start = response_text.find("```json") + 7
@@ -826,7 +866,7 @@ class AIService:
             }}
             """
 
-            response = self.model.generate_content(prompt)
+            response = await self._generate(prompt)
             response_text = response.text.strip()
             if "```json" in response_text:
                 json_start = response_text.find("```json") + 7
@@ -850,4 +890,25 @@ class AIService:
                 "monthly_expenses": None,
                 "runway_months": None,
                 "quit_readiness_score": 0,
-            }
\ No newline at end of file
+            }
+
+
+_ai_service: Optional[AIService] = None
+
+
+def get_ai_service() -> AIService:
+    """Return the process-wide AIService, creating it on first use.
+
+    Also usable as a FastAPI dependency. A missing GEMINI_API_KEY surfaces here
+    as ValueError rather than when the module is imported.
+    """
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AIService()
+    return _ai_service
+
+
+def reset_ai_service() -> None:
+    """Drop the shared AIService so the next get_ai_service() builds a fresh one."""
+    global _ai_service
+    _ai_service = None
@@ -0,0 +1,215 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.prompt import Prompt
+from app.models.task import Task
+
+# Today's tasks listed in the context, most recently updated first
+CONTEXT_TASKS_LIMIT = 20
+# Completed turns read on a cold start: the window, and older turns folded into the summary
+COLD_LOAD_TURNS = 30
+# Per-turn caps, so one long answer cannot blow up every later prompt
+TURN_QUESTION_MAX_CHARS = 500
+TURN_ANSWER_MAX_CHARS = 1000
+SUMMARY_LINE_MAX_CHARS = 120
+
+
+def _clip(text: Optional[str], limit: int) -> str:
+    text = (text or "").strip()
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def _summary_line(question: str, answer: str) -> str:
+    line = f"- Asked: {question} / Answered: {answer}".replace("\n", " ")
+    return _clip(line, SUMMARY_LINE_MAX_CHARS)
+
+
+class ConversationContextCache:
+    """Per-user rolling context of today's conversation for prompt processing.
+
+    Each user's entry holds today's task list, the last ``window_turns``
+    question/answer pairs and a summary of older turns. Turns pushed out of
+    the window are folded into the summary ``compact_every`` at a time, as one
+    clipped line per turn; the oldest lines are dropped to keep the summary
+    under ``summary_max_chars``. A prompt therefore costs the same number of
+    queries and roughly the same number of tokens however long the day gets.
+
+    An entry is built from the database on first use (or when the day
+    changes) and then updated by ``record_turn`` as prompts complete. Task
+    writes drop the cached task list; prompt rows written outside
+    ``PromptService`` (notifications, manual updates) drop the whole entry.
+    Those hooks only fire in the process that made the write, so entries are
+    also reloaded once they are ``ttl_seconds`` old; that bounds how long a
+    write made by another worker goes unseen.
+    """
+
+    def __init__(
+        self,
+        *,
+        window_turns: Optional[int] = None,
+        compact_every: Optional[int] = None,
+        summary_max_chars: Optional[int] = None,
+        max_users: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self.window_turns = window_turns or settings.PROMPT_CONTEXT_WINDOW_TURNS
+        self.compact_every = compact_every or settings.PROMPT_CONTEXT_COMPACT_EVERY
+        self.summary_max_chars = summary_max_chars or settings.PROMPT_CONTEXT_SUMMARY_MAX_CHARS
+        self.max_users = max_users or settings.PROMPT_CONTEXT_MAX_USERS
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.PROMPT_CONTEXT_TTL_SECONDS
+        self.loads = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, session: AsyncSession, user_id: str, today: Optional[date] = None) -> Dict[str, Any]:
+        """Return ``{"tasks", "turns", "summary"}`` for the user's conversation today."""
+        today = today or datetime.now().date()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and (
+                entry["day"] != today or time.monotonic() - entry["loaded_at"] > self.ttl_seconds
+            ):
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+                turns = list(entry["turns"])
+                summary = self._summary_text(entry)
+                tasks = entry["tasks"]
+
+        if entry is None:
+            entry = await self._load(session, user_id, today)
+            with self._lock:
+                self._store(user_id, entry)
+                self.loads += 1
+                turns = list(entry["turns"])
+                summary = self._summary_text(entry)
+                tasks = entry["tasks"]
+        if tasks is None:
+            tasks = await _load_tasks(session, user_id, today)
+            with self._lock:
+                if self._entries.get(user_id) is entry:
+                    entry["tasks"] = tasks
+        return {"tasks": tasks, "turns": turns, "summary": summary}
+
+    def record_turn(self, user_id: str, question: str, answer: str, today: Optional[date] = None) -> None:
+        """Append a completed turn to the user's cached context, if there is one for today."""
+        today = today or datetime.now().date()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry["day"] != today:
+                return
+            self._push(entry, question, answer)
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def invalidate_tasks(self, user_id: str) -> None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry["tasks"] = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.loads = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"users": len(self._entries), "loads": self.loads, "max_users": self.max_users}
+
+    async def _load(self, session: AsyncSession, user_id: str, today: date) -> Dict[str, Any]:
+        day_start, day_end = _day_bounds(today)
+        rows = (await session.exec(
+            select(Prompt.prompt_text, Prompt.response_text)
+            .where(
+                Prompt.user_id == user_id,
+                Prompt.created_at >= day_start,
+                Prompt.created_at <= day_end,
+                col(Prompt.response_text).is_not(None),
+            )
+            .order_by(col(Prompt.created_at).desc(), col(Prompt.prompt_id).desc())
+            .limit(COLD_LOAD_TURNS)
+        )).all()
+        entry = {
+            "day": today,
+            "loaded_at": time.monotonic(),
+            "tasks": await _load_tasks(session, user_id, today),
+            "turns": deque(),
+            "pending": [],
+            "summary": [],
+        }
+        for prompt_text, response_text in reversed(rows):
+            self._push(entry, prompt_text, response_text)
+        # Everything older than the window goes straight into the summary
+        self._compact(entry)
+        return entry
+
+    def _store(self, user_id: str, entry: Dict[str, Any]) -> None:
+        self._entries[user_id] = entry
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+    def _push(self, entry: Dict[str, Any], question: str, answer: str) -> None:
+        entry["turns"].append((_clip(question, TURN_QUESTION_MAX_CHARS), _clip(answer, TURN_ANSWER_MAX_CHARS)))
+        while len(entry["turns"]) > self.window_turns:
+            entry["pending"].append(entry["turns"].popleft())
+        if len(entry["pending"]) >= self.compact_every:
+            self._compact(entry)
+
+    def _compact(self, entry: Dict[str, Any]) -> None:
+        entry["summary"] = self._trim(entry["summary"] + [_summary_line(q, a) for q, a in entry["pending"]])
+        entry["pending"] = []
+
+    def _trim(self, lines: List[str]) -> List[str]:
+        """Drop the oldest lines until the summary fits ``summary_max_chars``."""
+        while lines and sum(len(line) + 1 for line in lines) > self.summary_max_chars:
+            lines = lines[1:]
+        return lines
+
+    def _summary_text(self, entry: Dict[str, Any]) -> str:
+        # Turns waiting for the next compaction are still shown, already in summary form
+        return "\n".join(self._trim(entry["summary"] + [_summary_line(q, a) for q, a in entry["pending"]]))
+
+
+def _day_bounds(today: date):
+    return datetime.combine(today, datetime.min.time()), datetime.combine(today, datetime.max.time())
+
+
+async def _load_tasks(session: AsyncSession, user_id: str, today: date) -> List[str]:
+    day_start, day_end = _day_bounds(today)
+    rows = (await session.exec(
+        select(Task.description)
+        .where(
+            Task.user_id == user_id,
+            Task.updated_at >= day_start,
+            Task.updated_at <= day_end,
+        )
+        .order_by(col(Task.updated_at).desc())
+        .limit(CONTEXT_TASKS_LIMIT)
+    )).all()
+    return [description or "" for description in rows]
+
+
+conversation_context = ConversationContextCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_conversation_context(session: Session, flush_context: Any) -> None:
+    """Keep cached conversation context in step with task and prompt writes made elsewhere."""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Task):
+            conversation_context.invalidate_tasks(obj.user_id)
+        elif isinstance(obj, Prompt) and (obj in session.deleted or (obj in session.new and obj.response_text)):
+            conversation_context.invalidate_user(obj.user_id)
@@ -1,12 +1,24 @@
-from typing import List, Optional, Sequence
+import math
+from typing import Dict, List, Optional, Sequence
 from datetime import date
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlmodel import Session, select
 
+from app.models import now
 from app.models.day_log import DayLog
 from app.schemas.day_log import DayLogCreate, DayLogUpdate, DayLogBase
+from app.services.pagination import paginate
+from app.services.rollup_service import refresh_user_days
+
+# Newest first
+DAY_LOG_PAGE_KEYS = (DayLog.date, DayLog.log_id)
 
 
 def create_day_log(session: Session, data: DayLogCreate) -> DayLog:
+    if get_user_day_log_by_date(session, data.user_id, data.date):
+        raise ValueError("Day log already exists for this date")
     log = DayLog.model_validate(data)
     session.add(log)
     session.commit()
@@ -25,13 +37,14 @@ def list_user_day_logs(
     limit: int = 10,
     location: Optional[str] = None,
     weather: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> List[DayLog]:
     query = select(DayLog).where(DayLog.user_id == user_id)
     if location:
         query = query.where(DayLog.location == location)
     if weather:
         query = query.where(DayLog.weather == weather)
-    query = query.offset(skip).limit(limit)
+    query = paginate(query, DAY_LOG_PAGE_KEYS, cursor=cursor, skip=skip, limit=limit, descending=True)
     return session.exec(query).all()
 
 
@@ -56,6 +69,70 @@ def list_user_day_logs_by_range(
     return session.exec(query).all()
 
 
+DURATION_PERCENTILES = (50, 90, 95)
+
+
+def _duration_hours(session: Session):
+    """SQL expression for end_time - start_time in hours."""
+    if session.get_bind().dialect.name == "sqlite":
+        return (func.julianday(DayLog.end_time) - func.julianday(DayLog.start_time)) * 24
+    return func.extract("epoch", DayLog.end_time - DayLog.start_time) / 3600
+
+
+def user_day_log_stats(
+    session: Session,
+    user_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> dict:
+    """Day-log statistics computed in the database.
+
+    Counts, average duration and location/weather histograms come from
+    aggregate queries; duration percentiles (nearest rank) read a single
+    ordered value each. No DayLog rows are loaded.
+    """
+    filters = [DayLog.user_id == user_id]
+    if start_date:
+        filters.append(DayLog.date >= start_date)
+    if end_date:
+        filters.append(DayLog.date <= end_date)
+
+    duration = _duration_hours(session)
+    total_logs, timed_logs, average_duration = session.exec(
+        select(func.count(), func.count(DayLog.end_time), func.avg(duration)).where(*filters)
+    ).one()
+
+    def histogram(column) -> dict:
+        # Blank values are left out like missing ones, as the in-Python summary did
+        rows = session.exec(
+            select(column, func.count()).where(*filters, func.coalesce(column, "") != "").group_by(column)
+        ).all()
+        return {value: count for value, count in rows}
+
+    percentiles = {}
+    for p in DURATION_PERCENTILES:
+        value = None
+        if timed_logs:
+            rank = max(math.ceil(p / 100 * timed_logs), 1)
+            value = session.exec(
+                select(duration)
+                .where(*filters, DayLog.end_time.is_not(None))
+                .order_by(duration)
+                .offset(rank - 1)
+                .limit(1)
+            ).first()
+        percentiles[f"p{p}"] = round(value, 2) if value is not None else 0
+
+    return {
+        "total_logs": total_logs,
+        "logs_with_duration": timed_logs,
+        "average_duration": average_duration or 0,
+        "duration_percentiles": percentiles,
+        "locations_summary": histogram(DayLog.location),
+        "weather_summary": histogram(DayLog.weather),
+    }
+
+
 def update_day_log(session: Session, log_id: int, update: DayLogUpdate) -> DayLog:
     log = session.get(DayLog, log_id)
     if not log:
@@ -77,23 +154,102 @@ def delete_day_log(session: Session, log_id: int) -> None:
     session.commit()
 
 
-def create_bulk_day_logs(session: Session, user_id: str, day_logs: Sequence[DayLogBase]) -> List[DayLog]:
-    """Create multiple day log entries for a user in a single transaction."""
-    db_logs = []
-    for log_data in day_logs:
-        # Create DayLogCreate instance with user_id
-        create_data = DayLogCreate(
-            user_id=user_id,
-            **log_data.model_dump()
-        )
-        # Create DayLog model instance
-        db_log = DayLog.model_validate(create_data)
-        db_logs.append(db_log)
-        session.add(db_log)
-    
-    session.commit()
-    for log in db_logs:
-        session.refresh(log)
-    
-    return db_logs
-
+DAY_LOG_IMPORT_MODES = ("error", "skip", "upsert")
+# Rows per multi-row INSERT (14 columns a row stays well under SQLite's bound-parameter limit)
+DAY_LOG_INSERT_CHUNK_SIZE = 500
+# Columns an upsert overwrites; identity columns and created_at are kept
+_UPSERT_COLUMNS = (
+    "start_time", "end_time", "summary", "highlights", "challenges", "learnings",
+    "gratitude", "tomorrow_plan", "weather", "location", "updated_at",
+)
+
+
+class DayLogImport:
+    """One pass of day logs for a user into ``day_logs``, written in chunks.
+
+    Existing dates for the user are read once up front. ``write`` sends each
+    chunk as a single multi-row ``INSERT ... RETURNING``. What happens to a
+    date that already has a log depends on ``mode``: ``"error"`` rejects the
+    import, ``"skip"`` keeps the stored log, and ``"upsert"`` overwrites it
+    (``ON CONFLICT (user_id, date) DO UPDATE``). A date repeated within the
+    import is always an error. Nothing is committed until ``finish``, so a
+    failed import leaves no rows behind. Memory stays bounded by one chunk
+    plus the set of dates seen.
+    """
+
+    def __init__(self, session: Session, user_id: str, mode: str = "error", keep_rows: bool = False) -> None:
+        if mode not in DAY_LOG_IMPORT_MODES:
+            raise ValueError(f"Unknown import mode: {mode}")
+        self.session = session
+        self.user_id = user_id
+        self.mode = mode
+        self.rows: Optional[List[DayLog]] = [] if keep_rows else None
+        self.counts = {"received": 0, "created": 0, "updated": 0, "skipped": 0}
+        self._existing = set(session.exec(select(DayLog.date).where(DayLog.user_id == user_id)).all())
+        self._seen: set = set()
+
+    def write(self, day_logs: Sequence[DayLogBase]) -> None:
+        batch = []
+        for log_data in day_logs:
+            self.counts["received"] += 1
+            if log_data.date in self._seen:
+                raise ValueError(f"Duplicate date {log_data.date} in day log import")
+            self._seen.add(log_data.date)
+            if log_data.date in self._existing:
+                if self.mode == "error":
+                    raise ValueError(f"Day log already exists for {log_data.date}")
+                if self.mode == "skip":
+                    self.counts["skipped"] += 1
+                    continue
+            batch.append(log_data)
+        for start in range(0, len(batch), DAY_LOG_INSERT_CHUNK_SIZE):
+            self._insert(batch[start:start + DAY_LOG_INSERT_CHUNK_SIZE])
+
+    def _insert(self, chunk: Sequence[DayLogBase]) -> None:
+        timestamp = now()
+        values = [
+            {**log_data.model_dump(), "user_id": self.user_id, "created_at": timestamp, "updated_at": timestamp}
+            for log_data in chunk
+        ]
+        insert = postgresql_insert if self.session.get_bind().dialect.name == "postgresql" else sqlite_insert
+        statement = insert(DayLog.__table__).values(values)
+        if self.mode == "upsert":
+            statement = statement.on_conflict_do_update(
+                index_elements=["user_id", "date"],
+                set_={column: statement.excluded[column] for column in _UPSERT_COLUMNS},
+            )
+        returned = self.session.execute(statement.returning(*DayLog.__table__.c)).all()
+        # A Core INSERT skips the flush hook that maintains the daily rollups
+        refresh_user_days(self.session, {(self.user_id, log_data.date) for log_data in chunk})
+
+        updated = sum(1 for log_data in chunk if log_data.date in self._existing)
+        self.counts["updated"] += updated
+        self.counts["created"] += len(chunk) - updated
+        if self.rows is not None:
+            by_date = {row.date: row for row in returned}
+            # Detached copies in input order; commit cannot expire them
+            self.rows.extend(DayLog(**by_date[log_data.date]._mapping) for log_data in chunk)
+
+    def finish(self) -> Dict[str, int]:
+        self.session.commit()
+        return dict(self.counts)
+
+    def abort(self) -> None:
+        self.session.rollback()
+
+
+def create_bulk_day_logs(
+    session: Session,
+    user_id: str,
+    day_logs: Sequence[DayLogBase],
+    mode: str = "error",
+) -> List[DayLog]:
+    """Create (or with ``mode="upsert"``, overwrite) day logs for a user in a single transaction."""
+    day_log_import = DayLogImport(session, user_id, mode, keep_rows=True)
+    try:
+        day_log_import.write(day_logs)
+        day_log_import.finish()
+    except Exception:
+        day_log_import.abort()
+        raise
+    return day_log_import.rows
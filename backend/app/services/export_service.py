@@ -0,0 +1,153 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, Iterator, List, Sequence
+
+from sqlalchemy import select
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.day_log import DayLog
+from app.models.progress_log import ProgressLog
+from app.models.prompt import Prompt
+from app.models.task import Task
+
+# Rows fetched per round trip from the server-side cursor, and written per response chunk
+EXPORT_BATCH_SIZE = 500
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_FORMAT_PATTERN = "^(" + "|".join(EXPORT_MEDIA_TYPES) + ")$"
+
+# Export name -> (table, sort key). Exports run oldest first on the (user_id, created_at, id)
+# and (user_id, date) indexes
+EXPORTS = {
+    "tasks": (Task, (Task.created_at, Task.task_id)),
+    "progress-logs": (ProgressLog, (ProgressLog.date, ProgressLog.log_id)),
+    "day-logs": (DayLog, (DayLog.date, DayLog.log_id)),
+    "prompts": (Prompt, (Prompt.created_at, Prompt.prompt_id)),
+}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class _Encoder:
+    """Turns batches of rows into NDJSON or CSV bytes, optionally as one gzip stream."""
+
+    def __init__(self, columns: Sequence[str], fmt: str, compress: bool) -> None:
+        self.columns = list(columns)
+        self.fmt = fmt
+        self._gzip = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+
+    def header(self) -> bytes:
+        if self.fmt != "csv":
+            return b""
+        return self._bytes(self._csv([self.columns]))
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        if self.fmt == "csv":
+            text = self._csv([["" if value is None else _plain(value) for value in row] for row in rows])
+        else:
+            text = "".join(
+                json.dumps({name: _plain(value) for name, value in zip(self.columns, row)}) + "\n"
+                for row in rows
+            )
+        return self._bytes(text)
+
+    def finish(self) -> bytes:
+        return self._gzip.flush() if self._gzip is not None else b""
+
+    def _csv(self, rows: List[List[Any]]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    def _bytes(self, text: str) -> bytes:
+        data = text.encode("utf-8")
+        return self._gzip.compress(data) if self._gzip is not None else data
+
+
+def _export_statement(kind: str, user_id: str):
+    if kind not in EXPORTS:
+        raise ValueError(f"Unknown export: {kind}")
+    model, order = EXPORTS[kind]
+    table = model.__table__
+    # Plain column rows: no ORM objects or identity map to grow with the history
+    return (
+        select(*table.c)
+        .where(table.c.user_id == user_id)
+        .order_by(*order)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    ), [column.name for column in table.c]
+
+
+def export_media_type(fmt: str, compress: bool) -> str:
+    return "application/gzip" if compress else EXPORT_MEDIA_TYPES[fmt]
+
+
+def export_headers(kind: str, user_id: str, fmt: str, compress: bool) -> Dict[str, str]:
+    filename = f"{kind}-{user_id}.{fmt}" + (".gz" if compress else "")
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+def stream_export(
+    session: Session, kind: str, user_id: str, fmt: str = "ndjson", compress: bool = False
+) -> Iterator[bytes]:
+    """Yield a user's ``kind`` rows as NDJSON or CSV chunks, ``EXPORT_BATCH_SIZE`` rows at a time.
+
+    Rows are read through a server-side cursor, so memory stays flat however
+    long the history is. ``session`` only supplies the engine: the rows are
+    read on a session this generator opens and closes itself, because a
+    streamed body may outlive the request's session.
+    """
+    statement, columns = _export_statement(kind, user_id)
+    encoder = _Encoder(columns, fmt, compress)
+    with Session(session.get_bind()) as export_session:
+        result = export_session.execute(statement)
+        try:
+            chunk = encoder.header()
+            if chunk:
+                yield chunk
+            for rows in result.partitions():
+                chunk = encoder.encode(rows)
+                if chunk:
+                    yield chunk
+            chunk = encoder.finish()
+            if chunk:
+                yield chunk
+        finally:
+            result.close()
+
+
+async def stream_export_async(
+    session: AsyncSession, kind: str, user_id: str, fmt: str = "ndjson", compress: bool = False
+) -> AsyncIterator[bytes]:
+    """``stream_export`` for the async request path, on its own ``AsyncSession`` likewise."""
+    statement, columns = _export_statement(kind, user_id)
+    encoder = _Encoder(columns, fmt, compress)
+    async with AsyncSession(session.bind) as export_session:
+        result = await export_session.stream(statement)
+        try:
+            chunk = encoder.header()
+            if chunk:
+                yield chunk
+            async for rows in result.partitions():
+                chunk = encoder.encode(rows)
+                if chunk:
+                    yield chunk
+            chunk = encoder.finish()
+            if chunk:
+                yield chunk
+        finally:
+            await result.close()
+
@@ -3,6 +3,9 @@ from sqlmodel import Session, select
 
 from app.models.goal import Goal
 from app.schemas.goal import GoalCreate, GoalUpdate, StatusEnum, GoalTypeEnum
+from app.services.pagination import DEFAULT_PAGE_SIZE, paginate
+
+GOAL_PAGE_KEYS = (Goal.created_at, Goal.goal_id)
 
 
 def create_goal(session: Session, goal_data: GoalCreate) -> Goal:
@@ -13,11 +16,17 @@ def create_goal(session: Session, goal_data: GoalCreate) -> Goal:
     return goal
 
 
-def list_goals(session: Session, skip: int = 0, limit: int = 100, user_id: Optional[str] = None) -> List[Goal]:
+def list_goals(
+    session: Session,
+    skip: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    user_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+) -> List[Goal]:
     statement = select(Goal)
     if user_id:
         statement = statement.where(Goal.user_id == user_id)
-    statement = statement.offset(skip).limit(limit)
+    statement = paginate(statement, GOAL_PAGE_KEYS, cursor=cursor, skip=skip, limit=limit)
     return session.exec(statement).all()
 
 
@@ -6,7 +6,7 @@ from sqlmodel import Session, select
 from app.models.job_metrics import JobMetrics
 from app.schemas.job_metrics import JobMetricsCreate, JobMetricsUpdate, JobMetricsAIAnalysis
 from app.models.user import User
-from app.services.ai_service import AIService
+from app.services.ai_service import get_ai_service
 
 class AIServiceError(Exception):
     """Raised when there is an error in the AI service."""
@@ -149,8 +149,8 @@ async def analyze_job_metrics_with_ai(session: Session, metric_id: int) -> JobMe
     if not user:
         raise LookupError("User not found")
 
-    # Initialize AI service
-    ai_service = AIService()
+    # Shared AI service (created on first use)
+    ai_service = get_ai_service()
 
     try:
         # Get AI analysis
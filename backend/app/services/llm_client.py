@@ -0,0 +1,167 @@
+import asyncio
+import functools
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Optional
+
+import google.generativeai as genai
+
+from app.core.config import settings
+
+MODEL_NAME = "gemini-2.5-flash"
+
+
+class LLMClient:
+    """Process-wide gateway for Gemini calls.
+
+    ``GenerativeModel.generate_content`` is blocking; awaiting it directly from an
+    ``async def`` freezes the event loop (HTTP and WebSocket traffic included) for
+    the whole generation. Calls are offloaded to a dedicated thread pool instead,
+    at most ``max_concurrency`` of them are in flight at once, and every call is
+    bounded by a timeout.
+
+    The SDK cannot cancel a request that is already running, so a call that times
+    out keeps its thread until the SDK gives up. It does release its concurrency
+    slot; the pool is sized with headroom for those abandoned calls.
+
+    The client also owns the configured ``GenerativeModel``: ``genai.configure``
+    runs once, on first use, and every caller shares the same model instance.
+    """
+
+    def __init__(self, max_concurrency: int, timeout: float, model_name: str = MODEL_NAME) -> None:
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.model_name = model_name
+        self._model: Any = None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency * 4, thread_name_prefix="llm")
+        # asyncio primitives are bound to the loop that first waits on them
+        self._limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def model(self) -> Any:
+        """The shared Gemini model; raises ``ValueError`` if no API key is configured."""
+        if self._model is None:
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise ValueError("GEMINI_API_KEY environment variable is required")
+            genai.configure(api_key=api_key)
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def _limiter(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        limiter = self._limiters.get(loop)
+        if limiter is None:
+            limiter = asyncio.Semaphore(self.max_concurrency)
+            self._limiters[loop] = limiter
+        return limiter
+
+    async def generate_content(
+        self,
+        prompt: Any,
+        *,
+        model: Any = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Run ``model.generate_content(prompt, **kwargs)`` off the event loop.
+
+        ``model`` defaults to the shared model. Raises ``asyncio.TimeoutError`` if no answer arrives within ``timeout``
+        seconds (defaults to ``LLM_TIMEOUT_SECONDS``), time spent waiting for a
+        free slot included.
+        """
+        loop = asyncio.get_running_loop()
+        model = self.model if model is None else model
+        call = functools.partial(model.generate_content, prompt, **kwargs)
+
+        async def run() -> Any:
+            async with self._limiter(loop):
+                return await loop.run_in_executor(self._executor, call)
+
+        return await asyncio.wait_for(run(), timeout=self.timeout if timeout is None else timeout)
+
+    async def stream_content(
+        self,
+        prompt: Any,
+        *,
+        model: Any = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """Yield the text of each chunk of ``model.generate_content(prompt, stream=True)``.
+
+        The SDK's stream is a blocking iterator, so it is drained on the thread
+        pool and chunks are handed to the event loop as they arrive. A slot is
+        held until the stream ends. ``timeout`` (defaults to ``LLM_TIMEOUT_SECONDS``)
+        bounds the wait for a free slot and for each chunk, so a long answer
+        that keeps producing text is not cut off. Closing the generator early
+        stops the worker thread at the next chunk.
+        """
+        loop = asyncio.get_running_loop()
+        model = self.model if model is None else model
+        timeout = self.timeout if timeout is None else timeout
+        chunks: "asyncio.Queue[Any]" = asyncio.Queue()
+        stopped = threading.Event()
+        done = object()
+
+        def put(item: Any) -> None:
+            try:
+                loop.call_soon_threadsafe(chunks.put_nowait, item)
+            except RuntimeError:
+                # The loop closed under us; nobody is reading any more
+                stopped.set()
+
+        def drain() -> None:
+            try:
+                for chunk in model.generate_content(prompt, stream=True, **kwargs):
+                    if stopped.is_set():
+                        return
+                    text = getattr(chunk, "text", "") or ""
+                    if text:
+                        put(text)
+            except Exception as e:
+                put(e)
+            else:
+                put(done)
+
+        limiter = self._limiter(loop)
+        await asyncio.wait_for(limiter.acquire(), timeout=timeout)
+        try:
+            loop.run_in_executor(self._executor, drain)
+            while True:
+                item = await asyncio.wait_for(chunks.get(), timeout=timeout)
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stopped.set()
+            limiter.release()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """Return the shared LLM client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = LLMClient(
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+        )
+    return _client
+
+
+def shutdown_llm_client() -> None:
+    global _client
+    if _client is not None:
+        _client.shutdown()
+        _client = None
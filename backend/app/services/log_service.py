@@ -4,6 +4,9 @@ from sqlmodel import Session, select
 
 from app.models.log import Log
 from app.schemas.log import LogCreate
+from app.services.pagination import paginate
+
+LOG_PAGE_KEYS = (Log.created_at, Log.log_id)
 
 
 def create_log(session: Session, data: LogCreate) -> Log:
@@ -18,8 +21,8 @@ def get_log(session: Session, log_id: int) -> Optional[Log]:
     return session.get(Log, log_id)
 
 
-def list_logs(session: Session, skip: int = 0, limit: int = 10) -> List[Log]:
-    query = select(Log).offset(skip).limit(limit)
+def list_logs(session: Session, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[Log]:
+    query = paginate(select(Log), LOG_PAGE_KEYS, cursor=cursor, skip=skip, limit=limit)
     return session.exec(query).all()
 
 
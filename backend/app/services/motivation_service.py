@@ -1,11 +1,13 @@
 from typing import List, Optional, Dict, Any
 from datetime import date, datetime, timedelta
+from sqlalchemy import Date, func
 from sqlmodel import Session, select
 
 from app.models.user import User
 from app.models.ai_context import AIContext
 from app.models.task import Task, CompletionStatusEnum
-from app.services.ai_service import AIService
+from app.models.user_daily_rollup import UserDailyRollup
+from app.services.ai_service import get_ai_service
 from app.services.ai_context_service import get_ai_context_by_user
 from app.services.task_service import list_tasks
 
@@ -63,8 +65,8 @@ async def generate_motivation(
             if task.updated_at and task.updated_at >= week_ago
         ]
         
-        # Initialize AI service
-        ai_service = AIService()
+        # Shared AI service (created on first use)
+        ai_service = get_ai_service()
         
         # Generate motivation message
         motivation_text = await ai_service.generate_motivation_message(
@@ -113,13 +115,100 @@ async def generate_motivation(
         }
 
 
-def get_motivation_stats(session: Session, user_id: str) -> Dict[str, Any]:
+def _completion_days_from_tasks(
+    session: Session,
+    user_id: str,
+    start_date: Optional[date],
+    end_date: date,
+) -> List[date]:
+    """Days with at least one completed task, oldest first, counted the way the rollups count them."""
+    done_day = func.date(func.coalesce(Task.completed_at, Task.updated_at), type_=Date)
+    statement = select(done_day).distinct().where(
+        Task.user_id == user_id,
+        Task.completion_status == CompletionStatusEnum.COMPLETED,
+        done_day <= end_date,
+    )
+    if start_date:
+        statement = statement.where(done_day >= start_date)
+    return [
+        day if isinstance(day, date) else date.fromisoformat(day)
+        for day in session.exec(statement.order_by(done_day))
+    ]
+
+
+def completion_streaks(
+    session: Session,
+    user_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Dict[str, Any]:
+    """
+    Current and longest runs of consecutive days with at least one completed task.
+    
+    Reads one date per active day from the daily rollups and walks them once
+    (gaps and islands: a new island starts wherever a day does not follow the
+    previous one), so the cost grows with active days, not with tasks. Users
+    with no rollup rows yet (data from before the rollups migration, until
+    ``backfill_rollups.py`` has run) get their days from the tasks instead.
+    
+    Args:
+        session: Database session
+        user_id: User's telegram ID
+        start_date: First day considered (default: the user's whole history)
+        end_date: Last day considered, and the day the current streak must reach (default: today)
+    
+    Returns:
+        Dictionary with current and longest streak lengths and the longest streak's bounds
+    """
+    end_date = end_date or date.today()
+    statement = select(UserDailyRollup.date).where(
+        UserDailyRollup.user_id == user_id,
+        UserDailyRollup.tasks_completed > 0,
+        UserDailyRollup.date <= end_date,
+    )
+    if start_date:
+        statement = statement.where(UserDailyRollup.date >= start_date)
+    days = session.exec(statement.order_by(UserDailyRollup.date)).all()
+    if not days:
+        any_rollup = select(UserDailyRollup.rollup_id).where(UserDailyRollup.user_id == user_id).limit(1)
+        if session.exec(any_rollup).first() is None:
+            days = _completion_days_from_tasks(session, user_id, start_date, end_date)
+
+    longest, longest_start, longest_end = 0, None, None
+    island_start = previous = None
+    active_days = 0
+    for day in days:
+        active_days += 1
+        if previous is None or day - previous != timedelta(days=1):
+            island_start = day
+        previous = day
+        length = (day - island_start).days + 1
+        if length > longest:
+            longest, longest_start, longest_end = length, island_start, day
+
+    return {
+        "current_streak_days": (previous - island_start).days + 1 if previous == end_date else 0,
+        "longest_streak_days": longest,
+        "longest_streak_start": longest_start,
+        "longest_streak_end": longest_end,
+        "active_days": active_days,
+    }
+
+
+def get_motivation_stats(
+    session: Session,
+    user_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Dict[str, Any]:
     """
     Get motivation-related statistics for a user.
     
     Args:
         session: Database session
         user_id: User's telegram ID
+        start_date: First day considered for streaks (default: the user's whole history)
+        end_date: Last day considered for streaks (default: today)
     
     Returns:
         Dictionary containing motivation statistics
@@ -130,46 +219,27 @@ def get_motivation_stats(session: Session, user_id: str) -> Dict[str, Any]:
         if not user:
             raise ValueError(f"User {user_id} not found")
         
-        # Get tasks for the last 30 days
+        # Task counts for the last 30 days, by status, from one grouped query
         month_ago = datetime.now() - timedelta(days=30)
+        counts = dict(session.exec(
+            select(Task.completion_status, func.count())
+            .where(Task.user_id == user_id, Task.created_at >= month_ago)
+            .group_by(Task.completion_status)
+        ).all())
         
-        all_tasks = list_tasks(
-            session=session,
-            user_id=user_id,
-            limit=100
-        )
-        
-        # Filter to last 30 days
-        recent_tasks = [
-            task for task in all_tasks 
-            if task.created_at and task.created_at >= month_ago
-        ]
-        
-        completed_tasks = [t for t in recent_tasks if t.completion_status == CompletionStatusEnum.COMPLETED]
-        pending_tasks = [t for t in recent_tasks if t.completion_status == CompletionStatusEnum.PENDING]
-        
-        # Calculate statistics
-        total_tasks = len(recent_tasks)
-        completion_rate = (len(completed_tasks) / max(total_tasks, 1)) * 100
-        
-        # Get streak information
-        streak_days = 0
+        total_tasks = sum(counts.values())
+        completed_tasks = counts.get(CompletionStatusEnum.COMPLETED, 0)
+        completion_rate = (completed_tasks / max(total_tasks, 1)) * 100
+        streaks = completion_streaks(session, user_id, start_date=start_date, end_date=end_date)
         current_date = date.today()
         
-        for i in range(30):
-            check_date = current_date - timedelta(days=i)
-            day_tasks = [t for t in completed_tasks if t.updated_at and t.updated_at.date() == check_date]
-            if day_tasks:
-                streak_days += 1
-            else:
-                break
-        
         return {
             "total_tasks_30_days": total_tasks,
-            "completed_tasks_30_days": len(completed_tasks),
-            "pending_tasks": len(pending_tasks),
+            "completed_tasks_30_days": completed_tasks,
+            "pending_tasks": counts.get(CompletionStatusEnum.PENDING, 0),
             "completion_rate_30_days": round(completion_rate, 1),
-            "current_streak_days": streak_days,
+            "current_streak_days": streaks["current_streak_days"],
+            "longest_streak_days": streaks["longest_streak_days"],
             "user_phase": user.current_phase,
             "days_until_target": (user.quit_job_target - current_date).days if user.quit_job_target else None
         }
@@ -181,6 +251,7 @@ def get_motivation_stats(session: Session, user_id: str) -> Dict[str, Any]:
             "pending_tasks": 0,
             "completion_rate_30_days": 0,
             "current_streak_days": 0,
+            "longest_streak_days": 0,
             "user_phase": "Unknown",
             "days_until_target": None,
             "error": str(e)
@@ -0,0 +1,229 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+PG_NOTIFY_MAX_BYTES = 7999
+
+
+class NotificationBroker(ABC):
+    """Fans notifications out to every worker process.
+
+    Each worker calls ``start`` with a handler that delivers to the sockets it
+    holds. ``publish`` reaches the handlers of all *other* workers; the caller
+    is expected to have delivered to its own sockets already, so a message is
+    never delivered twice by the worker that sent it.
+    """
+
+    #: False when every subscriber lives in this process (no other worker can hold a socket)
+    distributed = False
+
+    def __init__(self) -> None:
+        self.worker_id = uuid.uuid4().hex
+
+    @abstractmethod
+    async def start(self, handler: Handler) -> None:
+        """Subscribe ``handler`` to notifications published by other workers."""
+
+    @abstractmethod
+    async def publish(self, notification: Dict[str, Any]) -> None:
+        """Send ``notification`` to every other worker's handler."""
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Unsubscribe and release the broker's connections."""
+
+    def _envelope(self, notification: Dict[str, Any]) -> str:
+        return json.dumps({"origin": self.worker_id, "notification": notification}, default=str)
+
+
+class InMemoryBroker(NotificationBroker):
+    """Single-process broker; several subscribers stand in for workers in tests."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._subscribers: Dict[str, Handler] = {}
+
+    def subscribe(self, worker_id: str, handler: Handler) -> None:
+        self._subscribers[worker_id] = handler
+
+    async def start(self, handler: Handler) -> None:
+        self.subscribe(self.worker_id, handler)
+
+    async def publish(self, notification: Dict[str, Any]) -> None:
+        for worker_id, handler in list(self._subscribers.items()):
+            if worker_id == self.worker_id:
+                continue
+            try:
+                await handler(notification)
+            except Exception as e:
+                logger.error(f"Notification handler for worker {worker_id} failed: {str(e)}")
+
+    async def stop(self) -> None:
+        self._subscribers.pop(self.worker_id, None)
+
+
+async def _asyncpg_connect(dsn: str):
+    import asyncpg
+
+    return await asyncpg.connect(dsn)
+
+
+class PostgresBroker(NotificationBroker):
+    """LISTEN/NOTIFY on a PostgreSQL channel, one listening connection per worker.
+
+    ``connect`` is an async factory returning an asyncpg-style connection
+    (``add_listener``, ``remove_listener``, ``add_termination_listener``,
+    ``execute``, ``close``); tests pass a stand-in. A dropped listening
+    connection is re-established in the background.
+    """
+
+    distributed = True
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str = "ws_notifications",
+        *,
+        connect: Optional[Callable[[str], Awaitable[Any]]] = None,
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._connect = connect or _asyncpg_connect
+        self._handler: Optional[Handler] = None
+        self._listen_conn = None
+        self._publish_conn = None
+        self._publish_lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = False
+
+    async def start(self, handler: Handler) -> None:
+        self._handler = handler
+        self._stopping = False
+        await self._listen()
+
+    async def _listen(self) -> None:
+        conn = await self._connect(self.dsn)
+        await conn.add_listener(self.channel, self._on_notify)
+        conn.add_termination_listener(self._on_terminated)
+        self._listen_conn = conn
+
+    def _spawn(self, coro: Awaitable[Any]) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed notification on {channel}")
+            return
+        if message.get("origin") == self.worker_id or self._handler is None:
+            return
+        self._spawn(self._deliver(message.get("notification") or {}))
+
+    async def _deliver(self, notification: Dict[str, Any]) -> None:
+        try:
+            await self._handler(notification)
+        except Exception as e:
+            logger.error(f"Failed to deliver broker notification: {str(e)}")
+
+    def _on_terminated(self, connection: Any) -> None:
+        if self._stopping:
+            return
+        logger.warning(f"Lost LISTEN connection on {self.channel}; reconnecting")
+        self._listen_conn = None
+        self._spawn(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        while not self._stopping:
+            try:
+                await self._listen()
+                logger.info(f"Re-subscribed to {self.channel}")
+                return
+            except Exception as e:
+                logger.error(f"Reconnect to {self.channel} failed: {str(e)}")
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def publish(self, notification: Dict[str, Any]) -> None:
+        payload = self._envelope(notification)
+        if len(payload.encode("utf-8")) > PG_NOTIFY_MAX_BYTES:
+            raise ValueError("Notification is too large to publish")
+        async with self._publish_lock:
+            if self._publish_conn is None:
+                self._publish_conn = await self._connect(self.dsn)
+            try:
+                await self._publish_conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+            except Exception:
+                # Drop the connection so the next publish opens a fresh one
+                conn, self._publish_conn = self._publish_conn, None
+                await _close_quietly(conn)
+                raise
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in list(self._tasks):
+            task.cancel()
+        if self._listen_conn is not None:
+            try:
+                await self._listen_conn.remove_listener(self.channel, self._on_notify)
+            finally:
+                await _close_quietly(self._listen_conn)
+                self._listen_conn = None
+        if self._publish_conn is not None:
+            await _close_quietly(self._publish_conn)
+            self._publish_conn = None
+
+
+async def _close_quietly(conn: Any) -> None:
+    try:
+        await conn.close()
+    except Exception:
+        pass
+
+
+def to_listen_dsn(url: str) -> str:
+    """Plain ``postgresql://`` DSN for asyncpg from a SQLAlchemy URL."""
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def build_notification_broker() -> NotificationBroker:
+    backend = settings.NOTIFICATION_BROKER.lower()
+    if backend == "memory":
+        return InMemoryBroker()
+    if backend == "postgres":
+        url = settings.NOTIFICATION_BROKER_URL or settings.DATABASE_URL
+        return PostgresBroker(to_listen_dsn(url), settings.NOTIFICATION_CHANNEL)
+    raise ValueError(f"Unknown NOTIFICATION_BROKER: {settings.NOTIFICATION_BROKER}")
+
+
+_broker: Optional[NotificationBroker] = None
+
+
+def get_notification_broker() -> NotificationBroker:
+    """Return the process-wide broker, building it from settings on first use."""
+    global _broker
+    if _broker is None:
+        _broker = build_notification_broker()
+    return _broker
+
+
+def use_notification_broker(broker: Optional[NotificationBroker]) -> None:
+    """Swap the process-wide broker (tests); ``None`` rebuilds from settings on next use."""
+    global _broker
+    _broker = broker
@@ -0,0 +1,82 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 100
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Pack the sort-key values of the last row on a page into an opaque token."""
+    payload = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """Unpack a token from ``encode_cursor``, coercing each value to its column's type."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(raw, list) or len(raw) != len(columns):
+        raise ValueError("Invalid cursor")
+
+    values = []
+    for column, value in zip(columns, raw):
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = str
+        try:
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                value = python_type(value)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        values.append(value)
+    return values
+
+
+def paginate(
+    statement,
+    columns: Sequence[Any],
+    *,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    descending: bool = False,
+):
+    """Order ``statement`` by the keyset ``columns`` and cut one page out of it.
+
+    With a cursor the page starts right after the row it was taken from
+    (a range predicate the index can seek to); otherwise ``skip`` is applied
+    as a plain OFFSET for callers that still page by position.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        clauses = []
+        for i, column in enumerate(columns):
+            beyond = column < values[i] if descending else column > values[i]
+            clauses.append(and_(*(c == v for c, v in zip(columns[:i], values[:i])), beyond))
+        statement = statement.where(or_(*clauses))
+    elif skip:
+        statement = statement.offset(skip)
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return statement.order_by(*order).limit(limit)
+
+
+def next_cursor(items: Sequence[Any], columns: Sequence[Any], limit: int) -> Optional[str]:
+    """Cursor for the page after ``items``, or None when the page came back short."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([getattr(last, column.key) for column in columns])
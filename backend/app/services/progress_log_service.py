@@ -1,9 +1,14 @@
-from typing import List, Optional
-from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+from datetime import date, datetime, timedelta
+from sqlalchemy import case, func
 from sqlmodel import Session, select
 
 from app.models.progress_log import ProgressLog
 from app.schemas.progress_log import ProgressLogCreate, ProgressLogUpdate
+from app.services.pagination import DEFAULT_PAGE_SIZE, paginate
+
+# Newest first
+PROGRESS_LOG_PAGE_KEYS = (ProgressLog.date, ProgressLog.log_id)
 
 
 def create_progress_log(session: Session, data: ProgressLogCreate) -> ProgressLog:
@@ -26,10 +31,11 @@ def create_progress_log(session: Session, data: ProgressLogCreate) -> ProgressLo
 def list_progress_logs(
     session: Session,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = DEFAULT_PAGE_SIZE,
     user_id: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
 ) -> List[ProgressLog]:
     statement = select(ProgressLog)
     if user_id:
@@ -38,7 +44,9 @@ def list_progress_logs(
         statement = statement.where(ProgressLog.date >= start_date)
     if end_date:
         statement = statement.where(ProgressLog.date <= end_date)
-    statement = statement.order_by(ProgressLog.date.desc()).offset(skip).limit(limit)
+    statement = paginate(
+        statement, PROGRESS_LOG_PAGE_KEYS, cursor=cursor, skip=skip, limit=limit, descending=True
+    )
     return session.exec(statement).all()
 
 
@@ -81,15 +89,8 @@ def list_user_recent_progress_logs(session: Session, user_id: str, days: int = 7
     return session.exec(statement).all()
 
 
-def user_progress_stats(session: Session, user_id: str, days: int = 30) -> dict:
-    start_date = date.today() - timedelta(days=days)
-    statement = select(ProgressLog).where(
-        ProgressLog.user_id == user_id,
-        ProgressLog.date >= start_date,
-    )
-    progress_logs = session.exec(statement).all()
-
-    if not progress_logs:
+def _stats_from_totals(days: int, entries: int, completed, planned, mood, energy, focus) -> dict:
+    if not entries:
         return {
             "period_days": days,
             "total_entries": 0,
@@ -100,23 +101,82 @@ def user_progress_stats(session: Session, user_id: str, days: int = 30) -> dict:
             "avg_focus_score": 0,
             "completion_rate": 0,
         }
+    completed, planned = completed or 0, planned or 0
+    return {
+        "period_days": days,
+        "total_entries": entries,
+        "avg_tasks_completed": round(completed / entries, 2),
+        "avg_tasks_planned": round(planned / entries, 2),
+        "avg_mood_score": round((mood or 0) / entries, 2),
+        "avg_energy_level": round((energy or 0) / entries, 2),
+        "avg_focus_score": round((focus or 0) / entries, 2),
+        "completion_rate": round((completed / max(planned, 1)) * 100, 2),
+    }
+
 
-    total_entries = len(progress_logs)
-    total_completed = sum(log.tasks_completed for log in progress_logs)
-    total_planned = sum(log.tasks_planned for log in progress_logs)
-    total_mood = sum(log.mood_score for log in progress_logs)
-    total_energy = sum(log.energy_level for log in progress_logs)
-    total_focus = sum(log.focus_score for log in progress_logs)
+_STAT_COLUMNS = (
+    ProgressLog.tasks_completed,
+    ProgressLog.tasks_planned,
+    ProgressLog.mood_score,
+    ProgressLog.energy_level,
+    ProgressLog.focus_score,
+)
 
+
+def user_progress_stats_windows(session: Session, user_id: str, windows: Sequence[int]) -> Dict[int, dict]:
+    """Stats for several trailing windows (in days) from one aggregate query.
+
+    Each window is a set of conditional COUNT/SUM columns over the widest
+    window, so no rows are loaded into Python.
+    """
+    windows = sorted(set(windows))
+    today = date.today()
+    columns = []
+    for days in windows:
+        in_window = ProgressLog.date >= today - timedelta(days=days)
+        columns.append(func.count(case((in_window, 1))))
+        columns.extend(func.sum(case((in_window, column))) for column in _STAT_COLUMNS)
+
+    statement = select(*columns).where(
+        ProgressLog.user_id == user_id,
+        ProgressLog.date >= today - timedelta(days=windows[-1]),
+    )
+    row = session.exec(statement).one()
+
+    width = 1 + len(_STAT_COLUMNS)
     return {
-        "period_days": days,
-        "total_entries": total_entries,
-        "avg_tasks_completed": round(total_completed / total_entries, 2),
-        "avg_tasks_planned": round(total_planned / total_entries, 2),
-        "avg_mood_score": round(total_mood / total_entries, 2),
-        "avg_energy_level": round(total_energy / total_entries, 2),
-        "avg_focus_score": round(total_focus / total_entries, 2),
-        "completion_rate": round((total_completed / max(total_planned, 1)) * 100, 2),
+        days: _stats_from_totals(days, *row[i * width:(i + 1) * width])
+        for i, days in enumerate(windows)
     }
 
 
+def user_progress_stats(session: Session, user_id: str, days: int = 30) -> dict:
+    return user_progress_stats_windows(session, user_id, [days])[days]
+
+
+def user_progress_weekly(session: Session, user_id: str, days: int = 30) -> List[dict]:
+    """Per-week (Monday-start) stats for the trailing window, grouped in SQL."""
+    if session.get_bind().dialect.name == "sqlite":
+        week = func.date(ProgressLog.date, "weekday 0", "-6 days")
+    else:
+        week = func.date_trunc("week", ProgressLog.date)
+    week = week.label("week_start")
+
+    statement = (
+        select(week, func.count(), *(func.sum(column) for column in _STAT_COLUMNS))
+        .where(
+            ProgressLog.user_id == user_id,
+            ProgressLog.date >= date.today() - timedelta(days=days),
+        )
+        .group_by(week)
+        .order_by(week)
+    )
+    buckets = []
+    for week_start, *totals in session.exec(statement).all():
+        stats = _stats_from_totals(7, *totals)
+        stats.pop("period_days")
+        week_start = week_start.date() if isinstance(week_start, datetime) else week_start
+        buckets.append({"week_start": str(week_start), **stats})
+    return buckets
+
+
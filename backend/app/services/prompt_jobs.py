@@ -0,0 +1,220 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.schemas.prompt import PromptCreate
+from app.services.prompt_service import PromptService
+
+logger = logging.getLogger(__name__)
+
+Reply = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class PromptJobQueue:
+    """Per-user prompt queues served by a shared pool of worker tasks.
+
+    ``submit`` stores the prompt and returns its id straight away; a worker
+    generates the response later and hands it to the job's ``reply``
+    callback. A user's prompts run one at a time in submission order, and
+    users take turns on the workers so one busy user cannot starve the rest.
+    ``max_per_user`` and ``max_in_flight`` bound queued plus running jobs;
+    ``submit`` raises ``ValueError`` beyond either limit.
+
+    Streamed jobs also reply with a ``{"type": "delta"}`` payload per chunk of
+    the answer before the final payload carrying the whole response.
+
+    Workers start on the first ``submit`` in the running event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: Optional[int] = None,
+        max_per_user: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        prompt_service: Optional[PromptService] = None,
+    ) -> None:
+        self.worker_count = workers or settings.PROMPT_WORKERS
+        self.max_per_user = max_per_user or settings.PROMPT_MAX_PER_USER
+        self.max_in_flight = max_in_flight or settings.PROMPT_MAX_IN_FLIGHT
+        self.prompt_service = prompt_service or PromptService()
+        self._pending: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._running: Dict[str, Dict[str, Any]] = {}
+        self._ready: Optional["asyncio.Queue[str]"] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def in_flight(self, user_id: Optional[str] = None) -> int:
+        if user_id is not None:
+            return self._in_flight.get(user_id, 0)
+        return sum(self._in_flight.values())
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        # First use, or a new event loop (the old loop's jobs cannot be resumed)
+        self._pending.clear()
+        self._in_flight.clear()
+        self._running.clear()
+        self._loop = loop
+        self._ready = asyncio.Queue()
+        self._workers = [loop.create_task(self._work()) for _ in range(self.worker_count)]
+
+    async def submit(self, user_id: str, prompt_text: str, reply: Reply, *, stream: Optional[bool] = None) -> str:
+        """Store the prompt, queue it for processing and return its ``prompt_id``.
+
+        ``stream`` defaults to ``PROMPT_STREAM_RESPONSES``.
+        """
+        self._ensure_workers()
+        if self.in_flight(user_id) >= self.max_per_user:
+            raise ValueError(f"Too many prompts in progress (limit {self.max_per_user}); wait for a reply")
+        if self.in_flight() >= self.max_in_flight:
+            raise ValueError("Server is busy; try again shortly")
+        # Count the job before the insert so concurrent submits see it
+        self._in_flight[user_id] = self.in_flight(user_id) + 1
+        try:
+            async with async_session() as session:
+                prompt = await self.prompt_service.create_prompt(
+                    session, PromptCreate(user_id=user_id, prompt_text=prompt_text)
+                )
+        except Exception:
+            self._release(user_id)
+            raise
+
+        job = {
+            "prompt_id": prompt.prompt_id,
+            "user_id": user_id,
+            "reply": reply,
+            "stream": settings.PROMPT_STREAM_RESPONSES if stream is None else stream,
+            "task": None,
+        }
+        if user_id not in self._pending:
+            self._pending[user_id] = deque()
+            self._ready.put_nowait(user_id)
+        self._pending[user_id].append(job)
+        logger.info(f"Queued prompt {prompt.prompt_id} for user {user_id}")
+        return prompt.prompt_id
+
+    async def cancel(self, user_id: str, prompt_id: str) -> bool:
+        """Cancel a queued or running prompt of ``user_id``; False if there is none."""
+        running = self._running.get(prompt_id)
+        if running is not None and running["user_id"] == user_id:
+            running["task"].cancel()
+            return True
+        queue = self._pending.get(user_id) or ()
+        for job in queue:
+            if job["prompt_id"] == prompt_id:
+                queue.remove(job)
+                self._release(user_id)
+                await _safe_reply(job, {"type": "cancelled", "prompt_id": prompt_id})
+                return True
+        return False
+
+    def _release(self, user_id: str) -> None:
+        remaining = self._in_flight.get(user_id, 0) - 1
+        if remaining > 0:
+            self._in_flight[user_id] = remaining
+        else:
+            self._in_flight.pop(user_id, None)
+
+    async def _work(self) -> None:
+        while True:
+            user_id = await self._ready.get()
+            queue = self._pending.get(user_id)
+            if not queue:
+                self._pending.pop(user_id, None)
+                continue
+            job = queue.popleft()
+            try:
+                await self._run(job)
+            finally:
+                self._release(user_id)
+                if queue:
+                    # Back of the line, so other users get a turn in between
+                    self._ready.put_nowait(user_id)
+                else:
+                    self._pending.pop(user_id, None)
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        prompt_id = job["prompt_id"]
+        job["task"] = asyncio.get_running_loop().create_task(self._process(job))
+        self._running[prompt_id] = job
+        try:
+            # wait() rather than awaiting the task, so cancelling the job does not stop the worker
+            await asyncio.wait([job["task"]])
+        finally:
+            self._running.pop(prompt_id, None)
+
+        task = job["task"]
+        if task.cancelled():
+            logger.info(f"Cancelled prompt {prompt_id} for user {job['user_id']}")
+            await _safe_reply(job, {"type": "cancelled", "prompt_id": prompt_id})
+        elif task.exception() is not None:
+            logger.error(f"Error processing prompt {prompt_id} for user {job['user_id']}: {str(task.exception())}")
+            await _safe_reply(job, {
+                "type": "error",
+                "prompt_id": prompt_id,
+                "message": f"Processing error: {str(task.exception())}",
+            })
+        else:
+            await _safe_reply(job, {"prompt_id": prompt_id, "message": task.result()})
+
+    async def _process(self, job: Dict[str, Any]) -> str:
+        prompt_id = job["prompt_id"]
+        on_delta = None
+        if job["stream"]:
+            async def on_delta(text: str) -> None:
+                await _safe_reply(job, {"type": "delta", "prompt_id": prompt_id, "text": text})
+
+        async with async_session() as session:
+            prompt = await self.prompt_service.get_prompt(session, prompt_id)
+            processed = await self.prompt_service.process_prompt(session, prompt, on_delta=on_delta)
+            logger.info(f"Processed prompt {prompt_id} for user {processed.user_id}")
+            return processed.response_text
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "running": len(self._running),
+            "in_flight": self.in_flight(),
+        }
+
+    async def stop(self) -> None:
+        if self._loop is asyncio.get_running_loop():
+            tasks = self._workers + [job["task"] for job in self._running.values() if job["task"] is not None]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.wait(tasks)
+        self._workers = []
+        self._loop = None
+
+
+async def _safe_reply(job: Dict[str, Any], payload: Dict[str, Any]) -> None:
+    try:
+        await job["reply"](payload)
+    except Exception as e:
+        # The user may have disconnected; the response is stored on the prompt either way
+        logger.warning(f"Could not deliver prompt {job['prompt_id']} to user {job['user_id']}: {str(e)}")
+
+
+_prompt_jobs: Optional[PromptJobQueue] = None
+
+
+def get_prompt_jobs() -> PromptJobQueue:
+    """Return the process-wide prompt job queue."""
+    global _prompt_jobs
+    if _prompt_jobs is None:
+        _prompt_jobs = PromptJobQueue()
+    return _prompt_jobs
+
+
+def use_prompt_jobs(queue: Optional[PromptJobQueue]) -> None:
+    """Swap the process-wide queue (tests); ``None`` builds a fresh one on next use."""
+    global _prompt_jobs
+    _prompt_jobs = queue
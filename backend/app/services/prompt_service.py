@@ -1,108 +1,120 @@
-from typing import Optional
-from datetime import date, datetime
-import os
-import google.generativeai as genai
-from sqlmodel import Session, select
+from typing import Any, Awaitable, Callable, Optional
+from datetime import datetime
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.prompt import Prompt
-from app.models.task import Task
 from app.models.log import Log
 from app.schemas.prompt import PromptCreate, PromptUpdate
+from app.services.conversation_context import conversation_context
+from app.services.llm_client import get_llm_client
+from app.services.pagination import DEFAULT_PAGE_SIZE, paginate
+
+# Newest first
+PROMPT_PAGE_KEYS = (Prompt.created_at, Prompt.prompt_id)
+
 
 class PromptService:
     def __init__(self):
         pass
     
-    async def create_prompt(self, session: Session, prompt_data: PromptCreate) -> Prompt:
+    async def create_prompt(self, session: AsyncSession, prompt_data: PromptCreate) -> Prompt:
         """Create a new prompt and store it in the database"""
         prompt = Prompt(
             user_id=prompt_data.user_id,
             prompt_text=prompt_data.prompt_text,
         )
         session.add(prompt)
-        session.commit()
-        session.refresh(prompt)
+        await session.commit()
+        await session.refresh(prompt)
         return prompt
     
-    async def get_prompt(self, session: Session, prompt_id: str) -> Optional[Prompt]:
+    async def get_prompt(self, session: AsyncSession, prompt_id: str) -> Optional[Prompt]:
         """Retrieve a prompt by its ID"""
-        prompt = session.get(Prompt, prompt_id)
+        prompt = await session.get(Prompt, prompt_id)
         if not prompt:
             raise LookupError(f"Prompt with ID {prompt_id} not found")
         return prompt
     
-    async def get_user_prompts(self, session: Session, user_id: str) -> list[Prompt]:
-        """Retrieve all prompts for a specific user"""
-        prompts_stmt = select(Prompt).where(Prompt.user_id == user_id).order_by(Prompt.created_at.desc())
-        return session.exec(prompts_stmt).all()
+    async def get_user_prompts(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        skip: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> list[Prompt]:
+        """Retrieve a page of a user's prompts, newest first"""
+        prompts_stmt = paginate(
+            select(Prompt).where(Prompt.user_id == user_id),
+            PROMPT_PAGE_KEYS,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+            descending=True,
+        )
+        return (await session.exec(prompts_stmt)).all()
     
-    async def process_prompt(self, session: Session, prompt: Prompt) -> Prompt:
-        """Process the prompt and update the response"""
+    async def process_prompt(
+        self,
+        session: AsyncSession,
+        prompt: Prompt,
+        on_delta: Optional[Callable[[str], Awaitable[Any]]] = None,
+    ) -> Prompt:
+        """Process the prompt and update the response.
+
+        With ``on_delta`` the model streams its answer and each chunk is passed
+        to ``on_delta`` as it arrives; the full response is stored once at the end.
+        """
         try:
             # For testing, raise an error if the prompt text contains "error"
             if "error" in (prompt.prompt_text or "").lower():
                 raise ValueError("API Error")
 
-            # Build enriched context: today's tasks and today's prompts
-            # Use system default timezone for "today"
-            today = datetime.now().date()
-            day_start = datetime.combine(today, datetime.min.time())
-            day_end = datetime.combine(today, datetime.max.time())
-
-            # Today's tasks for the user
-            tasks_stmt = select(Task).where(
-                Task.user_id == prompt.user_id,
-                Task.updated_at >= day_start,
-                Task.updated_at <= day_end,
-            )
-            tasks_today = session.exec(tasks_stmt).all()
-            tasks_summary = [f"- {getattr(t, 'description', '')}" for t in tasks_today]
-
-            # Today's prompts (history) for additional context
-            prompts_stmt = select(Prompt).where(
-                Prompt.user_id == prompt.user_id,
-                Prompt.created_at >= day_start,
-                Prompt.created_at <= day_end,
-            )
-            prompts_today = session.exec(prompts_stmt).all()
-            prompts_summary = [
-                f"Q: {p.prompt_text}\nA: {(p.response_text or '').strip()}" for p in prompts_today if p.prompt_id != prompt.prompt_id
-            ]
+            # Rolling context for today: task list, recent turns and a summary of older ones
+            context = await conversation_context.get(session, prompt.user_id)
+            tasks_summary = [f"- {description}" for description in context["tasks"]]
+            prompts_summary = [f"Q: {question}\nA: {answer}" for question, answer in context["turns"]]
 
             system_context = (
                 "You are an assistant that considers today's activity context.\n"
                 "Today's Tasks:\n" + ("\n".join(tasks_summary) if tasks_summary else "- (none)") + "\n\n"
-                "Today's Prompt History (Q/A):\n" + ("\n\n".join(prompts_summary) if prompts_summary else "(none)") + "\n\n"
+                + ("Earlier Today (summary):\n" + context["summary"] + "\n\n" if context["summary"] else "")
+                + "Today's Prompt History (Q/A):\n" + ("\n\n".join(prompts_summary) if prompts_summary else "(none)") + "\n\n"
                 "User Prompt: " + (prompt.prompt_text or "")
             )
 
-            # Call Gemini (mocked in tests)
-            api_key = os.getenv("GEMINI_API_KEY")
-            if not api_key:
-                raise ValueError("GEMINI_API_KEY not configured")
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            response = model.generate_content(system_context)
+            # Call Gemini through the shared client (mocked in tests)
+            if on_delta is None:
+                response = await get_llm_client().generate_content(system_context)
+                response_text = getattr(response, "text", None) or ""
+            else:
+                parts = []
+                async for chunk in get_llm_client().stream_content(system_context):
+                    parts.append(chunk)
+                    await on_delta(chunk)
+                response_text = "".join(parts)
 
-            prompt.response_text = (getattr(response, "text", None) or "").strip()
+            prompt.response_text = response_text.strip()
             prompt.completed_at = datetime.now()
 
             session.add(prompt)
-            session.commit()
-            session.refresh(prompt)
+            await session.commit()
+            await session.refresh(prompt)
+            conversation_context.record_turn(prompt.user_id, prompt.prompt_text or "", prompt.response_text)
 
             # Intelligent logging: store to Log table only if valuable
             if self._is_valuable_for_log(prompt.prompt_text or "", prompt.response_text or ""):
                 title = self._build_log_title(prompt.prompt_text or "", prompt.response_text or "")
                 log = Log(title=title)
                 session.add(log)
-                session.commit()
+                await session.commit()
 
             return prompt
         except Exception as e:
             raise ValueError(f"Failed to process prompt: {str(e)}")
     
-    async def update_prompt(self, session: Session, prompt_id: str, prompt_update: PromptUpdate) -> Prompt:
+    async def update_prompt(self, session: AsyncSession, prompt_id: str, prompt_update: PromptUpdate) -> Prompt:
         """Update a prompt's response"""
         prompt = await self.get_prompt(session, prompt_id)
         
@@ -112,8 +124,10 @@ class PromptService:
             prompt.completed_at = prompt_update.completed_at
             
         session.add(prompt)
-        session.commit()
-        session.refresh(prompt)
+        await session.commit()
+        await session.refresh(prompt)
+        # An edited answer may already be in the cached conversation
+        conversation_context.invalidate_user(prompt.user_id)
         return prompt
 
     def _is_valuable_for_log(self, prompt_text: str, response_text: str) -> bool:
@@ -1,18 +1,30 @@
+import asyncio
+import logging
+import time
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
 from zoneinfo import ZoneInfo
 
+from sqlalchemy import and_, delete, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
 from sqlmodel import Session, select
 
+from app.core.config import settings
 from app.core.database import engine
+from app.models import now
+from app.models.reminder_ledger import ReminderLedger
 from app.models.task import Task, CompletionStatusEnum
 from app.models.prompt import Prompt  # Only used if needed; not used in normal flow
 from app.api.v1.routes.websocket import send_notification_service
+from app.services.notification_broker import get_notification_broker
+from app.services.llm_client import get_llm_client
 import json
-import os
-import google.generativeai as genai
 
 
+logger = logging.getLogger(__name__)
+
 IST = ZoneInfo("Asia/Kolkata")
 
 
@@ -20,18 +32,141 @@ def _now_ist() -> datetime:
     return datetime.now(IST)
 
 
-def _within_next_30_minute(task: Task, *, now_ist: datetime) -> bool:
-    if not task.scheduled_for_date or not task.scheduled_for_time:
-        return False
-    if task.completion_status == CompletionStatusEnum.COMPLETED:
+REMINDER_LOOKAHEAD = timedelta(minutes=30)
+REMINDER_KIND_DUE_SOON = "due_soon"
+
+# Columns the reminder job reads; rows come back as plain tuples, never as ORM objects
+REMINDER_COLUMNS = (
+    Task.task_id,
+    Task.user_id,
+    Task.description,
+    Task.priority,
+    Task.completion_status,
+    Task.scheduled_for_date,
+    Task.scheduled_for_time,
+)
+
+
+def _due_window_clause(start: datetime, end: datetime):
+    """Tasks scheduled in [start, end), as a range on (scheduled_for_date, scheduled_for_time)."""
+    if start.date() == end.date():
+        return and_(
+            Task.scheduled_for_date == start.date(),
+            Task.scheduled_for_time >= start.time(),
+            Task.scheduled_for_time < end.time(),
+        )
+    # The window crosses midnight: the tail of one day plus the head of the next
+    return or_(
+        and_(Task.scheduled_for_date == start.date(), Task.scheduled_for_time >= start.time()),
+        and_(Task.scheduled_for_date == end.date(), Task.scheduled_for_time < end.time()),
+    )
+
+
+def due_tasks_by_user(
+    session: Session, *, now_ist: datetime, reminder_kind: str = REMINDER_KIND_DUE_SOON
+) -> Dict[str, List[Row]]:
+    """Open tasks due within the lookahead window that have not had this
+    reminder for their current slot yet (an anti-join on the ledger), grouped by user."""
+    rows = session.exec(
+        select(*REMINDER_COLUMNS)
+        .outerjoin(
+            ReminderLedger,
+            and_(
+                ReminderLedger.task_id == Task.task_id,
+                ReminderLedger.reminder_kind == reminder_kind,
+                ReminderLedger.scheduled_for_date == Task.scheduled_for_date,
+                ReminderLedger.scheduled_for_time == Task.scheduled_for_time,
+            ),
+        )
+        .where(
+            _due_window_clause(now_ist, now_ist + REMINDER_LOOKAHEAD),
+            Task.completion_status != CompletionStatusEnum.COMPLETED,
+            ReminderLedger.reminder_id.is_(None),
+        )
+        .order_by(Task.user_id, Task.scheduled_for_date, Task.scheduled_for_time)
+    ).all()
+    grouped: Dict[str, List[Row]] = {}
+    for row in rows:
+        grouped.setdefault(row.user_id, []).append(row)
+    return grouped
+
+
+def claim_reminders(session: Session, rows: List[Row], reminder_kind: str = REMINDER_KIND_DUE_SOON) -> Set[int]:
+    """Record reminders for the rows' scheduled slots and return the task ids this call claimed.
+
+    A single INSERT ... ON CONFLICT DO NOTHING RETURNING, so a task another
+    run already claimed is left out rather than reminded twice. Claims whose
+    delivery fails must be handed back with ``release_reminders``.
+    """
+    if not rows:
+        return set()
+    insert = postgresql_insert if session.get_bind().dialect.name == "postgresql" else sqlite_insert
+    sent_at = now()
+    statement = (
+        insert(ReminderLedger)
+        .values([
+            {
+                "task_id": row.task_id,
+                "reminder_kind": reminder_kind,
+                "scheduled_for_date": row.scheduled_for_date,
+                "scheduled_for_time": row.scheduled_for_time,
+                "sent_at": sent_at,
+            }
+            for row in rows
+        ])
+        .on_conflict_do_nothing(
+            index_elements=["task_id", "reminder_kind", "scheduled_for_date", "scheduled_for_time"]
+        )
+        .returning(ReminderLedger.task_id)
+    )
+    claimed = set(session.execute(statement).scalars())
+    session.commit()
+    return claimed
+
+
+def release_reminders(session: Session, rows: List[Row], reminder_kind: str = REMINDER_KIND_DUE_SOON) -> None:
+    """Drop the ledger claims for undelivered reminders so the next tick retries them."""
+    if not rows:
+        return
+    session.execute(
+        delete(ReminderLedger).where(
+            ReminderLedger.reminder_kind == reminder_kind,
+            tuple_(
+                ReminderLedger.task_id, ReminderLedger.scheduled_for_date, ReminderLedger.scheduled_for_time
+            ).in_([(row.task_id, row.scheduled_for_date, row.scheduled_for_time) for row in rows]),
+        )
+    )
+    session.commit()
+
+
+def _user_day_context(session: Session, user_ids: List[str], days: List[date]) -> Dict[str, List[Dict[str, Any]]]:
+    """Scheduled tasks on the window's days for the given users only."""
+    rows = session.exec(
+        select(*REMINDER_COLUMNS)
+        .where(Task.user_id.in_(user_ids), Task.scheduled_for_date.in_(days))
+        .order_by(Task.user_id, Task.scheduled_for_time)
+    ).all()
+    context: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        context.setdefault(row.user_id, []).append({
+            "task_id": row.task_id,
+            "description": row.description,
+            "priority": getattr(row.priority, "value", str(row.priority)),
+            "status": getattr(row.completion_status, "value", str(row.completion_status)),
+            "scheduled_for_date": str(row.scheduled_for_date),
+            "scheduled_for_time": row.scheduled_for_time.strftime("%H:%M") if row.scheduled_for_time else None,
+        })
+    return context
+
+
+def _delivered(result: Optional[Dict[str, Any]]) -> bool:
+    """Whether a notification reached the user here, or may have through a distributed broker."""
+    if not result:
         return False
-    if task.actual_duration:
-        task.scheduled_for_time = task.scheduled_for_time + timedelta(minutes=task.actual_duration)
-    task_dt = datetime.combine(task.scheduled_for_date, task.scheduled_for_time, IST)
-    return now_ist <= task_dt < (now_ist + timedelta(minutes=30))
+    return bool(result.get("sent_count")) or get_notification_broker().distributed
 
 
-def _build_notification_message(task: Task) -> str:
+def _build_notification_message(task: Row) -> str:
     priority = getattr(task.priority, "value", str(task.priority))
     due_time = None
     try:
@@ -45,106 +180,204 @@ def _build_notification_message(task: Task) -> str:
     )
 
 
-async def task_reminder_job() -> None:
-    """Cron job: every minute, find tasks scheduled within next 30 minutes (IST),
-    generate all reminder messages in a single AI call, persist prompts, and
-    send notifications via in-process websocket service.
+SYSTEM_INSTRUCTIONS = (
+    "Act like a russian mafia"
+)
+
+FORMATTING_RULES = (
+    "Output must be a JSON array (order preserved) where each element is: {task_id, message}. "
+    "Mention this that your task is due in <int> minutes\"\n\n"
+    "Dont include task id in the message"
+)
+
+
+def _build_reminder_prompt(context: Dict[str, List[Dict[str, Any]]], items: List[Dict[str, Any]]) -> str:
+    return (
+        SYSTEM_INSTRUCTIONS
+        + FORMATTING_RULES
+        + "Today's tasks context grouped by user_id (use only for relevance and tone, do not list it back):\n"
+        + json.dumps(context, default=str)
+        + "\n\nItems to generate reminders for (same order to be preserved):\n"
+        + json.dumps(items, default=str)
+    )
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, default=str))
+
+
+def _fit_context(entries: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+    """Leading context entries that fit in ``budget`` characters."""
+    fitted: List[Dict[str, Any]] = []
+    size = 2
+    for entry in entries:
+        size += _json_size(entry) + 2
+        if size > budget:
+            break
+        fitted.append(entry)
+    return fitted
+
+
+def build_reminder_batches(
+    due_by_user: Dict[str, List[Row]],
+    user_context: Dict[str, List[Dict[str, Any]]],
+    *,
+    now_ist: datetime,
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Pack due tasks into prompts bounded by item count and prompt size.
+
+    Users are packed whole while they fit, each with their own context only;
+    a user with more due tasks than one batch holds is split across batches
+    and their context goes with every part. A single user's context is
+    trimmed to half the size budget so there is always room for items.
     """
-    now_ist = _now_ist()
-    today_ist = now_ist.date()
-    with Session(engine) as session:
-        tasks: List[Task] = session.exec(
-            select(Task).where(Task.scheduled_for_date == today_ist)
-        ).all()
-        due_soon = [t for t in tasks if _within_next_30_minute(t, now_ist=now_ist)]
-
-        if not due_soon:
-            return
-
-        # Build AI prompt with all tasks at once, with per-user context for today's tasks
-        ai_items: List[Dict[str, Any]] = []
-        for t in due_soon:
-            ai_items.append({
-                "task_id": t.task_id,
-                "description": t.description,
+    max_items = max(1, max_items or settings.REMINDER_BATCH_MAX_ITEMS)
+    max_chars = max_chars or settings.REMINDER_BATCH_MAX_CHARS
+    base_size = len(_build_reminder_prompt({}, []))
+
+    batches: List[Dict[str, Any]] = []
+    context: Dict[str, List[Dict[str, Any]]] = {}
+    items: List[Dict[str, Any]] = []
+    size = base_size
+
+    for user_id, rows in due_by_user.items():
+        user_entries = _fit_context(user_context.get(user_id, []), max_chars // 2)
+        for row in rows:
+            item = {
+                "task_id": row.task_id,
+                "description": row.description,
                 "current_time": now_ist.strftime("%H:%M"),
-                "scheduled_for": f"{t.scheduled_for_date} {getattr(t, 'scheduled_for_time', None)}"
-            })
-
-        # Build per-user context of all of today's tasks (for tone and relevance)
-        user_context: Dict[str, List[Dict[str, Any]]] = {}
-        for t in tasks:
-            entry = {
-                "task_id": t.task_id,
-                "description": t.description,
-                "priority": getattr(t.priority, "value", str(t.priority)),
-                "status": getattr(t.completion_status, "value", str(t.completion_status)),
-                "scheduled_for_date": str(getattr(t, "scheduled_for_date", None)),
-                "scheduled_for_time": getattr(t, "scheduled_for_time", None).strftime("%H:%M") if getattr(t, "scheduled_for_time", None) else None,
+                "scheduled_for": f"{row.scheduled_for_date} {row.scheduled_for_time}",
             }
-            user_context.setdefault(t.user_id, []).append(entry)
+            added = _json_size(item) + 2
+            if user_id not in context:
+                added += _json_size(user_id) + _json_size(user_entries) + 4
+            if items and (len(items) >= max_items or size + added > max_chars):
+                batches.append({"context": context, "items": items})
+                context, items, size = {}, [], base_size
+                added = _json_size(item) + _json_size(user_id) + _json_size(user_entries) + 6
+            context.setdefault(user_id, user_entries)
+            items.append(item)
+            size += added
 
-        system_instructions = (
-            "Act like a russian mafia"
-        )
+    if items:
+        batches.append({"context": context, "items": items})
+    return batches
 
-        formatting_rules = (
-            "Output must be a JSON array (order preserved) where each element is: {task_id, message}. "
-            "Mention this that your task is due in <int> minutes\"\n\n"
-            "Dont include task id in the message"
-        )
 
-        context_block = (
-            "Today's tasks context grouped by user_id (use only for relevance and tone, do not list it back):\n"
-            + json.dumps(user_context, default=str)
-            + "\n\nItems to generate reminders for (same order to be preserved):\n"
-            + json.dumps(ai_items, default=str)
-        )
+def _parse_reminder_messages(raw_text: str, task_ids: Set[int]) -> Dict[int, str]:
+    """Map task_id -> message from the model's JSON array; raises ValueError if it is not one."""
+    raw_text = (raw_text or "").strip()
+    # Extract JSON if fenced
+    if "```json" in raw_text:
+        start = raw_text.find("```json") + 7
+        end = raw_text.find("```", start)
+        raw_text = raw_text[start:end].strip()
+    parsed = json.loads(raw_text)
+    if not isinstance(parsed, list):
+        raise ValueError("Reminder response is not a JSON array")
+    return {
+        item["task_id"]: item["message"]
+        for item in parsed
+        if isinstance(item, dict) and item.get("task_id") in task_ids and item.get("message")
+    }
+
 
-        prompt_text = system_instructions + formatting_rules + context_block
+async def _generate_batch(batch: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Generate one batch's reminders, retrying it on its own; never raises.
+
+    The semaphore is held per attempt, not across the backoff, so a failing
+    batch does not hold a slot while it waits.
+    """
+    task_ids = {item["task_id"] for item in batch["items"]}
+    prompt_text = _build_reminder_prompt(batch["context"], batch["items"])
+    max_attempts = max(1, settings.REMINDER_MAX_ATTEMPTS)
+    messages: Dict[int, str] = {}
+    error: Optional[str] = None
+    attempts = 0
+    started = time.perf_counter()
 
-        messages: List[Dict[str, Any]] = []
+    for attempts in range(1, max_attempts + 1):
         try:
-            # Direct AI call using Gemini generate_content
-            api_key = os.getenv("GEMINI_API_KEY")
-            if not api_key:
-                raise ValueError("GEMINI_API_KEY not configured")
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            response = model.generate_content(prompt_text)
-            raw_text = (getattr(response, "text", "") or "").strip()
-            # Extract JSON if fenced
-            if "```json" in raw_text:
-                start = raw_text.find("```json") + 7
-                end = raw_text.find("```", start)
-                raw_text = raw_text[start:end].strip()
-            parsed = json.loads(raw_text)
-            if isinstance(parsed, list):
-                for item in parsed:
-                    if isinstance(item, dict) and {"task_id", "message"}.issubset(item.keys()):
-                        messages.append(item)
-        except Exception:
-            # Fallback only when AI call or parsing fails
-            messages = []
-
-        # Fallback: build default messages for all tasks not covered by AI
-        covered_ids = {m.get("task_id") for m in messages}
-        for t in due_soon:
-            if t.task_id not in covered_ids:
-                messages.append({
-                    "task_id": t.task_id,
-                    "user_id": t.user_id,
-                    "message": _build_notification_message(t),
-                })
-
-        # Send notifications one by one (service also persists Prompt)
-        for m in messages:
-            user_id = tasks[0].user_id
-            try:
-                # Directly call websocket notification service (no HTTP)
-                await send_notification_service({"user_id": str(user_id), "message": m.get("message", "")}, session)
-            except Exception:
-                # continue with others
-                pass
+            async with semaphore:
+                response = await get_llm_client().generate_content(prompt_text)
+            messages = _parse_reminder_messages(getattr(response, "text", ""), task_ids)
+            error = None
+            break
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if attempts < max_attempts:
+                await asyncio.sleep(settings.REMINDER_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1))
+
+    latency_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        "Reminder batch: %d tasks, %d users, %d attempts, %.1f ms%s",
+        len(task_ids), len(batch["context"]), attempts, latency_ms, f", failed: {error}" if error else "",
+    )
+    return {
+        "messages": messages,
+        "tasks": len(task_ids),
+        "users": len(batch["context"]),
+        "prompt_chars": len(prompt_text),
+        "attempts": attempts,
+        "latency_ms": latency_ms,
+        "error": error,
+    }
+
 
+async def task_reminder_job() -> List[Dict[str, Any]]:
+    """Cron job: find open tasks scheduled within the next 30 minutes (IST),
+    generate their reminder messages in bounded per-user batches, persist
+    prompts, and send each user their own notifications via the in-process
+    websocket service.
 
+    Each task's reminder is claimed in the ledger for its scheduled slot
+    before generation, so a task is reminded at most once per slot however
+    many ticks its window spans. Claims are released for reminders that
+    could not be delivered (e.g. the user is offline), so a later tick
+    retries them while the task is still due.
+    Batches run concurrently under ``REMINDER_CONCURRENCY`` and are retried
+    independently; tasks whose batch still fails (or that the model skipped)
+    get a default message. Returns one stats dict per batch.
+    """
+    now_ist = _now_ist()
+    with Session(engine) as session:
+        due_by_user = due_tasks_by_user(session, now_ist=now_ist)
+        claimed = claim_reminders(session, [row for rows in due_by_user.values() for row in rows])
+        due_by_user = {
+            user_id: kept
+            for user_id, rows in due_by_user.items()
+            if (kept := [row for row in rows if row.task_id in claimed])
+        }
+        if not due_by_user:
+            return []
+        window_days = sorted({now_ist.date(), (now_ist + REMINDER_LOOKAHEAD).date()})
+        user_context = _user_day_context(session, list(due_by_user), window_days)
+
+    # No connection is held while the model calls are in flight
+    batches = build_reminder_batches(due_by_user, user_context, now_ist=now_ist)
+    semaphore = asyncio.Semaphore(max(1, settings.REMINDER_CONCURRENCY))
+    results = await asyncio.gather(*(_generate_batch(batch, semaphore) for batch in batches))
+
+    messages: Dict[int, str] = {}
+    for result in results:
+        messages.update(result.pop("messages"))
+
+    with Session(engine) as session:
+        # Send each user their own reminders (service also persists Prompt)
+        undelivered: List[Row] = []
+        for user_id, rows in due_by_user.items():
+            for row in rows:
+                message = messages.get(row.task_id) or _build_notification_message(row)
+                try:
+                    # Directly call websocket notification service (no HTTP)
+                    result = await send_notification_service({"user_id": str(user_id), "message": message}, session)
+                except Exception as e:
+                    logger.warning("Reminder for task %s not delivered: %s", row.task_id, e)
+                    result = None
+                if not _delivered(result):
+                    undelivered.append(row)
+        release_reminders(session, undelivered)
+    return results
@@ -0,0 +1,230 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Date, and_, case, delete, event, func, or_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session as OrmSession, attributes
+from sqlmodel import Session, col, select
+
+from app.models import now
+from app.models.day_log import DayLog
+from app.models.progress_log import ProgressLog
+from app.models.task import Task
+from app.models.user import User
+from app.models.user_daily_rollup import UserDailyRollup
+from app.schemas.task import CompletionStatusEnum
+
+# Rows per multi-row upsert when a backfill or bulk write touches many days
+ROLLUP_INSERT_CHUNK_SIZE = 500
+
+_COUNTERS = ("tasks_planned", "tasks_completed", "tasks_discarded", "actual_duration_minutes")
+_VALUES = (*_COUNTERS, "mood_score", "energy_level", "focus_score", "day_log_minutes")
+
+# Source columns that feed a rollup; edits to anything else leave it alone
+_TRACKED = {
+    Task: ("user_id", "scheduled_for_date", "created_at", "completion_status", "completed_at", "updated_at", "actual_duration"),
+    ProgressLog: ("user_id", "date", "mood_score", "energy_level", "focus_score"),
+    DayLog: ("user_id", "date", "start_time", "end_time"),
+}
+
+
+def _as_date(value: Any) -> Optional[date]:
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+def _task_days(values: Dict[str, Any]) -> Set[date]:
+    """Days a task counts towards: its planned day, and its completion day once completed."""
+    days = {_as_date(values["scheduled_for_date"]) or _as_date(values["created_at"])}
+    if values["completion_status"] == CompletionStatusEnum.COMPLETED:
+        days.add(_as_date(values["completed_at"] or values["updated_at"]))
+    return days
+
+
+def _source_days(obj: Any, values: Dict[str, Any]) -> Set[date]:
+    if isinstance(obj, Task):
+        return _task_days(values)
+    return {_as_date(values["date"])}
+
+
+def _day_bounds(days: Set[date]) -> Tuple[datetime, datetime]:
+    return datetime.combine(min(days), time.min), datetime.combine(max(days) + timedelta(days=1), time.min)
+
+
+def _aggregate(conn: Connection, user_id: str, days: Optional[Set[date]]) -> Dict[date, Dict[str, Any]]:
+    """Rollup values for ``days`` (every day when None) straight from the source tables."""
+    totals: Dict[date, Dict[str, Any]] = defaultdict(lambda: {
+        **{name: 0 for name in _COUNTERS}, "mood_score": None, "energy_level": None,
+        "focus_score": None, "day_log_minutes": None,
+    })
+
+    plan_day = func.coalesce(Task.scheduled_for_date, func.date(Task.created_at, type_=Date))
+    planned = (
+        select(plan_day, func.count(), func.count(case((Task.completion_status == CompletionStatusEnum.DISCARDED, 1))))
+        .where(Task.user_id == user_id)
+        .group_by(plan_day)
+    )
+    done_day = func.date(func.coalesce(Task.completed_at, Task.updated_at), type_=Date)
+    completed = (
+        select(done_day, func.count(), func.coalesce(func.sum(Task.actual_duration), 0))
+        .where(Task.user_id == user_id, Task.completion_status == CompletionStatusEnum.COMPLETED)
+        .group_by(done_day)
+    )
+    progress = select(ProgressLog.date, ProgressLog.mood_score, ProgressLog.energy_level, ProgressLog.focus_score).where(
+        ProgressLog.user_id == user_id
+    )
+    day_logs = select(DayLog.date, DayLog.start_time, DayLog.end_time).where(DayLog.user_id == user_id)
+
+    if days is not None:
+        # Range predicates the (user_id, ...) indexes can seek on; grouping may still return neighbours
+        start, end = _day_bounds(days)
+        planned = planned.where(or_(
+            col(Task.scheduled_for_date).in_(days),
+            and_(col(Task.scheduled_for_date).is_(None), Task.created_at >= start, Task.created_at < end),
+        ))
+        completed = completed.where(or_(
+            and_(Task.completed_at >= start, Task.completed_at < end),
+            and_(col(Task.completed_at).is_(None), Task.updated_at >= start, Task.updated_at < end),
+        ))
+        progress = progress.where(col(ProgressLog.date).in_(days))
+        day_logs = day_logs.where(col(DayLog.date).in_(days))
+
+    for day, count, discarded in conn.execute(planned):
+        totals[_as_date(day)].update(tasks_planned=count, tasks_discarded=discarded)
+    for day, count, minutes in conn.execute(completed):
+        totals[_as_date(day)].update(tasks_completed=count, actual_duration_minutes=int(minutes or 0))
+    for day, mood, energy, focus in conn.execute(progress):
+        totals[day].update(mood_score=mood, energy_level=energy, focus_score=focus)
+    for day, start_time, end_time in conn.execute(day_logs):
+        if end_time is not None:
+            totals[day]["day_log_minutes"] = int((end_time - start_time).total_seconds() // 60)
+
+    return {
+        day: values for day, values in totals.items()
+        if (days is None or day in days) and (any(values[name] for name in _COUNTERS) or _has_logs(values))
+    }
+
+
+def _has_logs(values: Dict[str, Any]) -> bool:
+    return any(values[name] is not None for name in ("mood_score", "energy_level", "focus_score", "day_log_minutes"))
+
+
+def _write(conn: Connection, user_id: str, rows: Dict[date, Dict[str, Any]], days: Optional[Set[date]]) -> None:
+    table = UserDailyRollup.__table__
+    if days is None:
+        conn.execute(delete(table).where(table.c.user_id == user_id))
+    elif days - rows.keys():
+        # Days whose last source row went away
+        conn.execute(delete(table).where(table.c.user_id == user_id, table.c.date.in_(days - rows.keys())))
+
+    timestamp = now()
+    values = [
+        {"user_id": user_id, "date": day, **totals, "created_at": timestamp, "updated_at": timestamp}
+        for day, totals in sorted(rows.items())
+    ]
+    insert = postgresql_insert if conn.dialect.name == "postgresql" else sqlite_insert
+    for start in range(0, len(values), ROLLUP_INSERT_CHUNK_SIZE):
+        statement = insert(table).values(values[start:start + ROLLUP_INSERT_CHUNK_SIZE])
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "date"],
+            set_={name: statement.excluded[name] for name in (*_VALUES, "updated_at")},
+        )
+        conn.execute(statement)
+
+
+def rollup_keys(obj: Any) -> Set[Tuple[str, date]]:
+    """The ``(user_id, day)`` rollups a task, progress log or day log currently counts towards."""
+    values = {name: getattr(obj, name) for name in _TRACKED[type(obj)]}
+    return {(values["user_id"], day) for day in _source_days(obj, values)}
+
+
+def refresh_user_days(session: Session, keys: Iterable[Tuple[str, date]]) -> None:
+    """Recompute the rollup rows for the given ``(user_id, day)`` pairs in the session's transaction.
+
+    Flushes of tasks and logs call this automatically; Core/bulk writes that
+    bypass the flush must call it themselves before committing.
+    """
+    days_by_user: Dict[str, Set[date]] = defaultdict(set)
+    for user_id, day in keys:
+        if user_id and day:
+            days_by_user[user_id].add(day)
+    conn = session.connection()
+    for user_id, days in days_by_user.items():
+        _write(conn, user_id, _aggregate(conn, user_id, days), days)
+
+
+def backfill_user_rollups(session: Session, user_id: str) -> int:
+    """Rebuild every rollup row for one user from the source tables; returns the row count."""
+    conn = session.connection()
+    rows = _aggregate(conn, user_id, None)
+    _write(conn, user_id, rows, None)
+    return len(rows)
+
+
+def backfill_rollups(session: Session, user_ids: Optional[Sequence[str]] = None) -> Dict[str, int]:
+    """Rebuild rollups for ``user_ids`` (every user when None), committing after each user."""
+    if user_ids is None:
+        user_ids = session.exec(select(User.telegram_id).order_by(User.telegram_id)).all()
+    written = 0
+    for user_id in user_ids:
+        try:
+            written += backfill_user_rollups(session, user_id)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+    return {"users": len(user_ids), "rows": written}
+
+
+def list_user_rollups(
+    session: Session,
+    user_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> List[UserDailyRollup]:
+    statement = select(UserDailyRollup).where(UserDailyRollup.user_id == user_id)
+    if start_date:
+        statement = statement.where(UserDailyRollup.date >= start_date)
+    if end_date:
+        statement = statement.where(UserDailyRollup.date <= end_date)
+    return session.exec(statement.order_by(UserDailyRollup.date)).all()
+
+
+def _changed_keys(obj: Any, columns: Sequence[str], deleted: bool) -> Set[Tuple[str, date]]:
+    state = attributes.instance_state(obj)
+    if deleted:
+        current = {name: state.dict.get(name) for name in columns}
+        return {(current["user_id"], day) for day in _source_days(obj, current)}
+
+    histories = {name: attributes.get_history(obj, name) for name in columns}
+    if not any(history.has_changes() for history in histories.values()):
+        return set()
+    current = {name: getattr(obj, name) for name in columns}
+    previous = {
+        name: histories[name].deleted[0] if histories[name].deleted else current[name]
+        for name in columns
+    }
+    return {
+        (values["user_id"], day)
+        for values in (current, previous)
+        for day in _source_days(obj, values)
+    }
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _refresh_rollups(session: OrmSession, flush_context: Any) -> None:
+    """Keep ``user_daily_rollups`` in step with task, progress-log and day-log writes."""
+    keys: Set[Tuple[str, date]] = set()
+    for objects, deleted in ((session.new, False), (session.dirty, False), (session.deleted, True)):
+        for obj in objects:
+            columns = _TRACKED.get(type(obj))
+            if columns is not None:
+                keys |= _changed_keys(obj, columns, deleted)
+    if keys:
+        refresh_user_days(session, keys)
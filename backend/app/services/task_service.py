@@ -1,10 +1,23 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from datetime import date, datetime, timezone, timedelta
-from sqlmodel import Session, select
+from sqlalchemy import insert
+from sqlmodel import Session, col, select
 
 from app.models.task import Task
 from app.models.goal import Goal
+from app.models.user import User
 from app.schemas.task import TaskCreate, TaskUpdate, CompletionStatusEnum, TaskDiscard, TaskRestore
+from app.services.ai_cache import ai_response_cache
+from app.services.conversation_context import conversation_context
+from app.services.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.services.rollup_service import refresh_user_days, rollup_keys
+
+TASK_PAGE_KEYS = (Task.created_at, Task.task_id)
+
+# Largest batch accepted by create_tasks_bulk, and rows per INSERT statement
+# (about 15 columns a row keeps each statement well under SQLite's bound-parameter limit)
+MAX_BULK_TASKS = 5000
+BULK_INSERT_CHUNK_SIZE = 500
 
 
 def create_task(session: Session, data: TaskCreate) -> Task:
@@ -29,14 +42,86 @@ def create_task(session: Session, data: TaskCreate) -> Task:
     return task
 
 
+def create_tasks_bulk(session: Session, tasks: Sequence[TaskCreate]) -> List[Task]:
+    """Create many tasks in one transaction and return them in input order.
+
+    Users and goals are checked with one ``IN`` query each, then rows go in
+    ``BULK_INSERT_CHUNK_SIZE`` at a time as multi-row ``INSERT ... RETURNING``
+    statements, so the cost no longer grows with a query per task. Nothing is
+    written if any task fails validation.
+    """
+    if len(tasks) > MAX_BULK_TASKS:
+        raise ValueError(f"At most {MAX_BULK_TASKS} tasks can be created at once")
+
+    user_ids = {task.user_id for task in tasks}
+    found_users = set(session.exec(select(User.telegram_id).where(col(User.telegram_id).in_(user_ids))).all())
+    if user_ids - found_users:
+        raise LookupError("User not found")
+
+    goal_ids = {task.goal_id for task in tasks if task.goal_id is not None}
+    goal_owners = dict(session.exec(select(Goal.goal_id, Goal.user_id).where(col(Goal.goal_id).in_(goal_ids))).all()) if goal_ids else {}
+    for task in tasks:
+        if task.goal_id is None:
+            continue
+        if task.goal_id not in goal_owners:
+            raise LookupError("Goal not found")
+        if goal_owners[task.goal_id] != task.user_id:
+            raise ValueError("Goal does not belong to user")
+
+    now = datetime.now()
+    rows = [
+        {
+            "user_id": data.user_id,
+            "goal_id": data.goal_id,
+            "description": data.description,
+            "priority": data.priority,
+            "ai_generated": bool(getattr(data, "ai_generated", False)),
+            "completion_status": data.completion_status,
+            "estimated_duration": data.estimated_duration,
+            "actual_duration": data.actual_duration,
+            "energy_required": data.energy_required,
+            "scheduled_for_date": data.scheduled_for_date,
+            "scheduled_for_time": getattr(data, "scheduled_for_time", None),
+            "started_at": data.started_at,
+            "completed_at": data.completed_at,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for data in tasks
+    ]
+    # Table-level INSERT: the ORM variant splits a chunk wherever a row has None in a column the
+    # previous row filled (e.g. goal_id), falling back to one statement per row
+    statement = insert(Task.__table__).returning(*Task.__table__.c)
+    created: List[Task] = []
+    try:
+        for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            result = session.execute(statement, rows[start:start + BULK_INSERT_CHUNK_SIZE])
+            # RETURNING order is not guaranteed, but ids are assigned in VALUES order. Ordering on
+            # task_id is cheaper than sort_by_parameter_order, which SQLite runs a row at a time.
+            # The rows are built detached from the session, so commit cannot expire them.
+            created.extend(Task(**row._mapping) for row in sorted(result, key=lambda row: row.task_id))
+        refresh_user_days(session, {key for task in created for key in rollup_keys(task)})
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    # Bulk INSERTs skip the flush hooks that keep per-user caches (and the rollups, above) current
+    for user_id in user_ids:
+        ai_response_cache.invalidate_user(user_id)
+        conversation_context.invalidate_tasks(user_id)
+    return created
+
+
 def list_tasks(
     session: Session,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = DEFAULT_PAGE_SIZE,
     user_id: Optional[str] = None,
     goal_id: Optional[int] = None,
     completion_status: Optional[CompletionStatusEnum] = None,
     include_discarded: bool = False,
+    cursor: Optional[str] = None,
 ) -> List[Task]:
     statement = select(Task)
     if user_id:
@@ -48,7 +133,7 @@ def list_tasks(
     elif not include_discarded:
         # Exclude discarded tasks by default unless specifically requested
         statement = statement.where(Task.completion_status != CompletionStatusEnum.DISCARDED)
-    statement = statement.offset(skip).limit(limit)
+    statement = paginate(statement, TASK_PAGE_KEYS, cursor=cursor, skip=skip, limit=limit)
     return session.exec(statement).all()
 
 
@@ -3,6 +3,9 @@ from sqlmodel import Session, select
 
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.pagination import DEFAULT_PAGE_SIZE, paginate
+
+USER_PAGE_KEYS = (User.created_at, User.telegram_id)
 
 
 def create_user(session: Session, user_data: UserCreate) -> User:
@@ -27,8 +30,10 @@ def create_user(session: Session, user_data: UserCreate) -> User:
     return user
 
 
-def get_users(session: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    statement = select(User).offset(skip).limit(limit)
+def get_users(
+    session: Session, skip: int = 0, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+) -> List[User]:
+    statement = paginate(select(User), USER_PAGE_KEYS, cursor=cursor, skip=skip, limit=limit)
     return session.exec(statement).all()
 
 
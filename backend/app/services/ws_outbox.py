@@ -0,0 +1,100 @@
+import asyncio
+import contextlib
+import logging
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+# Close code for consumers that cannot keep up ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class Outbox:
+    """Bounded send queue for one WebSocket, drained by its own writer task.
+
+    ``send_text`` only enqueues, so broadcasting to many sockets never waits
+    on a slow client. When the queue is full the slow-consumer policy applies:
+    ``drop_oldest`` discards the oldest queued frame to make room, and
+    ``disconnect`` closes the socket. A send that exceeds ``send_timeout`` or
+    fails also closes the outbox; later ``send_text`` calls raise
+    ``ConnectionError`` so callers can forget the connection.
+    """
+
+    def __init__(
+        self,
+        websocket: Any,
+        user_id: str,
+        *,
+        maxsize: Optional[int] = None,
+        policy: Optional[str] = None,
+        send_timeout: Optional[float] = None,
+    ) -> None:
+        self.websocket = websocket
+        self.user_id = user_id
+        self.policy = policy or settings.WS_SLOW_CONSUMER_POLICY
+        if self.policy not in (DROP_OLDEST, DISCONNECT):
+            raise ValueError(f"Unknown slow consumer policy: {self.policy}")
+        self.send_timeout = send_timeout if send_timeout is not None else settings.WS_SEND_TIMEOUT_SECONDS
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize or settings.WS_SEND_QUEUE_SIZE)
+        self.sent = 0
+        self.dropped = 0
+        self.closed = False
+        self._writer = asyncio.get_running_loop().create_task(self._drain())
+
+    async def send_text(self, text: str) -> None:
+        if self.closed:
+            raise ConnectionError(f"Connection for user {self.user_id} is closed")
+        try:
+            self.queue.put_nowait(text)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        self.dropped += 1
+        if self.policy == DROP_OLDEST:
+            self.queue.get_nowait()
+            self.queue.put_nowait(text)
+            logger.warning(f"Send queue full for user {self.user_id}; dropped oldest frame")
+            return
+        logger.warning(f"Send queue full for user {self.user_id}; disconnecting slow consumer")
+        await self.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        raise ConnectionError(f"Disconnected slow consumer {self.user_id}")
+
+    async def _drain(self) -> None:
+        while not self.closed:
+            text = await self.queue.get()
+            try:
+                # asyncio.timeout rather than wait_for: on 3.11 wait_for can swallow
+                # a cancel() that lands just as the send completes
+                async with asyncio.timeout(self.send_timeout or None):
+                    await self.websocket.send_text(text)
+                self.sent += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Writer for user {self.user_id} stopped: {str(e) or type(e).__name__}")
+                self.closed = True
+                return
+
+    async def close(self, code: Optional[int] = None) -> None:
+        """Stop the writer; with ``code`` also close the socket (server-initiated disconnect)."""
+        if self.closed and self._writer.done():
+            return
+        self.closed = True
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._writer
+        if code is not None:
+            try:
+                await self.websocket.close(code=code)
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queued": self.queue.qsize(), "sent": self.sent, "dropped": self.dropped}
@@ -14,6 +14,8 @@ from app.models.ai_context import AIContext
 from app.models.job_metrics import JobMetrics
 from app.models.day_log import DayLog
 from app.models.log import Log
+from app.models.reminder_ledger import ReminderLedger
+from app.models.user_daily_rollup import UserDailyRollup
 from sqlmodel import SQLModel
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,32 @@
+"""add (user_id, created_at, id) indexes for keyset pages
+
+Revision ID: a3c5e7f9b1d4
+Revises: f1b3c5d7e9a2
+Create Date: 2025-09-01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c5e7f9b1d4'
+down_revision: Union[str, Sequence[str], None] = 'f1b3c5d7e9a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema so per-user keyset pages and exports read rows in index order."""
+    op.create_index('ix_tasks_user_id_created_at_task_id', 'tasks', ['user_id', 'created_at', 'task_id'])
+    op.create_index('ix_goals_user_id_created_at_goal_id', 'goals', ['user_id', 'created_at', 'goal_id'])
+    op.create_index('ix_prompts_user_id_created_at_prompt_id', 'prompts', ['user_id', 'created_at', 'prompt_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema by dropping the keyset page indexes."""
+    op.drop_index('ix_prompts_user_id_created_at_prompt_id', table_name='prompts')
+    op.drop_index('ix_goals_user_id_created_at_goal_id', table_name='goals')
+    op.drop_index('ix_tasks_user_id_created_at_task_id', table_name='tasks')
@@ -0,0 +1,43 @@
+"""add user/date and user/status indexes
+
+Revision ID: b7e2f4a9c1d3
+Revises: 3e1f5cbc98ef
+Create Date: 2025-08-20
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2f4a9c1d3'
+down_revision: Union[str, Sequence[str], None] = '3e1f5cbc98ef'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema by indexing the per-user query paths.
+
+    The (user_id, date) indexes on progress_logs and day_logs are unique; the
+    upgrade fails if a user already has two logs for the same day, and those
+    rows must be merged by hand first.
+    """
+    op.create_index('ix_tasks_user_id_scheduled_for_date', 'tasks', ['user_id', 'scheduled_for_date'])
+    op.create_index('ix_tasks_user_id_updated_at', 'tasks', ['user_id', 'updated_at'])
+    op.create_index('ix_tasks_user_id_completion_status', 'tasks', ['user_id', 'completion_status'])
+    op.create_index('ix_goals_user_id_status', 'goals', ['user_id', 'status'])
+    op.create_index('ix_progress_logs_user_id_date', 'progress_logs', ['user_id', 'date'], unique=True)
+    op.create_index('ix_day_logs_user_id_date', 'day_logs', ['user_id', 'date'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema by dropping the per-user indexes."""
+    op.drop_index('ix_day_logs_user_id_date', table_name='day_logs')
+    op.drop_index('ix_progress_logs_user_id_date', table_name='progress_logs')
+    op.drop_index('ix_goals_user_id_status', table_name='goals')
+    op.drop_index('ix_tasks_user_id_completion_status', table_name='tasks')
+    op.drop_index('ix_tasks_user_id_updated_at', table_name='tasks')
+    op.drop_index('ix_tasks_user_id_scheduled_for_date', table_name='tasks')
@@ -0,0 +1,28 @@
+"""add tasks (scheduled_for_date, scheduled_for_time) index
+
+Revision ID: c4d8e1f2a6b7
+Revises: b7e2f4a9c1d3
+Create Date: 2025-08-22
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e1f2a6b7'
+down_revision: Union[str, Sequence[str], None] = 'b7e2f4a9c1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema by indexing the reminder job's due-window range scan."""
+    op.create_index('ix_tasks_scheduled_for_date_time', 'tasks', ['scheduled_for_date', 'scheduled_for_time'])
+
+
+def downgrade() -> None:
+    """Downgrade schema by dropping the due-window index."""
+    op.drop_index('ix_tasks_scheduled_for_date_time', table_name='tasks')
@@ -0,0 +1,37 @@
+"""add reminder_ledger table
+
+Revision ID: d9a3b5c7e2f1
+Revises: c4d8e1f2a6b7
+Create Date: 2025-08-24
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a3b5c7e2f1'
+down_revision: Union[str, Sequence[str], None] = 'c4d8e1f2a6b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema by adding the sent-reminder ledger."""
+    op.create_table(
+        'reminder_ledger',
+        sa.Column('reminder_id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('reminder_kind', sa.String(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.task_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('reminder_id'),
+        sa.UniqueConstraint('task_id', 'reminder_kind', name='uq_reminder_ledger_task_id_kind'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema by dropping the sent-reminder ledger."""
+    op.drop_table('reminder_ledger')
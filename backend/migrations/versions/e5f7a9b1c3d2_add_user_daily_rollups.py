@@ -0,0 +1,52 @@
+"""add user_daily_rollups table
+
+Revision ID: e5f7a9b1c3d2
+Revises: d9a3b5c7e2f1
+Create Date: 2025-08-31
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f7a9b1c3d2'
+down_revision: Union[str, Sequence[str], None] = 'd9a3b5c7e2f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema by adding the per-user daily rollups.
+
+    The table starts empty; fill it with ``python backfill_rollups.py``.
+    """
+    op.create_table(
+        'user_daily_rollups',
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('rollup_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('tasks_planned', sa.Integer(), nullable=False),
+        sa.Column('tasks_completed', sa.Integer(), nullable=False),
+        sa.Column('tasks_discarded', sa.Integer(), nullable=False),
+        sa.Column('actual_duration_minutes', sa.Integer(), nullable=False),
+        sa.Column('mood_score', sa.Integer(), nullable=True),
+        sa.Column('energy_level', sa.Integer(), nullable=True),
+        sa.Column('focus_score', sa.Integer(), nullable=True),
+        sa.Column('day_log_minutes', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.telegram_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('rollup_id'),
+    )
+    op.create_index(
+        'ix_user_daily_rollups_user_id_date', 'user_daily_rollups', ['user_id', 'date'], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema by dropping the per-user daily rollups."""
+    op.drop_index('ix_user_daily_rollups_user_id_date', table_name='user_daily_rollups')
+    op.drop_table('user_daily_rollups')
@@ -0,0 +1,55 @@
+"""key reminder_ledger on the task's scheduled slot
+
+Revision ID: f1b3c5d7e9a2
+Revises: e5f7a9b1c3d2
+Create Date: 2025-08-31
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b3c5d7e9a2'
+down_revision: Union[str, Sequence[str], None] = 'e5f7a9b1c3d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema so a rescheduled task can be reminded for its new slot."""
+    with op.batch_alter_table('reminder_ledger') as batch_op:
+        batch_op.add_column(sa.Column('scheduled_for_date', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('scheduled_for_time', sa.Time(), nullable=True))
+        batch_op.drop_constraint('uq_reminder_ledger_task_id_kind', type_='unique')
+        batch_op.create_unique_constraint(
+            'uq_reminder_ledger_task_id_kind_slot',
+            ['task_id', 'reminder_kind', 'scheduled_for_date', 'scheduled_for_time'],
+        )
+    # Existing rows were sent for the slot their task still has
+    op.execute(
+        """
+        UPDATE reminder_ledger SET
+            scheduled_for_date = (SELECT tasks.scheduled_for_date FROM tasks WHERE tasks.task_id = reminder_ledger.task_id),
+            scheduled_for_time = (SELECT tasks.scheduled_for_time FROM tasks WHERE tasks.task_id = reminder_ledger.task_id)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema back to one reminder per task and kind."""
+    # Keep the latest row per (task_id, reminder_kind) so the old unique key holds
+    op.execute(
+        """
+        DELETE FROM reminder_ledger WHERE reminder_id NOT IN (
+            SELECT MAX(reminder_id) FROM reminder_ledger GROUP BY task_id, reminder_kind
+        )
+        """
+    )
+    with op.batch_alter_table('reminder_ledger') as batch_op:
+        batch_op.drop_constraint('uq_reminder_ledger_task_id_kind_slot', type_='unique')
+        batch_op.create_unique_constraint('uq_reminder_ledger_task_id_kind', ['task_id', 'reminder_kind'])
+        batch_op.drop_column('scheduled_for_time')
+        batch_op.drop_column('scheduled_for_date')
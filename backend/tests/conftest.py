@@ -5,10 +5,12 @@ from datetime import datetime
 from fastapi.testclient import TestClient
 from sqlmodel import Session, SQLModel, create_engine
 from sqlmodel.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from datetime import date, datetime, time
 from decimal import Decimal
 from app.main import app
-from app.core.database import get_session
+from app.core.database import get_session, use_async_engine
 from app.models.user import User
 from app.schemas.user import UserCreate, TimezoneEnum, PhaseEnum, EnergyProfileEnum
 from app.models.goal import Goal
@@ -23,19 +25,42 @@ from app.models.job_metrics import JobMetrics
 from app.schemas.job_metrics import JobMetricsCreate
 from app.models.prompt import Prompt
 from app.schemas.prompt import PromptCreate
+from app.services.ai_cache import ai_response_cache
+from app.services.ai_service import reset_ai_service
+from app.services.conversation_context import conversation_context
+from app.services.llm_client import shutdown_llm_client
+
+
+@pytest.fixture(autouse=True)
+def reset_ai_clients():
+    """Give every test a fresh shared LLM client, AI service and response caches so patched models never leak."""
+    yield
+    ai_response_cache.clear()
+    conversation_context.clear()
+    reset_ai_service()
+    shutdown_llm_client()
 
 
 @pytest.fixture(name="session")
-def session_fixture():
-    """Create a test database session."""
+def session_fixture(tmp_path):
+    """Create a test database session.
+
+    The database is a temporary file so async sessions (aiosqlite) opened by the
+    app see the same data as this sync session.
+    """
+    db_path = tmp_path / "test.db"
     engine = create_engine(
-        "sqlite:///:memory:",
+        f"sqlite:///{db_path}",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
     SQLModel.metadata.create_all(engine)
+    # NullPool: each async session connects on the loop that uses it
+    use_async_engine(create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool))
     with Session(engine) as session:
         yield session
+    use_async_engine(None)
+    engine.dispose()
 
 
 @pytest.fixture(name="client")
@@ -0,0 +1,119 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.models.goal import Goal
+from app.services.ai_cache import AIResponseCache, ai_response_cache, fingerprint
+from app.services.ai_service import AIService
+
+
+@pytest.fixture
+def ai_service():
+    with patch.dict('os.environ', {'GEMINI_API_KEY': 'test-api-key'}):
+        with patch('google.generativeai.configure'):
+            with patch('google.generativeai.GenerativeModel') as mock_model:
+                mock_instance = Mock()
+                mock_instance.generate_content.return_value = Mock(text=json.dumps({"productivity_score": 80}))
+                mock_model.return_value = mock_instance
+                yield AIService()
+
+
+class TestAIResponseCache:
+    def test_hit_and_miss_counters(self):
+        cache = AIResponseCache(max_entries=10, ttl_seconds=60)
+        assert cache.get("k") is None
+        cache.set("k", "v")
+        assert cache.get("k") == "v"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+
+    def test_entries_expire_after_ttl(self):
+        cache = AIResponseCache(max_entries=10, ttl_seconds=60)
+        with patch("app.services.ai_cache.time.monotonic", return_value=1000.0):
+            cache.set("k", "v")
+        with patch("app.services.ai_cache.time.monotonic", return_value=1061.0):
+            assert cache.get("k") is None
+        assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = AIResponseCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_invalidate_user_only_drops_their_entries(self):
+        cache = AIResponseCache(max_entries=10, ttl_seconds=60)
+        cache.set("alice", 1, {"u1"})
+        cache.set("bob", 2, {"u2"})
+
+        cache.invalidate_user("u1")
+
+        assert cache.get("alice") is None
+        assert cache.get("bob") == 2
+
+
+def test_fingerprint_depends_on_agent_model_and_context():
+    goal = Goal(user_id="u1", description="Ship MVP", type="Weekly")
+    base = fingerprint("analyze_goals", "gemini-2.5-flash", {"goals": [goal]})
+
+    assert base == fingerprint("analyze_goals", "gemini-2.5-flash", {"goals": [goal]})
+    assert base != fingerprint("weekly_analysis", "gemini-2.5-flash", {"goals": [goal]})
+    assert base != fingerprint("analyze_goals", "other-model", {"goals": [goal]})
+    goal.description = "Ship v2"
+    assert base != fingerprint("analyze_goals", "gemini-2.5-flash", {"goals": [goal]})
+
+
+@pytest.mark.asyncio
+async def test_repeated_analysis_is_served_from_cache(ai_service, session, test_goal):
+    first = await ai_service.analyze_goals([test_goal])
+    second = await ai_service.analyze_goals([test_goal])
+
+    assert first == second
+    assert ai_service.model.generate_content.call_count == 1
+    assert ai_response_cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_malformed_answer_is_not_cached(ai_service, session, test_goal):
+    ai_service.model.generate_content.side_effect = [
+        Mock(text="Sorry, here is your analysis: {not json"),
+        Mock(text=json.dumps({"overall_status": "Excellent"})),
+    ]
+
+    fallback = await ai_service.analyze_goals([test_goal])
+    assert ai_response_cache.stats()["size"] == 0
+
+    retried = await ai_service.analyze_goals([test_goal])
+    cached = await ai_service.analyze_goals([test_goal])
+
+    assert fallback["overall_status"] != "Excellent"
+    assert retried == cached == {"overall_status": "Excellent"}
+    assert ai_service.model.generate_content.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_row_change_invalidates_cached_analysis(ai_service, session, test_goal):
+    await ai_service.analyze_goals([test_goal])
+    assert ai_response_cache.stats()["size"] == 1
+
+    test_goal.description = "A sharper goal"
+    session.add(test_goal)
+    session.commit()
+
+    assert ai_response_cache.stats()["size"] == 0
+
+
+def test_cache_stats_endpoint(client):
+    response = client.get("/ai/cache/stats")
+
+    assert response.status_code == 200
+    assert set(response.json()) >= {"hits", "misses", "size"}
@@ -111,6 +111,7 @@ def test_progress_logs(session: Session, test_user):
     logs = [
         ProgressLog(
             user_id=test_user.telegram_id,
+            date=date.today() - timedelta(days=i),
             tasks_planned=5,
             tasks_completed=4,
             mood_score=8,
@@ -169,7 +170,10 @@ async def test_auto_generate_ai_context(
             }
 
     # Patch the AI service
-    monkeypatch.setattr("app.services.ai_context_service.AIService", MockAIService)
+    monkeypatch.setattr(
+        "app.services.ai_context_service.get_ai_service",
+        lambda: MockAIService.__new__(MockAIService),
+    )
 
     # Call the AI context creation endpoint
     response = client.post(
@@ -0,0 +1,179 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, event
+
+from app.core.database import async_session, get_async_engine
+from app.main import app
+from app.models.goal import Goal
+from app.models.progress_log import ProgressLog
+from app.models.task import Task
+from app.models.user_daily_rollup import UserDailyRollup
+from app.schemas.goal import PhaseEnum, PriorityEnum, StatusEnum
+from app.schemas.task import CompletionStatusEnum
+from app.services import ai_context_builder
+from app.services.ai_cache import context_user_ids, fingerprint
+from app.services.ai_context_builder import (
+    GoalBrief,
+    goal_briefs,
+    progress_briefs,
+    recent_completions,
+    task_completion_rate,
+)
+from app.services.ai_service import get_ai_service
+
+NOW = datetime.now()
+
+
+def record_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    engine = get_async_engine().sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def add_goals(session, user_id: str, count: int) -> None:
+    session.add_all([
+        Goal(
+            user_id=user_id, description=f"Goal {i}", phase=PhaseEnum.MVP,
+            status=StatusEnum.COMPLETED if i % 2 else StatusEnum.ACTIVE,
+            created_at=NOW - timedelta(days=count - i),
+        )
+        for i in range(count)
+    ])
+    session.commit()
+
+
+def add_tasks_with_rate(session, user_id: str) -> None:
+    """Twelve tasks spread over more than a year, a quarter of them completed."""
+    session.add_all([
+        Task(
+            user_id=user_id, description=f"Task {i}",
+            completion_status=CompletionStatusEnum.COMPLETED if i < 3 else CompletionStatusEnum.PENDING,
+            created_at=NOW - timedelta(days=i * 40),
+        )
+        for i in range(12)
+    ])
+    session.commit()
+
+
+@pytest.mark.asyncio
+class TestContextBuilders:
+    async def test_goals_are_projected_and_capped(self, session, test_user):
+        add_goals(session, test_user.telegram_id, 12)
+
+        statements, stop = record_statements()
+        try:
+            async with async_session() as async_db:
+                goals = await goal_briefs(async_db, test_user.telegram_id, limit=5)
+                active = await goal_briefs(async_db, test_user.telegram_id, status=StatusEnum.ACTIVE)
+        finally:
+            stop()
+
+        assert [goal.description for goal in goals] == [f"Goal {i}" for i in range(11, 6, -1)]
+        assert all(goal.status == StatusEnum.ACTIVE for goal in active)
+        assert not hasattr(goals[0], "__dict__")
+        # Only the columns the agents read; no deadline, type or parent goal
+        assert all("goals.deadline" not in statement for statement in statements)
+        assert all("LIMIT" in statement for statement in statements)
+
+    async def test_progress_window_and_cap(self, session, test_user):
+        user_id = test_user.telegram_id
+        session.add_all([
+            ProgressLog(
+                user_id=user_id, date=date.today() - timedelta(days=i), tasks_completed=i,
+                mood_score=5, energy_level=5, focus_score=5, daily_reflection="x" * 1000,
+            )
+            for i in range(30)
+        ])
+        session.commit()
+
+        async with async_session() as async_db:
+            fortnight = await progress_briefs(async_db, user_id, date.today() - timedelta(days=13))
+            latest = await progress_briefs(async_db, user_id, limit=3)
+
+        assert [log.tasks_completed for log in fortnight] == list(range(14))
+        assert [log.tasks_completed for log in latest] == [0, 1, 2]
+
+    async def test_recent_completions_are_windowed_and_oldest_first(self, session, test_user):
+        user_id = test_user.telegram_id
+        session.add_all([
+            Task(
+                user_id=user_id, description=f"Done {i}", completion_status=CompletionStatusEnum.COMPLETED,
+                completed_at=NOW - timedelta(days=i), updated_at=NOW - timedelta(days=i),
+            )
+            for i in range(10)
+        ])
+        session.add(Task(user_id=user_id, description="Still pending"))
+        session.commit()
+
+        async with async_session() as async_db:
+            completions = await recent_completions(async_db, user_id)
+            capped = await recent_completions(async_db, user_id, limit=2)
+
+        assert [task.description for task in completions] == [f"Done {i}" for i in range(7, -1, -1)]
+        assert [task.description for task in capped] == ["Done 1", "Done 0"]
+
+    async def test_completion_rate_reads_rollups(self, session, test_user):
+        user_id = test_user.telegram_id
+        add_tasks_with_rate(session, user_id)
+
+        statements, stop = record_statements()
+        try:
+            async with async_session() as async_db:
+                rate = await task_completion_rate(async_db, user_id)
+        finally:
+            stop()
+        async with async_session() as async_db:
+            unknown = await task_completion_rate(async_db, "nobody")
+
+        assert rate == 0.25
+        assert unknown == 0.0
+        assert not any("FROM tasks" in statement for statement in statements)
+
+    async def test_completion_rate_without_rollups_counts_tasks(self, session, test_user):
+        user_id = test_user.telegram_id
+        add_tasks_with_rate(session, user_id)
+        # History written before the rollups migration, not backfilled yet
+        session.exec(delete(UserDailyRollup))
+        session.commit()
+
+        async with async_session() as async_db:
+            assert await task_completion_rate(async_db, user_id) == 0.25
+
+
+def test_briefs_fingerprint_and_tag_by_user():
+    goal = GoalBrief(1, "u1", "Launch", PriorityEnum.HIGH, PhaseEnum.MVP, StatusEnum.ACTIVE, 10.0, NOW)
+
+    base = fingerprint("analyze_goals", "model", {"goals": [goal]})
+
+    assert base == fingerprint("analyze_goals", "model", {"goals": [goal]})
+    assert base != fingerprint("analyze_goals", "model", {"goals": [GoalBrief(1, "u1", "Launch", PriorityEnum.HIGH, PhaseEnum.MVP, StatusEnum.ACTIVE, 20.0, NOW)]})
+    assert context_user_ids({"goals": [goal]}) == {"u1"}
+
+
+def test_weekly_analysis_route_sends_bounded_context(client, session, test_user):
+    user_id = test_user.telegram_id
+    add_goals(session, user_id, 80)
+    session.add_all([Task(user_id=user_id, description=f"Task {i}") for i in range(150)])
+    session.add(Task(user_id=user_id, description="Stale", created_at=NOW - timedelta(days=60), updated_at=NOW - timedelta(days=60)))
+    session.commit()
+    received = {}
+
+    class RecordingService:
+        async def generate_weekly_analysis(self, **kwargs):
+            received.update(kwargs)
+            return {"productivity_score": 80}
+
+    app.dependency_overrides[get_ai_service] = RecordingService
+
+    response = client.post("/ai/weekly-analysis", json={"user_id": user_id})
+
+    assert response.status_code == 200
+    assert len(received["goals"]) == ai_context_builder.AI_CONTEXT_MAX_GOALS
+    assert len(received["tasks"]) == ai_context_builder.AI_CONTEXT_MAX_TASKS
+    assert "Stale" not in {task.description for task in received["tasks"]}
@@ -3,7 +3,7 @@ import json
 from unittest.mock import Mock, patch, AsyncMock
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from app.services.ai_service import AIService
+from app.services.ai_service import AIService, get_ai_service
 from app.models.user import User, PhaseEnum, EnergyProfileEnum, TimezoneEnum
 from app.models.goal import Goal, GoalTypeEnum, StatusEnum, PriorityEnum
 from app.models.task import Task, TaskPriorityEnum, CompletionStatusEnum, EnergyRequiredEnum
@@ -469,6 +469,21 @@ class TestCareerTransitionAnalysis:
                     mock_configure.assert_called_once_with(api_key='test-key')
                     mock_model.assert_called_once_with('gemini-2.5-flash')
 
+    def test_get_ai_service_is_shared(self):
+        """The getter builds one service and configures Gemini once."""
+        with patch.dict('os.environ', {'GEMINI_API_KEY': 'test-key'}):
+            with patch('google.generativeai.configure') as mock_configure:
+                with patch('google.generativeai.GenerativeModel') as mock_model:
+                    assert get_ai_service() is get_ai_service()
+                    mock_configure.assert_called_once_with(api_key='test-key')
+                    mock_model.assert_called_once()
+
+    def test_get_ai_service_fails_on_first_use_without_api_key(self):
+        """A missing key surfaces when the service is first requested."""
+        with patch.dict('os.environ', {}, clear=True):
+            with pytest.raises(ValueError, match="GEMINI_API_KEY environment variable is required"):
+                get_ai_service()
+
 
 class TestGoalsAnalysis:
     """Test goals analysis generation (Agent 7)."""
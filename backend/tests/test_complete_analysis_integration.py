@@ -0,0 +1,102 @@
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import status
+
+from app.main import app
+from app.services.ai_service import AIService, get_ai_service
+
+
+class SlowAIService:
+    """Stand-in for AIService whose agents take a fixed time to answer."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def generate_motivation_message(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        return "Keep going!"
+
+    async def evaluate_phase_transition(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        return {"ready_for_next_phase": False}
+
+
+class RendezvousAIService:
+    """Agents that only answer once both have started, so running them one after the other times out."""
+
+    def __init__(self):
+        self.started = 0
+        self.both_started = asyncio.Event()
+
+    async def _meet(self):
+        self.started += 1
+        if self.started == 2:
+            self.both_started.set()
+        await self.both_started.wait()
+
+    async def generate_motivation_message(self, **kwargs):
+        await self._meet()
+        return "Keep going!"
+
+    async def evaluate_phase_transition(self, **kwargs):
+        await self._meet()
+        return {"ready_for_next_phase": False}
+
+
+@pytest.mark.integration
+class TestCompleteAnalysis:
+    def test_agents_run_concurrently(self, client, test_user, test_ai_context):
+        app.dependency_overrides[get_ai_service] = RendezvousAIService
+
+        with patch("app.api.v1.routes.ai_service.settings.AI_AGENT_TIMEOUT_SECONDS", 5):
+            resp = client.post(f"/ai/user/{test_user.telegram_id}/complete-analysis")
+
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        assert data["motivation_message"] == "Keep going!"
+        assert data["phase_transition_readiness"] == {"ready_for_next_phase": False}
+        assert data["failed_agents"] == []
+
+    def test_failed_and_slow_agents_are_reported(self, client, test_user, test_ai_context):
+        service = SlowAIService(0.0)
+
+        async def broken(**kwargs):
+            raise RuntimeError("model unavailable")
+
+        async def stuck(**kwargs):
+            await asyncio.sleep(5)
+
+        service.generate_motivation_message = broken
+        service.evaluate_phase_transition = stuck
+        app.dependency_overrides[get_ai_service] = lambda: service
+
+        with patch("app.api.v1.routes.ai_service.settings.AI_AGENT_TIMEOUT_SECONDS", 0.1):
+            resp = client.post(f"/ai/user/{test_user.telegram_id}/complete-analysis")
+
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        assert "motivation_message" not in data
+        assert "phase_transition_readiness" not in data
+        failures = {f["agent"]: f["error"] for f in data["failed_agents"]}
+        assert failures["motivation_message"] == "model unavailable"
+        assert "Timed out" in failures["phase_transition_readiness"]
+
+    def test_fallback_answers_are_reported(self, client, test_user, test_ai_context):
+        with patch.dict("os.environ", {"GEMINI_API_KEY": "test-api-key"}):
+            with patch("google.generativeai.configure"), patch("google.generativeai.GenerativeModel") as model:
+                model.return_value = Mock(generate_content=Mock(side_effect=RuntimeError("quota exceeded")))
+                service = AIService()
+        app.dependency_overrides[get_ai_service] = lambda: service
+
+        resp = client.post(f"/ai/user/{test_user.telegram_id}/complete-analysis")
+
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        # The canned answers are still returned, but flagged
+        assert data["motivation_message"]
+        assert data["phase_transition_readiness"]["recommendation"] == "Wait"
+        failures = {f["agent"]: f["error"] for f in data["failed_agents"]}
+        assert set(failures) == {"motivation_message", "phase_transition_readiness"}
+        assert all(error.startswith("Fallback answer: ") for error in failures.values())
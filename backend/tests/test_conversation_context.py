@@ -0,0 +1,150 @@
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event, insert
+
+import app.services.prompt_service as prompt_service_module
+from app.core.database import async_session, get_async_engine
+from app.models.prompt import Prompt
+from app.models.task import Task
+from app.services.conversation_context import SUMMARY_LINE_MAX_CHARS, ConversationContextCache, conversation_context
+from app.services.prompt_service import PromptService
+from app.schemas.prompt import PromptCreate
+
+
+class RecordingLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(text=f"answer {len(self.prompts)}")
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = RecordingLLM()
+    monkeypatch.setattr(prompt_service_module, "get_llm_client", lambda: fake)
+    return fake
+
+
+def count_selects(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+async def ask(service, user_id, text):
+    async with async_session() as session:
+        prompt = await service.create_prompt(session, PromptCreate(user_id=user_id, prompt_text=text))
+        return await service.process_prompt(session, prompt)
+
+
+@pytest.mark.asyncio
+class TestConversationContextCache:
+    async def test_cold_load_keeps_a_window_and_summarizes_older_turns(self, session):
+        for i in range(5):
+            session.add(Prompt(user_id="u1", prompt_text=f"q{i}", response_text=f"a{i}"))
+        session.add(Prompt(user_id="u1", prompt_text="unanswered"))
+        session.add(Task(user_id="u1", description="Ship it"))
+        session.commit()
+        cache = ConversationContextCache(window_turns=2, compact_every=2)
+
+        async with async_session() as async_db:
+            context = await cache.get(async_db, "u1")
+            again = await cache.get(async_db, "u1")
+
+        assert context["tasks"] == ["Ship it"]
+        assert [q for q, _ in context["turns"]] == ["q3", "q4"]
+        assert context["summary"].splitlines() == [
+            "- Asked: q0 / Answered: a0",
+            "- Asked: q1 / Answered: a1",
+            "- Asked: q2 / Answered: a2",
+        ]
+        assert again == context and cache.loads == 1
+
+    async def test_recorded_turns_roll_into_a_bounded_summary(self, session):
+        cache = ConversationContextCache(window_turns=2, compact_every=2, summary_max_chars=60)
+        async with async_session() as async_db:
+            await cache.get(async_db, "u1")
+            for i in range(8):
+                cache.record_turn("u1", f"q{i}", f"a{i}")
+            context = await cache.get(async_db, "u1")
+
+        assert [q for q, _ in context["turns"]] == ["q6", "q7"]
+        # Oldest summary lines are dropped to stay under the character cap
+        assert len(context["summary"]) <= 60
+        assert context["summary"].splitlines()[-1] == "- Asked: q5 / Answered: a5"
+        assert cache.loads == 1
+
+    async def test_day_change_reloads(self, session):
+        cache = ConversationContextCache()
+        async with async_session() as async_db:
+            await cache.get(async_db, "u1", today=date.today() - timedelta(days=1))
+            cache.record_turn("u1", "yesterday", "old")
+            context = await cache.get(async_db, "u1")
+
+        assert context["turns"] == [] and cache.loads == 2
+
+    async def test_writes_from_other_workers_show_up_after_the_ttl(self, session, monkeypatch):
+        cache = ConversationContextCache(ttl_seconds=30)
+        clock = [1000.0]
+        monkeypatch.setattr("app.services.conversation_context.time.monotonic", lambda: clock[0])
+        async with async_session() as async_db:
+            await cache.get(async_db, "u1")
+            # A Core insert stands in for another worker: no flush hook fires in this process
+            session.exec(insert(Prompt).values(
+                user_id="u1", prompt_text="From worker 2", response_text="hi",
+                created_at=datetime.now(), updated_at=datetime.now(),
+            ))
+            session.commit()
+
+            clock[0] += 29
+            before_ttl = await cache.get(async_db, "u1")
+            clock[0] += 2
+            after_ttl = await cache.get(async_db, "u1")
+
+        assert before_ttl["turns"] == []
+        assert after_ttl["turns"] == [("From worker 2", "hi")]
+        assert cache.loads == 2
+
+    async def test_task_and_notification_writes_refresh_the_context(self, session):
+        async with async_session() as async_db:
+            await conversation_context.get(async_db, "u1")
+            session.add(Task(user_id="u1", description="New task"))
+            session.add(Prompt(user_id="u1", prompt_text="System notification: hi", response_text="hi"))
+            session.commit()
+            context = await conversation_context.get(async_db, "u1")
+
+        assert context["tasks"] == ["New task"]
+        assert context["turns"] == [("System notification: hi", "hi")]
+
+
+@pytest.mark.asyncio
+async def test_prompt_cost_stays_flat_over_a_long_day(session, llm, monkeypatch):
+    monkeypatch.setattr(conversation_context, "window_turns", 3)
+    monkeypatch.setattr(conversation_context, "summary_max_chars", 300)
+    service = PromptService()
+    selects = count_selects(get_async_engine())
+    per_prompt = []
+
+    for i in range(12):
+        before = len(selects)
+        await ask(service, "u1", f"question {i} " + "x" * 200)
+        per_prompt.append(len(selects) - before)
+
+    # After the first prompt loads the context, no prompt re-reads tasks or history
+    assert all(count == per_prompt[1] for count in per_prompt[2:])
+    assert per_prompt[1] < per_prompt[0]
+    assert conversation_context.loads == 1
+    # Only the window is repeated verbatim and the summary is capped, so the prompt stops growing
+    assert "question 11" in llm.prompts[-1] and "Q: question 10" in llm.prompts[-1]
+    assert "Q: question 7" not in llm.prompts[-1]
+    lengths = [len(prompt) for prompt in llm.prompts[6:]]
+    assert max(lengths) - min(lengths) < SUMMARY_LINE_MAX_CHARS
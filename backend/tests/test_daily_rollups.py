@@ -0,0 +1,142 @@
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import delete, event
+from sqlmodel import Session, select
+
+from app.models.day_log import DayLog
+from app.models.progress_log import ProgressLog
+from app.models.task import Task
+from app.models.user_daily_rollup import UserDailyRollup
+from app.schemas.task import CompletionStatusEnum
+from app.services.rollup_service import backfill_rollups, list_user_rollups
+
+TODAY = date.today()
+YESTERDAY = TODAY - timedelta(days=1)
+
+
+def rollups(session: Session, user_id: str) -> dict:
+    session.expire_all()
+    return {
+        row.date: {
+            name: getattr(row, name)
+            for name in (
+                "tasks_planned", "tasks_completed", "tasks_discarded", "actual_duration_minutes",
+                "mood_score", "energy_level", "focus_score", "day_log_minutes",
+            )
+            if getattr(row, name)
+        }
+        for row in list_user_rollups(session, user_id)
+    }
+
+
+def seed_history(session: Session, user_id: str) -> None:
+    start = datetime.combine(YESTERDAY, time(9))
+    session.add_all([
+        Task(user_id=user_id, description="Planned yesterday", scheduled_for_date=YESTERDAY),
+        Task(
+            user_id=user_id, description="Done today", scheduled_for_date=YESTERDAY, actual_duration=45,
+            completion_status=CompletionStatusEnum.COMPLETED, completed_at=datetime.combine(TODAY, time(10)),
+        ),
+        Task(user_id=user_id, description="Dropped", scheduled_for_date=TODAY, completion_status=CompletionStatusEnum.DISCARDED),
+        ProgressLog(user_id=user_id, date=YESTERDAY, mood_score=6, energy_level=5, focus_score=7),
+        DayLog(user_id=user_id, date=YESTERDAY, start_time=start, end_time=start + timedelta(hours=8, minutes=30)),
+    ])
+    session.commit()
+
+
+class TestIncrementalRollups:
+    def test_writes_update_the_days_they_touch(self, session, test_user):
+        user_id = test_user.telegram_id
+        seed_history(session, user_id)
+
+        assert rollups(session, user_id) == {
+            YESTERDAY: {
+                "tasks_planned": 2, "mood_score": 6, "energy_level": 5, "focus_score": 7, "day_log_minutes": 510,
+            },
+            TODAY: {"tasks_planned": 1, "tasks_discarded": 1, "tasks_completed": 1, "actual_duration_minutes": 45},
+        }
+
+    def test_task_lifecycle_through_the_api(self, client, session, test_user):
+        user_id = test_user.telegram_id
+        created = client.post("/tasks/", json={
+            "user_id": user_id, "description": "Write report", "scheduled_for_date": YESTERDAY.isoformat(),
+        }).json()
+        assert rollups(session, user_id) == {YESTERDAY: {"tasks_planned": 1}}
+
+        client.put(f"/tasks/{created['task_id']}", json={"scheduled_for_date": TODAY.isoformat()})
+        assert rollups(session, user_id) == {TODAY: {"tasks_planned": 1}}
+
+        client.patch(f"/tasks/{created['task_id']}/complete")
+        assert rollups(session, user_id) == {TODAY: {"tasks_planned": 1, "tasks_completed": 1}}
+
+        client.delete(f"/tasks/{created['task_id']}")
+        assert rollups(session, user_id) == {}
+
+    def test_log_edits_and_deletes(self, session, test_user):
+        user_id = test_user.telegram_id
+        seed_history(session, user_id)
+        log = session.exec(select(ProgressLog)).one()
+        day_log = session.exec(select(DayLog)).one()
+
+        log.mood_score = 9
+        session.add(log)
+        session.delete(day_log)
+        session.commit()
+
+        yesterday = rollups(session, user_id)[YESTERDAY]
+        assert yesterday["mood_score"] == 9 and "day_log_minutes" not in yesterday
+
+    def test_unrelated_edits_skip_the_refresh(self, session, test_user):
+        seed_history(session, test_user.telegram_id)
+        task = session.exec(select(Task).where(Task.description == "Dropped")).one()
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(session.get_bind(), "before_cursor_execute", before_cursor_execute)
+        try:
+            task.discard_message = "Not needed"
+            session.add(task)
+            session.commit()
+        finally:
+            event.remove(session.get_bind(), "before_cursor_execute", before_cursor_execute)
+
+        assert not any("user_daily_rollups" in statement for statement in statements)
+
+    def test_bulk_task_create_refreshes_rollups(self, client, session, test_user):
+        user_id = test_user.telegram_id
+        payload = {"tasks": [
+            {"user_id": user_id, "description": f"Task {i}", "scheduled_for_date": (TODAY - timedelta(days=i % 3)).isoformat()}
+            for i in range(30)
+        ]}
+
+        assert client.post("/tasks/bulk", json=payload).status_code == 201
+
+        assert {day: totals["tasks_planned"] for day, totals in rollups(session, user_id).items()} == {
+            TODAY: 10, YESTERDAY: 10, TODAY - timedelta(days=2): 10,
+        }
+
+
+def test_backfill_rebuilds_the_same_rows(session, test_user):
+    user_id = test_user.telegram_id
+    seed_history(session, user_id)
+    expected = rollups(session, user_id)
+    session.exec(delete(UserDailyRollup))
+    session.commit()
+
+    result = backfill_rollups(session)
+
+    assert result == {"users": 1, "rows": 2}
+    assert rollups(session, user_id) == expected
+
+
+def test_daily_endpoint(client, session, test_user):
+    seed_history(session, test_user.telegram_id)
+
+    response = client.get(f"/users/{test_user.telegram_id}/daily?start_date={TODAY.isoformat()}")
+
+    assert response.status_code == 200
+    assert [row["date"] for row in response.json()] == [TODAY.isoformat()]
+    assert response.json()[0]["tasks_completed"] == 1
+    assert client.get("/users/nobody/daily").status_code == 404
@@ -0,0 +1,87 @@
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from app.core.database import build_async_engine, build_engine, get_async_session, pool_metrics, to_async_url
+from app.models.user import User
+
+
+def test_build_engine_defaults_to_quiet_pooled_engine(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    try:
+        assert engine.echo is False
+        assert isinstance(engine.pool, QueuePool)
+        assert engine.pool._pre_ping is True
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_file_uses_wal(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    finally:
+        engine.dispose()
+
+
+def test_in_memory_sqlite_keeps_default_pool():
+    engine = build_engine("sqlite://", echo=True)
+    try:
+        assert engine.echo is True
+        assert not isinstance(engine.pool, QueuePool)
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+    finally:
+        engine.dispose()
+
+
+def test_pool_metrics_track_connections_in_use(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    other = build_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    try:
+        with engine.connect():
+            during = pool_metrics(engine.pool).snapshot()
+        after = pool_metrics(engine.pool).snapshot()
+        untouched = pool_metrics(other.pool).snapshot()
+    finally:
+        engine.dispose()
+        other.dispose()
+
+    assert during["in_use"] == 1
+    assert after["in_use"] == 0
+    assert after["checkouts"] == 1
+    assert after["max_checkout_wait_ms"] >= 0
+    # Each engine counts only its own pool
+    assert untouched["checkouts"] == 0
+
+
+async def test_async_engine_has_its_own_pool_metrics(tmp_path):
+    engine = build_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        metrics = pool_metrics(engine.sync_engine.pool).snapshot()
+    finally:
+        await engine.dispose()
+
+    assert metrics["checkouts"] == 1 and metrics["in_use"] == 0
+
+
+def test_db_health_endpoint(client):
+    response = client.get("/health/db")
+
+    assert response.status_code == 200
+    assert {"in_use", "checkouts", "avg_checkout_wait_ms"} <= set(response.json()["sync"])
+    assert "async" in response.json()
+
+
+def test_to_async_url_swaps_drivers():
+    assert to_async_url("sqlite:///./diary.db") == "sqlite+aiosqlite:///./diary.db"
+    assert to_async_url("postgresql+psycopg2://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+
+
+async def test_async_session_sees_committed_rows(session, test_user):
+    async for async_session in get_async_session():
+        user = await async_session.get(User, test_user.telegram_id)
+        assert user is not None
+        assert user.name == test_user.name
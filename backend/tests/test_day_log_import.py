@@ -0,0 +1,149 @@
+import json
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event
+from sqlmodel import Session, func, select
+
+from app.models.day_log import DayLog
+from app.services import day_log_service
+
+
+def day_log(days_ago: int, summary: str = None) -> dict:
+    day = date.today() - timedelta(days=days_ago)
+    start = datetime.combine(day, datetime.min.time()) + timedelta(hours=8)
+    return {
+        "date": day.isoformat(),
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=9)).isoformat(),
+        "summary": summary or f"Day {days_ago}",
+    }
+
+
+def ndjson(logs) -> bytes:
+    return "\n".join(json.dumps(log) for log in logs).encode()
+
+
+def record_statements(session: Session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(session.get_bind(), "before_cursor_execute", before_cursor_execute)
+    return statements, lambda: event.remove(session.get_bind(), "before_cursor_execute", before_cursor_execute)
+
+
+def count(statements, prefix: str) -> int:
+    return sum(1 for statement in statements if statement.startswith(prefix))
+
+
+def stored(session: Session):
+    session.expire_all()
+    return {log.date.isoformat(): log.summary for log in session.exec(select(DayLog)).all()}
+
+
+class TestBulkDayLogs:
+    def test_bulk_insert_is_one_statement(self, client, session, test_user):
+        payload = {"user_id": test_user.telegram_id, "day_logs": [day_log(i) for i in range(30)]}
+
+        statements, stop = record_statements(session)
+        try:
+            response = client.post("/day-logs/bulk", json=payload)
+        finally:
+            stop()
+
+        assert response.status_code == 201
+        assert [log["summary"] for log in response.json()] == [f"Day {i}" for i in range(30)]
+        # One read of existing dates, then one multi-row INSERT
+        assert count(statements, "SELECT day_logs.date FROM day_logs") == 1
+        assert count(statements, "INSERT INTO day_logs") == 1
+        # The daily rollups for all 30 days are refreshed with one upsert
+        assert count(statements, "INSERT INTO user_daily_rollups") == 1
+
+    def test_existing_date_rejects_the_batch_by_default(self, client, session, test_user):
+        client.post("/day-logs/bulk", json={"user_id": test_user.telegram_id, "day_logs": [day_log(1)]})
+
+        response = client.post(
+            "/day-logs/bulk",
+            json={"user_id": test_user.telegram_id, "day_logs": [day_log(0), day_log(1, "again")]},
+        )
+
+        assert response.status_code == 400
+        assert stored(session) == {day_log(1)["date"]: "Day 1"}
+
+    def test_upsert_overwrites_existing_dates(self, client, session, test_user):
+        client.post("/day-logs/bulk", json={"user_id": test_user.telegram_id, "day_logs": [day_log(1)]})
+        original_id = session.exec(select(DayLog.log_id)).one()
+
+        response = client.post(
+            "/day-logs/bulk?mode=upsert",
+            json={"user_id": test_user.telegram_id, "day_logs": [day_log(0), day_log(1, "rewritten")]},
+        )
+
+        assert response.status_code == 201
+        assert [log["summary"] for log in response.json()] == ["Day 0", "rewritten"]
+        assert response.json()[1]["log_id"] == original_id
+        assert stored(session) == {day_log(0)["date"]: "Day 0", day_log(1)["date"]: "rewritten"}
+
+    def test_duplicate_dates_in_one_request_are_rejected(self, client, test_user):
+        response = client.post(
+            "/day-logs/bulk?mode=upsert",
+            json={"user_id": test_user.telegram_id, "day_logs": [day_log(1), day_log(1)]},
+        )
+
+        assert response.status_code == 400
+
+
+class TestNdjsonImport:
+    def test_streamed_import_in_chunks(self, client, session, test_user, monkeypatch):
+        monkeypatch.setattr(day_log_service, "DAY_LOG_INSERT_CHUNK_SIZE", 100)
+        monkeypatch.setattr("app.api.v1.routes.day_log.DAY_LOG_INSERT_CHUNK_SIZE", 100)
+        body = ndjson(day_log(i) for i in range(365))
+
+        def chunks():
+            # Arbitrary split points, so lines straddle network chunks
+            for start in range(0, len(body), 1000):
+                yield body[start:start + 1000]
+
+        statements, stop = record_statements(session)
+        try:
+            response = client.post(
+                f"/day-logs/import/{test_user.telegram_id}",
+                content=chunks(),
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+        finally:
+            stop()
+
+        assert response.status_code == 200
+        assert response.json() == {"received": 365, "created": 365, "updated": 0, "skipped": 0}
+        assert count(statements, "INSERT INTO day_logs") == 4
+        assert session.exec(select(func.count()).select_from(DayLog)).one() == 365
+
+    def test_skip_and_upsert_modes(self, client, session, test_user):
+        client.post("/day-logs/bulk", json={"user_id": test_user.telegram_id, "day_logs": [day_log(1)]})
+        body = ndjson([day_log(0), day_log(1, "from import")])
+        url = f"/day-logs/import/{test_user.telegram_id}"
+
+        skipped = client.post(f"{url}?mode=skip", content=body)
+        assert skipped.json() == {"received": 2, "created": 1, "updated": 0, "skipped": 1}
+        assert stored(session)[day_log(1)["date"]] == "Day 1"
+
+        upserted = client.post(f"{url}?mode=upsert", content=body)
+        assert upserted.json() == {"received": 2, "created": 0, "updated": 2, "skipped": 0}
+        assert stored(session)[day_log(1)["date"]] == "from import"
+
+    def test_bad_line_rolls_back_the_import(self, client, session, test_user):
+        body = ndjson([day_log(0)]) + b"\n{not json}\n"
+
+        response = client.post(f"/day-logs/import/{test_user.telegram_id}", content=body)
+
+        assert response.status_code == 422
+        assert "Line 2" in response.json()["detail"]
+        assert stored(session) == {}
+
+    def test_unknown_user_and_mode(self, client, test_user):
+        assert client.post("/day-logs/import/nobody", content=ndjson([day_log(0)])).status_code == 404
+        assert client.post(
+            f"/day-logs/import/{test_user.telegram_id}?mode=replace", content=b""
+        ).status_code == 422
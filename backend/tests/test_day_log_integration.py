@@ -59,7 +59,7 @@ class TestDayLogIntegration:
         logs_data = [
             {
                 "user_id": test_user.telegram_id,
-                "date": date.today().isoformat(),
+                "date": (date.today() - timedelta(days=i)).isoformat(),
                 "start_time": current_time.isoformat(),
                 "end_time": (current_time + timedelta(hours=8)).isoformat(),
                 "summary": f"Day log {i}",
@@ -167,6 +167,20 @@ class TestDayLogIntegration:
         response = client.post("/day-logs/", json=invalid_time_log)
         assert response.status_code == 422
 
+    def test_one_day_log_per_user_per_day(self, client, test_user):
+        """A second log for the same day is rejected."""
+        current_time = datetime.now()
+        log = {
+            "user_id": test_user.telegram_id,
+            "date": date.today().isoformat(),
+            "start_time": current_time.isoformat(),
+            "summary": "First",
+        }
+        assert client.post("/day-logs/", json=log).status_code == 201
+
+        response = client.post("/day-logs/", json={**log, "summary": "Second"})
+        assert response.status_code == 400
+
     def test_user_day_log_relationship(self, client, session: Session, test_user):
         """Test relationship between User and DayLog models."""
         
@@ -175,7 +189,7 @@ class TestDayLogIntegration:
         logs_data = [
             {
                 "user_id": test_user.telegram_id,
-                "date": date.today().isoformat(),
+                "date": (date.today() - timedelta(days=i)).isoformat(),
                 "start_time": current_time.isoformat(),
                 "end_time": (current_time + timedelta(hours=8)).isoformat(),
                 "summary": f"Day log {i}"
@@ -308,6 +322,47 @@ class TestDayLogIntegration:
         
         assert stats["total_logs"] == len(durations)
         assert abs(stats["average_duration"] - sum(durations)/len(durations)) < 0.1
+        assert stats["logs_with_duration"] == len(durations)
+        assert stats["duration_percentiles"] == {"p50": 8, "p90": 12, "p95": 12}
+
+    def test_day_log_statistics_histograms_and_range(self, client, session: Session, test_user):
+        """Location/weather histograms and date-range filtering are computed per range."""
+        current_time = datetime.now()
+        entries = [("Home", "Sunny", 2), ("Home", "Rainy", 4), ("Office", "Sunny", 6), (None, None, None), ("", "", None)]
+        for i, (location, weather, hours) in enumerate(entries):
+            log_data = {
+                "user_id": test_user.telegram_id,
+                "date": (date.today() - timedelta(days=i * 10)).isoformat(),
+                "start_time": current_time.isoformat(),
+                "location": location,
+                "weather": weather,
+            }
+            if hours:
+                log_data["end_time"] = (current_time + timedelta(hours=hours)).isoformat()
+            assert client.post("/day-logs/", json=log_data).status_code == 201
+
+        stats = client.get(f"/day-logs/user/{test_user.telegram_id}/stats").json()
+        assert stats["total_logs"] == 5
+        assert stats["logs_with_duration"] == 3
+        # Missing and blank values are not buckets
+        assert stats["locations_summary"] == {"Home": 2, "Office": 1}
+        assert stats["weather_summary"] == {"Sunny": 2, "Rainy": 1}
+
+        response = client.get(
+            f"/day-logs/user/{test_user.telegram_id}/stats",
+            params={"start_date": (date.today() - timedelta(days=15)).isoformat()},
+        )
+        assert response.status_code == 200
+        ranged = response.json()
+        assert ranged["total_logs"] == 2
+        assert ranged["locations_summary"] == {"Home": 2}
+        assert abs(ranged["average_duration"] - 3) < 0.01
+
+        response = client.get(
+            f"/day-logs/user/{test_user.telegram_id}/stats",
+            params={"start_date": date.today().isoformat(), "end_date": (date.today() - timedelta(days=1)).isoformat()},
+        )
+        assert response.status_code == 422
 
     def test_day_log_concurrent_updates(self, client, session: Session, test_user):
         """Test handling of concurrent updates to day logs."""
@@ -0,0 +1,111 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime, time, timedelta
+
+from app.models.day_log import DayLog
+from app.models.progress_log import ProgressLog
+from app.models.prompt import Prompt
+from app.models.task import Task
+from app.services import export_service
+
+
+def ndjson_rows(content: bytes):
+    return [json.loads(line) for line in content.decode().splitlines()]
+
+
+class TestExportEndpoints:
+    def test_tasks_stream_as_ndjson_in_batches(self, client, session, test_user, monkeypatch):
+        monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 7)
+        session.add_all([Task(user_id=test_user.telegram_id, description=f"Task {i}") for i in range(50)])
+        session.commit()
+
+        response = client.get(f"/tasks/user/{test_user.telegram_id}/export")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert f'filename="tasks-{test_user.telegram_id}.ndjson"' in response.headers["content-disposition"]
+        rows = ndjson_rows(response.content)
+        assert [row["description"] for row in rows] == [f"Task {i}" for i in range(50)]
+        assert rows[0]["priority"] == "Medium" and rows[0]["goal_id"] is None
+
+    def test_day_logs_as_csv(self, client, session, test_user):
+        for days_ago in (2, 0, 1):
+            day = date.today() - timedelta(days=days_ago)
+            start = datetime.combine(day, time(8))
+            session.add(DayLog(
+                user_id=test_user.telegram_id, date=day, start_time=start, end_time=start + timedelta(hours=9),
+                summary=f"Day {days_ago}, busy",
+            ))
+        session.commit()
+
+        response = client.get(f"/day-logs/user/{test_user.telegram_id}/export?format=csv")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["summary"] for row in rows] == ["Day 2, busy", "Day 1, busy", "Day 0, busy"]
+        assert rows[0]["date"] == (date.today() - timedelta(days=2)).isoformat()
+        assert rows[0]["weather"] == ""
+
+    def test_gzipped_progress_logs(self, client, session, test_user):
+        session.add(ProgressLog(user_id=test_user.telegram_id, mood_score=7, energy_level=6, focus_score=8))
+        session.commit()
+
+        response = client.get(f"/progress-logs/user/{test_user.telegram_id}/export?gzip=true")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        assert 'progress-logs-' in response.headers["content-disposition"] and '.ndjson.gz"' in response.headers["content-disposition"]
+        rows = ndjson_rows(gzip.decompress(response.content))
+        assert rows[0]["mood_score"] == 7
+
+    def test_prompts_on_the_async_path(self, client, session):
+        session.add_all([Prompt(user_id="u1", prompt_text=f"q{i}", response_text=f"a{i}") for i in range(3)])
+        session.add(Prompt(user_id="u2", prompt_text="other"))
+        session.commit()
+
+        response = client.get("/prompts/user/u1/export?format=csv&gzip=true")
+
+        assert response.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+        assert [row["prompt_text"] for row in rows] == ["q0", "q1", "q2"]
+
+    def test_unknown_user_and_format(self, client, test_user):
+        assert client.get("/tasks/user/nobody/export").status_code == 404
+        assert client.get(f"/tasks/user/{test_user.telegram_id}/export?format=xml").status_code == 422
+
+    def test_empty_export(self, client, test_user):
+        url = f"/tasks/user/{test_user.telegram_id}/export"
+
+        assert client.get(url).content == b""
+        # CSV still carries its header row
+        assert client.get(f"{url}?format=csv").text.splitlines() == [",".join(Task.__table__.c.keys())]
+
+
+def test_export_reads_in_partitions_without_loading_orm_objects(session, test_user, monkeypatch):
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 10)
+    user_id = test_user.telegram_id
+    session.add_all([Task(user_id=user_id, description=f"Task {i}") for i in range(35)])
+    session.commit()
+    session.expunge_all()
+
+    chunks = list(export_service.stream_export(session, "tasks", user_id))
+
+    # One chunk per fetched batch, and no rows end up in the session's identity map
+    assert [len(chunk.splitlines()) for chunk in chunks] == [10, 10, 10, 5]
+    assert len(session.identity_map) == 0
+
+
+def test_export_streams_from_its_own_session(session, test_user):
+    user_id = test_user.telegram_id
+    session.add_all([Task(user_id=user_id, description=f"Task {i}") for i in range(3)])
+    session.commit()
+
+    chunks = export_service.stream_export(session, "tasks", user_id)
+    # The request's session may be closed before the body is sent
+    session.close()
+
+    assert len(ndjson_rows(b"".join(chunks))) == 3
+    assert not session.in_transaction()
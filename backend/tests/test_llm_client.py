@@ -0,0 +1,202 @@
+import asyncio
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.services.llm_client import LLMClient, get_llm_client, shutdown_llm_client
+
+
+class SlowModel:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def generate_content(self, prompt):
+        time.sleep(self.delay)
+        return Mock(text=f"echo: {prompt}")
+
+
+@pytest.mark.asyncio
+async def test_generate_content_does_not_block_event_loop():
+    client = LLMClient(max_concurrency=2, timeout=5)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    try:
+        response = await client.generate_content("hello", model=SlowModel(0.3))
+    finally:
+        ticker_task.cancel()
+        client.shutdown()
+
+    assert response.text == "echo: hello"
+    # The loop kept running while the model call was in flight
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_generate_content_runs_calls_concurrently_up_to_limit():
+    client = LLMClient(max_concurrency=4, timeout=5)
+    model = SlowModel(0.3)
+    start = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(client.generate_content(i, model=model) for i in range(4)))
+    finally:
+        client.shutdown()
+    elapsed = time.perf_counter() - start
+
+    assert [r.text for r in results] == [f"echo: {i}" for i in range(4)]
+    assert elapsed < 1.0
+
+
+@pytest.mark.asyncio
+async def test_generate_content_respects_concurrency_limit():
+    client = LLMClient(max_concurrency=2, timeout=5)
+    model = SlowModel(0.2)
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(client.generate_content(i, model=model) for i in range(4)))
+    finally:
+        client.shutdown()
+    elapsed = time.perf_counter() - start
+
+    # Four calls through two slots need two rounds
+    assert elapsed >= 0.4
+
+
+@pytest.mark.asyncio
+async def test_generate_content_times_out():
+    client = LLMClient(max_concurrency=1, timeout=0.05)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await client.generate_content("slow", model=SlowModel(0.5))
+    finally:
+        client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_generate_content_honours_explicit_zero_timeout():
+    client = LLMClient(max_concurrency=1, timeout=5)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await client.generate_content("slow", model=SlowModel(0.2), timeout=0)
+    finally:
+        client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_generate_content_uses_shared_model(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-api-key")
+    client = LLMClient(max_concurrency=1, timeout=5)
+    shared_model = Mock()
+    shared_model.generate_content.return_value = Mock(text="shared")
+    try:
+        with patch("app.services.llm_client.genai") as mock_genai:
+            mock_genai.GenerativeModel.return_value = shared_model
+            first = await client.generate_content("one")
+            second = await client.generate_content("two")
+    finally:
+        client.shutdown()
+
+    assert first.text == second.text == "shared"
+    mock_genai.configure.assert_called_once_with(api_key="test-api-key")
+    mock_genai.GenerativeModel.assert_called_once()
+
+
+def test_model_requires_api_key(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    client = LLMClient(max_concurrency=1, timeout=5)
+    try:
+        with pytest.raises(ValueError):
+            client.model
+    finally:
+        client.shutdown()
+
+
+def test_get_llm_client_is_shared():
+    try:
+        assert get_llm_client() is get_llm_client()
+    finally:
+        shutdown_llm_client()
+
+
+class StreamingModel:
+    def __init__(self, chunks, delay: float = 0.0, fail_after=None):
+        self.chunks = chunks
+        self.delay = delay
+        self.fail_after = fail_after
+        self.produced = 0
+
+    def generate_content(self, prompt, stream=False):
+        assert stream is True
+        for i, text in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise RuntimeError("stream broke")
+            time.sleep(self.delay)
+            self.produced += 1
+            yield Mock(text=text)
+
+
+@pytest.mark.asyncio
+async def test_stream_content_yields_chunks_as_they_arrive():
+    client = LLMClient(max_concurrency=1, timeout=5)
+    model = StreamingModel(["Hel", "lo", "", " there"], delay=0.1)
+    received = []
+    start = time.perf_counter()
+    try:
+        async for text in client.stream_content("hi", model=model):
+            received.append((text, time.perf_counter() - start))
+    finally:
+        client.shutdown()
+
+    # Empty chunks are skipped; the first one arrives long before the last
+    assert [text for text, _ in received] == ["Hel", "lo", " there"]
+    assert received[0][1] < 0.25 and received[-1][1] >= 0.35
+
+
+@pytest.mark.asyncio
+async def test_stream_content_raises_model_errors():
+    client = LLMClient(max_concurrency=1, timeout=5)
+    received = []
+    try:
+        with pytest.raises(RuntimeError, match="stream broke"):
+            async for text in client.stream_content("hi", model=StreamingModel(["a", "b"], fail_after=1)):
+                received.append(text)
+    finally:
+        client.shutdown()
+
+    assert received == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_stream_content_times_out_between_chunks():
+    client = LLMClient(max_concurrency=1, timeout=0.05)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            async for _ in client.stream_content("hi", model=StreamingModel(["a", "b"], delay=0.3)):
+                pass
+    finally:
+        client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_stream_content_releases_its_slot_when_closed_early():
+    client = LLMClient(max_concurrency=1, timeout=5)
+    model = StreamingModel(["a", "b", "c", "d"], delay=0.05)
+    try:
+        stream = client.stream_content("hi", model=model)
+        assert await stream.__anext__() == "a"
+        await stream.aclose()
+        # The only slot is free again
+        response = await client.generate_content("next", model=SlowModel(0))
+        await asyncio.sleep(0.15)
+    finally:
+        client.shutdown()
+
+    assert response.text == "echo: next"
+    assert model.produced < 4
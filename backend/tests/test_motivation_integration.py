@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from fastapi import status
 from datetime import date, datetime, timedelta
 
@@ -18,7 +18,9 @@ class TestMotivationService:
         with patch("app.services.ai_service.AIService") as mock_ai_service:
             mock_instance = Mock()
             mock_ai_service.return_value = mock_instance
-            mock_instance.generate_motivation_message.return_value = "You're doing amazing! Keep pushing forward!"
+            mock_instance.generate_motivation_message = AsyncMock(
+                return_value="You're doing amazing! Keep pushing through this challenge!"
+            )
             
             # Create some completed tasks
             completed_task = Task(
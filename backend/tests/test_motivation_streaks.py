@@ -0,0 +1,116 @@
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import delete, event
+
+from app.models.task import Task
+from app.models.user_daily_rollup import UserDailyRollup
+from app.schemas.task import CompletionStatusEnum, TaskCreate
+from app.services.motivation_service import completion_streaks, get_motivation_stats
+from app.services.task_service import create_tasks_bulk
+
+TODAY = date.today()
+
+
+def completed_on(user_id: str, days_ago: int, count: int = 1):
+    day = TODAY - timedelta(days=days_ago)
+    return [
+        TaskCreate(
+            user_id=user_id,
+            description=f"Done {days_ago}/{i}",
+            completion_status=CompletionStatusEnum.COMPLETED,
+            completed_at=datetime.combine(day, time(9, i % 60)),
+            scheduled_for_date=day,
+        )
+        for i in range(count)
+    ]
+
+
+class TestCompletionStreaks:
+    def test_current_and_longest_islands(self, session, test_user):
+        user_id = test_user.telegram_id
+        tasks = []
+        for days_ago in [*range(20, 12, -1), *range(9, 6, -1), *range(3, -1, -1)]:
+            tasks += completed_on(user_id, days_ago, count=2)
+        create_tasks_bulk(session, tasks)
+
+        streaks = completion_streaks(session, user_id)
+
+        assert streaks["current_streak_days"] == 4
+        assert streaks["longest_streak_days"] == 8
+        assert (streaks["longest_streak_start"], streaks["longest_streak_end"]) == (
+            TODAY - timedelta(days=20), TODAY - timedelta(days=13),
+        )
+        assert streaks["active_days"] == 15
+
+    def test_windows(self, session, test_user):
+        user_id = test_user.telegram_id
+        tasks = []
+        for days_ago in [*range(20, 12, -1), *range(9, 6, -1)]:
+            tasks += completed_on(user_id, days_ago)
+        create_tasks_bulk(session, tasks)
+
+        # No completion today: the current streak is broken
+        assert completion_streaks(session, user_id)["current_streak_days"] == 0
+        # A window ending on the last active day sees that run as current
+        assert completion_streaks(session, user_id, end_date=TODAY - timedelta(days=7))["current_streak_days"] == 3
+        # A window cutting the long run short only counts the part inside it
+        assert completion_streaks(session, user_id, start_date=TODAY - timedelta(days=15))["longest_streak_days"] == 3
+
+    def test_long_history_is_not_capped(self, session, test_user):
+        user_id = test_user.telegram_id
+        tasks = [task for days_ago in range(400) for task in completed_on(user_id, days_ago, count=5)]
+        create_tasks_bulk(session, tasks)
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(session.get_bind(), "before_cursor_execute", before_cursor_execute)
+        try:
+            stats = get_motivation_stats(session, user_id)
+        finally:
+            event.remove(session.get_bind(), "before_cursor_execute", before_cursor_execute)
+
+        assert stats["current_streak_days"] == 400
+        assert stats["longest_streak_days"] == 400
+        # One grouped count for the 30-day totals and one read of active days; no task rows loaded
+        assert sum("FROM user_daily_rollups" in statement for statement in statements) == 1
+        assert sum("FROM tasks" in statement for statement in statements) == 1
+
+    def test_users_without_rollups_fall_back_to_tasks(self, session, test_user):
+        user_id = test_user.telegram_id
+        tasks = []
+        for days_ago in [*range(9, 6, -1), *range(2, -1, -1)]:
+            tasks += completed_on(user_id, days_ago, count=2)
+        create_tasks_bulk(session, tasks)
+        expected = completion_streaks(session, user_id)
+        # History written before the rollups migration, not backfilled yet
+        session.exec(delete(UserDailyRollup))
+        session.commit()
+
+        assert completion_streaks(session, user_id) == expected
+        assert expected["current_streak_days"] == 3
+        assert completion_streaks(session, user_id, start_date=TODAY - timedelta(days=8))["active_days"] == 5
+
+
+def test_thirty_day_counts_are_not_capped(session, test_user):
+    now = datetime.now()
+    session.add_all([
+        Task(
+            user_id=test_user.telegram_id,
+            description=f"Task {i}",
+            completion_status=CompletionStatusEnum.COMPLETED if i % 3 == 0 else CompletionStatusEnum.PENDING,
+            created_at=now - timedelta(days=i % 20),
+            updated_at=now,
+        )
+        for i in range(150)
+    ])
+    session.add(Task(user_id=test_user.telegram_id, description="Old", created_at=now - timedelta(days=45), updated_at=now))
+    session.commit()
+
+    stats = get_motivation_stats(session, test_user.telegram_id)
+
+    assert stats["total_tasks_30_days"] == 150
+    assert stats["completed_tasks_30_days"] == 50
+    assert stats["pending_tasks"] == 100
+    assert stats["current_streak_days"] == 1
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import os
+from itertools import count
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import select
+
+import app.api.v1.routes.websocket as ws
+from app.models.prompt import Prompt
+from app.services.notification_broker import (
+    InMemoryBroker,
+    NotificationBroker,
+    PostgresBroker,
+    to_listen_dsn,
+    use_notification_broker,
+)
+
+
+class FakePostgres:
+    """Stand-in for a PostgreSQL server's LISTEN/NOTIFY, shared by every connection."""
+
+    def __init__(self):
+        self.connections = []
+        self._pids = count(1)
+
+    async def connect(self, dsn):
+        conn = FakeConnection(self, next(self._pids))
+        self.connections.append(conn)
+        return conn
+
+    def notify(self, channel, payload):
+        loop = asyncio.get_running_loop()
+        for conn in self.connections:
+            for callback in conn.listeners.get(channel, []):
+                # asyncpg invokes listeners from the event loop, not inline
+                loop.call_soon(callback, conn, conn.pid, channel, payload)
+
+
+class FakeConnection:
+    def __init__(self, server, pid):
+        self.server = server
+        self.pid = pid
+        self.listeners = {}
+        self.termination_listeners = []
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners.setdefault(channel, []).append(callback)
+
+    async def remove_listener(self, channel, callback):
+        self.listeners.get(channel, []).remove(callback)
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    async def execute(self, query, channel, payload):
+        assert query == "SELECT pg_notify($1, $2)"
+        self.server.notify(channel, payload)
+
+    async def close(self):
+        self.closed = True
+        if self in self.server.connections:
+            self.server.connections.remove(self)
+
+    def terminate(self):
+        self.server.connections.remove(self)
+        for callback in self.termination_listeners:
+            callback(self)
+
+
+class Recorder:
+    def __init__(self):
+        self.received = []
+        self.event = asyncio.Event()
+
+    async def __call__(self, notification):
+        self.received.append(notification)
+        self.event.set()
+
+    async def wait(self):
+        await asyncio.wait_for(self.event.wait(), timeout=1)
+        self.event.clear()
+
+
+class DummyWS:
+    def __init__(self):
+        self.messages = []
+
+    async def send_text(self, text):
+        self.messages.append(text)
+
+
+@pytest.fixture(autouse=True)
+def reset_broker():
+    yield
+    use_notification_broker(None)
+    ws.connections.clear()
+
+
+@pytest.mark.asyncio
+class TestPostgresBroker:
+    async def test_publish_reaches_other_workers_only(self):
+        server = FakePostgres()
+        worker_a = PostgresBroker("postgresql://stand-in", connect=server.connect)
+        worker_b = PostgresBroker("postgresql://stand-in", connect=server.connect)
+        received_a, received_b = Recorder(), Recorder()
+        await worker_a.start(received_a)
+        await worker_b.start(received_b)
+
+        await worker_a.publish({"user_id": "u1", "message": "hello"})
+        await received_b.wait()
+        await asyncio.sleep(0)
+
+        assert received_b.received == [{"user_id": "u1", "message": "hello"}]
+        assert received_a.received == []
+        await worker_a.stop()
+        await worker_b.stop()
+        assert server.connections == []
+
+    async def test_listener_reconnects_after_connection_loss(self):
+        server = FakePostgres()
+        publisher = PostgresBroker("postgresql://stand-in", connect=server.connect)
+        worker = PostgresBroker("postgresql://stand-in", connect=server.connect, reconnect_delay=0)
+        received = Recorder()
+        await worker.start(received)
+
+        worker._listen_conn.terminate()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        await publisher.publish({"message": "after reconnect"})
+        await received.wait()
+
+        assert received.received == [{"message": "after reconnect"}]
+        await publisher.stop()
+        await worker.stop()
+
+    async def test_oversized_payload_is_rejected(self):
+        broker = PostgresBroker("postgresql://stand-in", connect=FakePostgres().connect)
+
+        with pytest.raises(ValueError, match="too large"):
+            await broker.publish({"message": "x" * 9000})
+
+    async def test_malformed_and_foreign_payloads_are_ignored(self):
+        server = FakePostgres()
+        worker = PostgresBroker("postgresql://stand-in", connect=server.connect)
+        received = Recorder()
+        await worker.start(received)
+
+        server.notify(worker.channel, "not json")
+        server.notify(worker.channel, json.dumps({"origin": worker.worker_id, "notification": {"message": "own"}}))
+        server.notify(worker.channel, json.dumps({"origin": "other", "notification": {"message": "theirs"}}))
+        await received.wait()
+
+        assert received.received == [{"message": "theirs"}]
+        await worker.stop()
+
+
+def test_incomplete_broker_cannot_be_created():
+    class PublishOnly(NotificationBroker):
+        async def publish(self, notification):
+            pass
+
+    with pytest.raises(TypeError):
+        PublishOnly()
+
+
+def test_listen_dsn_drops_sqlalchemy_driver():
+    assert to_listen_dsn("postgresql+psycopg2://u:p@db:5432/app") == "postgresql://u:p@db:5432/app"
+
+
+@pytest.mark.asyncio
+async def test_notification_reaches_sockets_on_another_worker(session, monkeypatch):
+    monkeypatch.setattr(ws, "engine", session.get_bind())
+    broker = InMemoryBroker()
+    use_notification_broker(broker)
+
+    # This worker holds u1; "another worker" holds u2 and delivers what it receives
+    ws.connections["u1"] = DummyWS()
+    other_worker_socket = DummyWS()
+
+    async def other_worker(notification):
+        if notification["user_id"] in (None, "u2"):
+            await other_worker_socket.send_text(json.dumps({"message": notification["message"]}))
+
+    broker.subscribe("other-worker", other_worker)
+
+    result = await ws.send_notification_service({"user_id": "u2", "message": "Task due"}, session)
+
+    assert result["sent_count"] == 0 and result["published"] is True
+    assert ws.connections["u1"].messages == []
+    assert json.loads(other_worker_socket.messages[0]) == {"message": "Task due"}
+
+
+@pytest.mark.asyncio
+async def test_broker_delivery_uses_its_own_session(session, monkeypatch):
+    monkeypatch.setattr(ws, "engine", session.get_bind())
+    ws.connections["u1"] = DummyWS()
+
+    result = await ws.deliver_notification({"user_id": None, "message": "From another worker"})
+
+    assert result == {"sent": 1, "disconnected": 0}
+    prompts = session.exec(select(Prompt)).all()
+    assert [p.response_text for p in prompts] == ["From another worker"]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_is_stored_in_one_insert(session):
+    for user_id in ("u1", "u2", "u3"):
+        ws.connections[user_id] = DummyWS()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(session.get_bind(), "before_cursor_execute", record)
+    try:
+        result = await ws.deliver_notification({"user_id": None, "message": "Standup in 5"}, session)
+    finally:
+        event.remove(session.get_bind(), "before_cursor_execute", record)
+
+    assert result == {"sent": 3, "disconnected": 0}
+    assert statements.count("INSERT") == 1
+    prompts = session.exec(select(Prompt)).all()
+    assert sorted(p.user_id for p in prompts) == ["u1", "u2", "u3"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_DSN"), reason="set TEST_POSTGRES_DSN to run against PostgreSQL")
+async def test_postgres_round_trip():
+    dsn = os.environ["TEST_POSTGRES_DSN"]
+    worker_a = PostgresBroker(dsn, channel="test_ws_notifications")
+    worker_b = PostgresBroker(dsn, channel="test_ws_notifications")
+    received = Recorder()
+    await worker_a.start(Recorder())
+    await worker_b.start(received)
+    try:
+        await worker_a.publish({"message": "over the wire"})
+        await received.wait()
+        assert received.received == [{"message": "over the wire"}]
+    finally:
+        await worker_a.stop()
+        await worker_b.stop()
@@ -0,0 +1,200 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import status
+from sqlalchemy import event
+from sqlmodel import select
+
+from app.models.day_log import DayLog
+from app.models.progress_log import ProgressLog
+from app.models.prompt import Prompt
+from app.models.task import Task
+from app.services.goal_service import list_goals
+from app.services.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, paginate
+from app.services.prompt_service import PROMPT_PAGE_KEYS
+from app.services.task_service import TASK_PAGE_KEYS, list_tasks
+
+
+def walk(client, url, params):
+    """Follow next cursors until the last page; return every page's items."""
+    pages = []
+    params = dict(params)
+    while True:
+        resp = client.get(url, params=params)
+        assert resp.status_code == status.HTTP_200_OK
+        pages.append(resp.json())
+        cursor = resp.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return pages
+        params["cursor"] = cursor
+
+
+def query_plan(session, run) -> str:
+    """SQLite's plan for the single SELECT that ``run`` issues."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    statement, parameters = captured[-1]
+    rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+class TestCursorCodec:
+    def test_round_trip_restores_column_types(self):
+        created = datetime(2024, 5, 1, 9, 30, 15, 123456)
+        cursor = encode_cursor([created, 42])
+
+        assert decode_cursor(cursor, TASK_PAGE_KEYS) == [created, 42]
+
+    @pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor([1]), encode_cursor(["yesterday", 1])])
+    def test_bad_cursor_raises_value_error(self, cursor):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor(cursor, TASK_PAGE_KEYS)
+
+
+@pytest.mark.integration
+class TestKeysetPagination:
+    def test_tasks_with_tied_timestamps_are_paged_without_gaps(self, client, session, test_user):
+        # Half the rows share one created_at so the id tie-breaker has to do the work
+        stamp = datetime(2024, 1, 1, 12, 0, 0)
+        for i in range(25):
+            session.add(Task(
+                user_id=test_user.telegram_id,
+                description=f"Task {i}",
+                created_at=stamp if i % 2 else stamp + timedelta(minutes=i),
+            ))
+        session.commit()
+
+        pages = walk(client, "/tasks/", {"user_id": test_user.telegram_id, "limit": 10})
+
+        assert [len(page) for page in pages] == [10, 10, 5]
+        ids = [task["task_id"] for page in pages for task in page]
+        assert len(ids) == len(set(ids)) == 25
+
+    def test_cursor_is_stable_across_inserts(self, session, test_user):
+        for i in range(6):
+            session.add(Task(user_id=test_user.telegram_id, description=f"Task {i}"))
+        session.commit()
+
+        first = list_tasks(session, limit=3, user_id=test_user.telegram_id)
+        cursor = encode_cursor([first[-1].created_at, first[-1].task_id])
+        # A row that sorts before the cursor must not shift the next page
+        session.add(Task(user_id=test_user.telegram_id, description="Late", created_at=datetime(2000, 1, 1)))
+        session.commit()
+        second = list_tasks(session, limit=3, user_id=test_user.telegram_id, cursor=cursor)
+
+        assert [t.description for t in second] == ["Task 3", "Task 4", "Task 5"]
+
+    def test_offset_paging_still_works(self, client, session, test_user):
+        for i in range(5):
+            session.add(Task(user_id=test_user.telegram_id, description=f"Task {i}"))
+        session.commit()
+
+        resp = client.get("/tasks/", params={"user_id": test_user.telegram_id, "skip": 3, "limit": 10})
+
+        assert resp.status_code == status.HTTP_200_OK
+        assert [t["description"] for t in resp.json()] == ["Task 3", "Task 4"]
+        assert NEXT_CURSOR_HEADER not in resp.headers
+
+    def test_progress_logs_page_newest_first(self, client, session, test_user):
+        today = date.today()
+        for offset in range(7):
+            session.add(ProgressLog(
+                user_id=test_user.telegram_id,
+                date=today - timedelta(days=offset),
+                mood_score=7,
+                energy_level=7,
+                focus_score=7,
+            ))
+        session.commit()
+
+        pages = walk(client, "/progress-logs/", {"user_id": test_user.telegram_id, "limit": 3})
+
+        dates = [log["date"] for page in pages for log in page]
+        assert dates == [(today - timedelta(days=offset)).isoformat() for offset in range(7)]
+
+    def test_day_logs_page_by_date(self, client, session, test_user):
+        today = date.today()
+        for offset in range(5):
+            day = today - timedelta(days=offset)
+            session.add(DayLog(
+                user_id=test_user.telegram_id,
+                date=day,
+                start_time=datetime.combine(day, datetime.min.time()),
+            ))
+        session.commit()
+
+        pages = walk(client, f"/day-logs/user/{test_user.telegram_id}", {"limit": 2})
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert pages[0][0]["date"] == today.isoformat()
+
+    def test_prompts_page_through_async_route(self, client, session, test_user):
+        stamp = datetime(2024, 1, 1)
+        for i in range(5):
+            session.add(Prompt(
+                user_id=test_user.telegram_id,
+                prompt_text=f"Prompt {i}",
+                response_text=f"Response {i}",
+                created_at=stamp + timedelta(minutes=i),
+            ))
+        session.commit()
+
+        pages = walk(client, f"/prompts/user/{test_user.telegram_id}", {"limit": 2})
+
+        texts = [p["prompt_text"] for page in pages for p in page]
+        assert texts == [f"Prompt {i}" for i in reversed(range(5))]
+
+    def test_users_logs_and_goals_accept_cursors(self, client, test_user, test_goal):
+        for url in ("/users/", "/goals/", "/log/"):
+            resp = client.get(url, params={"limit": 1})
+            assert resp.status_code == status.HTTP_200_OK
+
+        cursor = client.get("/users/", params={"limit": 1}).headers[NEXT_CURSOR_HEADER]
+        assert client.get("/users/", params={"limit": 1, "cursor": cursor}).json() == []
+
+    def test_invalid_cursor_is_rejected(self, client, test_user):
+        for url in ("/tasks/", "/goals/", "/users/", "/log/", "/progress-logs/", f"/prompts/user/{test_user.telegram_id}"):
+            resp = client.get(url, params={"cursor": "garbage"})
+            assert resp.status_code == status.HTTP_400_BAD_REQUEST, url
+
+    def test_page_size_is_capped(self, client):
+        resp = client.get("/goals/", params={"limit": 1000})
+
+        assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TestPageIndexes:
+    """Per-user pages read rows in index order instead of sorting the user's whole set."""
+
+    def test_task_pages_walk_the_user_created_at_index(self, session, test_user):
+        cursor = encode_cursor([datetime(2024, 1, 1), 10])
+
+        plan = query_plan(session, lambda: list_tasks(session, limit=10, user_id=test_user.telegram_id, cursor=cursor))
+
+        assert "ix_tasks_user_id_created_at_task_id" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_goal_pages_walk_the_user_created_at_index(self, session, test_user):
+        plan = query_plan(session, lambda: list_goals(session, limit=10, user_id=test_user.telegram_id))
+
+        assert "ix_goals_user_id_created_at_goal_id" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_prompt_pages_walk_the_user_created_at_index(self, session, test_user):
+        statement = paginate(
+            select(Prompt).where(Prompt.user_id == test_user.telegram_id), PROMPT_PAGE_KEYS, limit=10, descending=True,
+        )
+
+        plan = query_plan(session, lambda: session.exec(statement).all())
+
+        assert "ix_prompts_user_id_created_at_prompt_id" in plan
+        assert "TEMP B-TREE" not in plan
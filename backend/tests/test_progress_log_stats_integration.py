@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi import status
+
+from app.models.progress_log import ProgressLog
+from app.services.progress_log_service import user_progress_stats, user_progress_weekly
+
+
+@pytest.fixture
+def progress_history(session, test_user):
+    """One log per day for the last 60 days: completed = day offset % 5, planned = 5."""
+    today = date.today()
+    for offset in range(60):
+        session.add(ProgressLog(
+            user_id=test_user.telegram_id,
+            date=today - timedelta(days=offset),
+            tasks_completed=offset % 5,
+            tasks_planned=5,
+            mood_score=7,
+            energy_level=6,
+            focus_score=8,
+        ))
+    session.commit()
+    return test_user
+
+
+@pytest.mark.integration
+class TestProgressLogStats:
+    def test_service_matches_python_aggregation(self, session, progress_history):
+        stats = user_progress_stats(session, progress_history.telegram_id, days=7)
+
+        # Window covers today and the 7 previous days
+        completed = [offset % 5 for offset in range(8)]
+        assert stats["total_entries"] == 8
+        assert stats["avg_tasks_completed"] == round(sum(completed) / 8, 2)
+        assert stats["avg_tasks_planned"] == 5
+        assert stats["avg_mood_score"] == 7
+        assert stats["completion_rate"] == round(sum(completed) / 40 * 100, 2)
+
+    def test_empty_window(self, session, test_user):
+        stats = user_progress_stats(session, test_user.telegram_id, days=30)
+
+        assert stats["total_entries"] == 0
+        assert stats["completion_rate"] == 0
+
+    def test_endpoint_keeps_single_window_shape(self, client, progress_history):
+        resp = client.get(f"/progress-logs/user/{progress_history.telegram_id}/stats?days=30")
+
+        assert resp.status_code == status.HTTP_200_OK
+        data = resp.json()
+        assert data["period_days"] == 30
+        assert data["total_entries"] == 31
+        assert "windows" not in data
+        assert "weekly" not in data
+
+    def test_endpoint_returns_multiple_windows(self, client, progress_history):
+        resp = client.get(
+            f"/progress-logs/user/{progress_history.telegram_id}/stats",
+            params={"days": 30, "windows": [7, 90]},
+        )
+
+        assert resp.status_code == status.HTTP_200_OK
+        windows = resp.json()["windows"]
+        assert set(windows) == {"7", "30", "90"}
+        assert windows["7"]["total_entries"] == 8
+        assert windows["30"]["total_entries"] == 31
+        assert windows["90"]["total_entries"] == 60
+
+    def test_weekly_breakdown(self, client, session, progress_history):
+        resp = client.get(
+            f"/progress-logs/user/{progress_history.telegram_id}/stats",
+            params={"days": 30, "weekly": True},
+        )
+
+        assert resp.status_code == status.HTTP_200_OK
+        weekly = resp.json()["weekly"]
+        assert sum(bucket["total_entries"] for bucket in weekly) == 31
+        assert all(date.fromisoformat(b["week_start"]).weekday() == 0 for b in weekly)
+        assert weekly == user_progress_weekly(session, progress_history.telegram_id, 30)
+
+    def test_unknown_user(self, client):
+        resp = client.get("/progress-logs/user/nobody/stats")
+
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
@@ -23,7 +23,7 @@ def test_prompt_includes_todays_tasks_and_prompts_in_context(client, session):
 
     new_prompt_text = "What should I do next given today's progress?"
 
-    with patch("app.services.prompt_service.genai") as mock_genai:
+    with patch("app.services.llm_client.genai") as mock_genai:
         mock_model = Mock()
         mock_genai.GenerativeModel.return_value = mock_model
         mock_model.generate_content = Mock()
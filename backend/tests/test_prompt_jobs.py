@@ -0,0 +1,222 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlmodel import select
+
+import app.api.v1.routes.websocket as ws
+import app.services.prompt_service as prompt_service_module
+from app.models.prompt import Prompt
+from app.services.prompt_jobs import PromptJobQueue, use_prompt_jobs
+
+
+class GatedLLM:
+    """Answers "echo: <prompt>" (streamed word by word); while ``gate`` is closed every call waits on it."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.calls = []
+
+    async def generate_content(self, prompt):
+        text = prompt.rsplit("User Prompt: ", 1)[-1]
+        self.calls.append(text)
+        await self.gate.wait()
+        return SimpleNamespace(text=f"echo: {text}")
+
+    async def stream_content(self, prompt):
+        text = prompt.rsplit("User Prompt: ", 1)[-1]
+        self.calls.append(text)
+        yield "echo:"
+        await self.gate.wait()
+        for word in text.split():
+            yield f" {word}"
+
+
+class Replies:
+    """Collects final replies; delta payloads go to ``deltas``."""
+
+    def __init__(self):
+        self.received = []
+        self.deltas = []
+        self.event = asyncio.Event()
+
+    def for_user(self, user_id):
+        async def reply(payload):
+            if payload.get("type") == "delta":
+                self.deltas.append((user_id, payload))
+                return
+            self.received.append((user_id, payload))
+            self.event.set()
+        return reply
+
+    async def wait_for(self, count):
+        while len(self.received) < count:
+            self.event.clear()
+            await asyncio.wait_for(self.event.wait(), timeout=2)
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = GatedLLM()
+    monkeypatch.setattr(prompt_service_module, "get_llm_client", lambda: fake)
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def reset_prompt_jobs():
+    yield
+    use_prompt_jobs(None)
+    ws.connections.clear()
+
+
+@pytest.mark.asyncio
+class TestPromptJobQueue:
+    async def test_submit_returns_before_the_response_is_ready(self, session, llm):
+        jobs = PromptJobQueue(workers=2)
+        replies = Replies()
+        llm.gate.clear()
+
+        prompt_id = await jobs.submit("u1", "plan my day", replies.for_user("u1"))
+
+        stored = session.exec(select(Prompt)).one()
+        assert stored.prompt_id == prompt_id and stored.response_text is None
+        llm.gate.set()
+        await replies.wait_for(1)
+        assert replies.received == [("u1", {"prompt_id": prompt_id, "message": "echo: plan my day"})]
+        assert [payload["text"] for _, payload in replies.deltas] == ["echo:", " plan", " my", " day"]
+        assert jobs.in_flight() == 0
+        await jobs.stop()
+
+    async def test_in_flight_limits(self, session, llm):
+        jobs = PromptJobQueue(workers=1, max_per_user=2, max_in_flight=3)
+        replies = Replies()
+        llm.gate.clear()
+
+        await jobs.submit("u1", "one", replies.for_user("u1"))
+        await jobs.submit("u1", "two", replies.for_user("u1"))
+        with pytest.raises(ValueError, match="Too many prompts"):
+            await jobs.submit("u1", "three", replies.for_user("u1"))
+        await jobs.submit("u2", "one", replies.for_user("u2"))
+        with pytest.raises(ValueError, match="busy"):
+            await jobs.submit("u3", "one", replies.for_user("u3"))
+
+        # Rejected prompts are never stored
+        assert len(session.exec(select(Prompt)).all()) == 3
+        llm.gate.set()
+        await replies.wait_for(3)
+        await jobs.submit("u3", "one", replies.for_user("u3"))
+        await replies.wait_for(4)
+        await jobs.stop()
+
+    async def test_users_take_turns_on_the_workers(self, session, llm):
+        jobs = PromptJobQueue(workers=1)
+        replies = Replies()
+        llm.gate.clear()
+
+        await jobs.submit("u1", "a1", replies.for_user("u1"))
+        await jobs.submit("u1", "a2", replies.for_user("u1"))
+        await jobs.submit("u2", "b1", replies.for_user("u2"))
+        llm.gate.set()
+        await replies.wait_for(3)
+
+        assert llm.calls == ["a1", "b1", "a2"]
+        await jobs.stop()
+
+    async def test_cancel_queued_and_running_prompts(self, session, llm):
+        jobs = PromptJobQueue(workers=1)
+        replies = Replies()
+        llm.gate.clear()
+
+        running = await jobs.submit("u1", "slow", replies.for_user("u1"))
+        queued = await jobs.submit("u1", "next", replies.for_user("u1"))
+        while not llm.calls:
+            await asyncio.sleep(0)
+
+        assert await jobs.cancel("u2", running) is False
+        assert await jobs.cancel("u1", queued) is True
+        assert await jobs.cancel("u1", running) is True
+        await replies.wait_for(2)
+
+        assert [payload for _, payload in replies.received] == [
+            {"type": "cancelled", "prompt_id": queued},
+            {"type": "cancelled", "prompt_id": running},
+        ]
+        assert jobs.in_flight() == 0
+        # The worker survives the cancellation
+        llm.gate.set()
+        await jobs.submit("u1", "after", replies.for_user("u1"))
+        await replies.wait_for(3)
+        assert replies.received[-1][1]["message"] == "echo: after"
+        await jobs.stop()
+
+    async def test_unstreamed_prompt_sends_only_the_final_reply(self, session, llm):
+        jobs = PromptJobQueue(workers=1)
+        replies = Replies()
+
+        prompt_id = await jobs.submit("u1", "plan my day", replies.for_user("u1"), stream=False)
+        await replies.wait_for(1)
+
+        assert replies.deltas == []
+        assert replies.received == [("u1", {"prompt_id": prompt_id, "message": "echo: plan my day"})]
+        await jobs.stop()
+
+    async def test_streamed_response_is_stored_once(self, session, llm):
+        jobs = PromptJobQueue(workers=1)
+        replies = Replies()
+        llm.gate.clear()
+
+        prompt_id = await jobs.submit("u1", "plan my day", replies.for_user("u1"))
+        while not replies.deltas:
+            await asyncio.sleep(0.001)
+        # The first chunk is out while the prompt row is still unanswered
+        session.expire_all()
+        assert session.get(Prompt, prompt_id).response_text is None
+
+        llm.gate.set()
+        await replies.wait_for(1)
+        session.expire_all()
+        assert session.get(Prompt, prompt_id).response_text == "echo: plan my day"
+        await jobs.stop()
+
+    async def test_processing_error_is_replied(self, session, llm):
+        jobs = PromptJobQueue(workers=1)
+        replies = Replies()
+
+        prompt_id = await jobs.submit("u1", "trigger an error", replies.for_user("u1"))
+        await replies.wait_for(1)
+
+        payload = replies.received[0][1]
+        assert payload["type"] == "error" and payload["prompt_id"] == prompt_id
+        await jobs.stop()
+
+
+def test_endpoint_acks_then_pushes_the_response(client, llm):
+    with client.websocket_connect("/api/v1/ws/u1") as socket:
+        socket.send_text(json.dumps({"message": "hello world"}))
+        ack = json.loads(socket.receive_text())
+        frames = [json.loads(socket.receive_text()) for _ in range(4)]
+
+    assert ack["type"] == "ack"
+    deltas, response = frames[:-1], frames[-1]
+    assert [frame["type"] for frame in deltas] == ["delta"] * 3
+    assert "".join(frame["text"] for frame in deltas) == "echo: hello world"
+    assert response == {"prompt_id": ack["prompt_id"], "message": "echo: hello world"}
+
+
+def test_endpoint_can_opt_out_of_streaming(client, llm):
+    with client.websocket_connect("/api/v1/ws/u1") as socket:
+        socket.send_text(json.dumps({"message": "hello", "stream": False}))
+        ack = json.loads(socket.receive_text())
+        response = json.loads(socket.receive_text())
+
+    assert response == {"prompt_id": ack["prompt_id"], "message": "echo: hello"}
+
+
+def test_endpoint_rejects_unknown_cancel(client, llm):
+    with client.websocket_connect("/api/v1/ws/u1") as socket:
+        socket.send_text(json.dumps({"type": "cancel", "prompt_id": "missing"}))
+        reply = json.loads(socket.receive_text())
+
+    assert reply["type"] == "error"
@@ -8,7 +8,7 @@ from app.models.log import Log
 def test_prompt_creates_valuable_log(client, session):
     payload = {"user_id": "u1", "prompt_text": "Summarize today's key insights and next steps."}
 
-    with patch("app.services.prompt_service.genai") as mock_genai:
+    with patch("app.services.llm_client.genai") as mock_genai:
         mock_model = Mock()
         mock_genai.GenerativeModel.return_value = mock_model
         mock_model.generate_content = Mock()
@@ -32,7 +32,7 @@ def test_prompt_creates_valuable_log(client, session):
 def test_prompt_skips_nonvaluable_log(client, session):
     payload = {"user_id": "u2", "prompt_text": "Say hi"}
 
-    with patch("app.services.prompt_service.genai") as mock_genai:
+    with patch("app.services.llm_client.genai") as mock_genai:
         mock_model = Mock()
         mock_genai.GenerativeModel.return_value = mock_model
         mock_model.generate_content = Mock()
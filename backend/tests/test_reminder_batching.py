@@ -0,0 +1,257 @@
+import asyncio
+import json
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlmodel import select
+
+import app.services.reminder_service as rs
+from app.core.config import settings
+from app.models.reminder_ledger import ReminderLedger
+from app.models.task import Task
+
+DueRow = namedtuple("DueRow", "task_id user_id description priority completion_status scheduled_for_date scheduled_for_time")
+
+NOW = datetime(2025, 3, 10, 9, 0, tzinfo=rs.IST)
+
+
+def due(user_id, task_id, description="Task"):
+    return DueRow(task_id, user_id, f"{description} {task_id}", "Medium", "Pending", NOW.date(), time(9, 15))
+
+
+class FakeLLM:
+    """Answers every reminder prompt with a message per item, optionally failing first."""
+
+    def __init__(self, fail_first_for=(), always_fail_for=(), delay=0.0):
+        self.fail_first_for = set(fail_first_for)
+        self.always_fail_for = set(always_fail_for)
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content(self, prompt, **kwargs):
+        items = json.loads(prompt.rsplit("\n", 1)[-1])
+        ids = {item["task_id"] for item in items}
+        self.calls.append(ids)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if ids & self.always_fail_for:
+            raise RuntimeError("model unavailable")
+        if ids & self.fail_first_for:
+            self.fail_first_for -= ids
+            raise RuntimeError("transient error")
+        return SimpleNamespace(text=json.dumps([{"task_id": i, "message": f"AI reminder {i}"} for i in sorted(ids)]))
+
+
+class TestBuildReminderBatches:
+    def test_batches_are_bounded_by_item_count(self):
+        due_by_user = {f"u{u}": [due(f"u{u}", u * 10 + i) for i in range(3)] for u in range(5)}
+
+        batches = rs.build_reminder_batches(due_by_user, {}, now_ist=NOW, max_items=4, max_chars=100_000)
+
+        assert [len(b["items"]) for b in batches] == [4, 4, 4, 3]
+        assert sorted(i["task_id"] for b in batches for i in b["items"]) == sorted(
+            row.task_id for rows in due_by_user.values() for row in rows
+        )
+
+    def test_batches_only_carry_their_own_users_context(self):
+        due_by_user = {"u1": [due("u1", 1)], "u2": [due("u2", 2)]}
+        context = {"u1": [{"description": "u1 context"}], "u2": [{"description": "u2 context"}]}
+
+        batches = rs.build_reminder_batches(due_by_user, context, now_ist=NOW, max_items=1, max_chars=100_000)
+
+        assert [b["context"] for b in batches] == [{"u1": context["u1"]}, {"u2": context["u2"]}]
+
+    def test_prompts_stay_under_the_size_budget(self):
+        due_by_user = {f"u{u}": [due(f"u{u}", u * 100 + i, "x" * 200) for i in range(10)] for u in range(10)}
+        context = {u: [{"description": "y" * 200}] * 5 for u in due_by_user}
+
+        batches = rs.build_reminder_batches(due_by_user, context, now_ist=NOW, max_items=1000, max_chars=4000)
+
+        assert len(batches) > 1
+        for batch in batches:
+            assert len(rs._build_reminder_prompt(batch["context"], batch["items"])) <= 4000
+
+    def test_large_user_is_split_and_keeps_context_in_each_part(self):
+        due_by_user = {"u1": [due("u1", i) for i in range(5)]}
+        context = {"u1": [{"description": "u1 context"}]}
+
+        batches = rs.build_reminder_batches(due_by_user, context, now_ist=NOW, max_items=2, max_chars=100_000)
+
+        assert [len(b["items"]) for b in batches] == [2, 2, 1]
+        assert all(b["context"] == context for b in batches)
+
+
+@pytest.fixture
+def reminder_env(session, monkeypatch):
+    """Point the job at the test database and capture sent notifications."""
+    sent = []
+
+    async def fake_send(notification, session):
+        sent.append(notification)
+        return {"sent_count": 1}
+
+    monkeypatch.setattr(rs, "engine", session.get_bind())
+    monkeypatch.setattr(rs, "send_notification_service", fake_send)
+    monkeypatch.setattr(rs, "_now_ist", lambda: NOW)
+    monkeypatch.setattr(settings, "REMINDER_RETRY_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(settings, "REMINDER_BATCH_MAX_ITEMS", 2)
+
+    def seed(count):
+        for i in range(count):
+            session.add(Task(
+                user_id=f"u{i}",
+                description=f"Task {i}",
+                scheduled_for_date=NOW.date(),
+                scheduled_for_time=(NOW + timedelta(minutes=10)).time(),
+            ))
+        session.commit()
+
+    return SimpleNamespace(sent=sent, seed=seed)
+
+
+def use_llm(monkeypatch, llm):
+    monkeypatch.setattr(rs, "get_llm_client", lambda: llm)
+
+
+@pytest.mark.asyncio
+async def test_batches_run_concurrently_up_to_the_limit(reminder_env, monkeypatch):
+    monkeypatch.setattr(settings, "REMINDER_CONCURRENCY", 2)
+    llm = FakeLLM(delay=0.01)
+    use_llm(monkeypatch, llm)
+    reminder_env.seed(10)
+
+    results = await rs.task_reminder_job()
+
+    assert len(results) == 5
+    assert llm.max_in_flight == 2
+    assert all(r["latency_ms"] >= 0 and r["attempts"] == 1 and r["error"] is None for r in results)
+    assert len(reminder_env.sent) == 10
+    assert all(n["message"].startswith("AI reminder") for n in reminder_env.sent)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_on_its_own(reminder_env, monkeypatch):
+    reminder_env.seed(4)
+    # The batch holding the first task fails once
+    llm = FakeLLM(fail_first_for={1})
+    use_llm(monkeypatch, llm)
+
+    results = await rs.task_reminder_job()
+
+    assert sorted(r["attempts"] for r in results) == [1, 2]
+    assert len(llm.calls) == 3
+    assert all(r["error"] is None for r in results)
+    assert all(n["message"].startswith("AI reminder") for n in reminder_env.sent)
+
+
+@pytest.mark.asyncio
+async def test_exhausted_batch_falls_back_without_affecting_others(reminder_env, monkeypatch):
+    monkeypatch.setattr(settings, "REMINDER_MAX_ATTEMPTS", 2)
+    reminder_env.seed(4)
+    llm = FakeLLM(always_fail_for={1})
+    use_llm(monkeypatch, llm)
+
+    results = await rs.task_reminder_job()
+
+    failed = [r for r in results if r["error"]]
+    assert len(failed) == 1 and failed[0]["attempts"] == 2
+    by_user = {n["user_id"]: n["message"] for n in reminder_env.sent}
+    assert by_user["u0"].startswith("Your task 'Task 0' is due")
+    assert by_user["u2"] == "AI reminder 3"
+
+
+@pytest.mark.asyncio
+async def test_each_reminder_is_sent_once_across_ticks(reminder_env, monkeypatch, session):
+    llm = FakeLLM()
+    use_llm(monkeypatch, llm)
+    reminder_env.seed(3)
+
+    first = await rs.task_reminder_job()
+    second = await rs.task_reminder_job()
+
+    assert len(first) == 2 and second == []
+    assert len(reminder_env.sent) == 3
+    assert sum(len(ids) for ids in llm.calls) == 3
+    assert len(session.exec(select(ReminderLedger)).all()) == 3
+
+
+def test_claim_only_returns_unclaimed_tasks(session, test_task):
+    row = due(test_task.user_id, test_task.task_id)
+    assert rs.claim_reminders(session, [row]) == {test_task.task_id}
+    assert rs.claim_reminders(session, [row]) == set()
+    # Another kind of reminder, or another slot, for the same task is tracked separately
+    assert rs.claim_reminders(session, [row], "overdue") == {test_task.task_id}
+    assert rs.claim_reminders(session, [row._replace(scheduled_for_time=time(10))]) == {test_task.task_id}
+    # A released claim can be taken again
+    rs.release_reminders(session, [row])
+    assert rs.claim_reminders(session, [row]) == {test_task.task_id}
+
+
+def test_ledgered_tasks_are_excluded_from_due_query(reminder_env, session):
+    reminder_env.seed(2)
+    first = session.exec(select(Task).where(Task.user_id == "u0")).one()
+    session.add(ReminderLedger(
+        task_id=first.task_id, reminder_kind=rs.REMINDER_KIND_DUE_SOON,
+        scheduled_for_date=first.scheduled_for_date, scheduled_for_time=first.scheduled_for_time,
+    ))
+    session.commit()
+
+    due = rs.due_tasks_by_user(session, now_ist=NOW)
+
+    assert list(due) == ["u1"]
+    assert list(rs.due_tasks_by_user(session, now_ist=NOW, reminder_kind="overdue")) == ["u0", "u1"]
+
+
+@pytest.mark.asyncio
+async def test_undelivered_reminders_are_retried(reminder_env, monkeypatch, session):
+    import app.api.v1.routes.websocket as ws
+
+    class DummyWS:
+        def __init__(self):
+            self.messages = []
+
+        async def send_text(self, text: str):
+            self.messages.append(text)
+
+    use_llm(monkeypatch, FakeLLM())
+    monkeypatch.setattr(rs, "send_notification_service", ws.send_notification_service)
+    monkeypatch.setattr(ws, "connections", {})
+    reminder_env.seed(1)
+
+    # u0 is offline and the in-memory broker cannot reach other workers: nothing is recorded
+    await rs.task_reminder_job()
+    assert session.exec(select(ReminderLedger)).all() == []
+
+    ws.connections["u0"] = DummyWS()
+    await rs.task_reminder_job()
+    await rs.task_reminder_job()
+
+    assert [json.loads(m)["message"] for m in ws.connections["u0"].messages] == ["AI reminder 1"]
+    assert len(session.exec(select(ReminderLedger)).all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_rescheduled_task_is_reminded_for_its_new_slot(reminder_env, monkeypatch, session):
+    use_llm(monkeypatch, FakeLLM())
+    reminder_env.seed(1)
+    await rs.task_reminder_job()
+
+    task = session.exec(select(Task)).one()
+    task.scheduled_for_time = (NOW + timedelta(minutes=25)).time()
+    session.add(task)
+    session.commit()
+    await rs.task_reminder_job()
+    await rs.task_reminder_job()
+
+    assert len(reminder_env.sent) == 2
+    assert sorted(row.scheduled_for_time for row in session.exec(select(ReminderLedger)).all()) == [
+        time(9, 10), time(9, 25),
+    ]
@@ -3,7 +3,7 @@ import json
 from datetime import datetime, timedelta
 
 import pytest
-from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel import SQLModel, Session, create_engine, select
 from sqlmodel.pool import StaticPool
 
 
@@ -86,3 +86,74 @@ async def test_reminder_job_batched_notifications(monkeypatch):
     assert ws.connections["u2"].messages and json.loads(ws.connections["u2"].messages[0])["message"]
 
 
+
+
+def test_due_tasks_are_selected_by_window_and_grouped_by_user(session):
+    import app.services.reminder_service as rs
+    from app.models.task import Task, CompletionStatusEnum
+
+    now_ist = datetime(2025, 3, 10, 9, 0, tzinfo=rs.IST)
+    day = now_ist.date()
+
+    def add(user_id, hour, minute, status=CompletionStatusEnum.PENDING, scheduled_for_date=day, **extra):
+        session.add(Task(
+            user_id=user_id,
+            description=f"{user_id} {hour:02d}:{minute:02d}",
+            completion_status=status,
+            scheduled_for_date=scheduled_for_date,
+            scheduled_for_time=datetime(2000, 1, 1, hour, minute).time(),
+            **extra,
+        ))
+
+    add("u1", 9, 10, actual_duration=45)
+    add("u1", 9, 29)
+    add("u2", 9, 0)
+    add("u2", 9, 30)                                          # end of window is exclusive
+    add("u3", 9, 15, status=CompletionStatusEnum.COMPLETED)
+    add("u3", 9, 15, scheduled_for_date=day + timedelta(days=1))
+    session.commit()
+
+    grouped = rs.due_tasks_by_user(session, now_ist=now_ist)
+
+    assert {user: [row.description for row in rows] for user, rows in grouped.items()} == {
+        "u1": ["u1 09:10", "u1 09:29"],
+        "u2": ["u2 09:00"],
+    }
+    # Reading due tasks leaves stored schedules untouched
+    session.expire_all()
+    times = session.exec(select(Task.scheduled_for_time).where(Task.user_id == "u1")).all()
+    assert [t.strftime("%H:%M") for t in times] == ["09:10", "09:29"]
+
+
+def test_due_window_spans_midnight(session):
+    import app.services.reminder_service as rs
+    from app.models.task import Task
+
+    now_ist = datetime(2025, 3, 10, 23, 50, tzinfo=rs.IST)
+    for day, hour, minute in [(10, 23, 55), (11, 0, 10), (11, 0, 25), (10, 0, 10)]:
+        session.add(Task(
+            user_id="u1",
+            description=f"{day} {hour:02d}:{minute:02d}",
+            scheduled_for_date=now_ist.date().replace(day=day),
+            scheduled_for_time=datetime(2000, 1, 1, hour, minute).time(),
+        ))
+    session.commit()
+
+    grouped = rs.due_tasks_by_user(session, now_ist=now_ist)
+
+    assert [row.description for row in grouped["u1"]] == ["10 23:55", "11 00:10"]
+
+
+def test_context_only_covers_users_with_due_tasks(session):
+    import app.services.reminder_service as rs
+    from app.models.task import Task
+
+    day = datetime(2025, 3, 10).date()
+    for user_id in ("u1", "u2"):
+        session.add(Task(user_id=user_id, description=f"{user_id} task", scheduled_for_date=day))
+    session.commit()
+
+    context = rs._user_day_context(session, ["u1"], [day])
+
+    assert list(context) == ["u1"]
+    assert context["u1"][0]["description"] == "u1 task"
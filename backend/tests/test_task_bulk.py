@@ -0,0 +1,102 @@
+from sqlalchemy import event
+from sqlmodel import Session, func, select
+
+from app.models.goal import Goal
+from app.models.task import Task
+from app.models.user import User
+from app.services import task_service
+
+
+def record_statements(session: Session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(session.get_bind(), "before_cursor_execute", before_cursor_execute)
+    return statements, lambda: event.remove(session.get_bind(), "before_cursor_execute", before_cursor_execute)
+
+
+def count(statements, prefix: str) -> int:
+    return sum(1 for statement in statements if statement.startswith(prefix))
+
+
+def task_count(session: Session) -> int:
+    return session.exec(select(func.count()).select_from(Task)).one()
+
+
+class TestBulkTaskCreate:
+    def test_large_batch_uses_set_queries_and_chunked_inserts(self, client, session, test_user, test_goal):
+        other = User(telegram_id="other-user", name="Other")
+        session.add(other)
+        session.commit()
+        payload = {"tasks": [
+            {
+                "user_id": test_user.telegram_id if i % 2 else "other-user",
+                "goal_id": test_goal.goal_id if i % 2 else None,
+                "description": f"Bulk task {i}",
+                "priority": "High",
+            }
+            for i in range(1200)
+        ]}
+
+        statements, stop = record_statements(session)
+        try:
+            response = client.post("/tasks/bulk", json=payload)
+        finally:
+            stop()
+
+        assert response.status_code == 201
+        created = response.json()
+        assert [task["description"] for task in created] == [f"Bulk task {i}" for i in range(1200)]
+        assert created[1]["goal_id"] == test_goal.goal_id and created[0]["goal_id"] is None
+        assert all(task["task_id"] for task in created)
+        # One lookup each for users and goals, 500 rows per INSERT, no per-task refresh
+        assert count(statements, "SELECT users.telegram_id FROM users") == 1
+        assert count(statements, "SELECT goals.goal_id, goals.user_id FROM goals") == 1
+        assert count(statements, "INSERT INTO tasks") == 3
+        # Daily rollups are refreshed per user, not per task
+        assert count(statements, "INSERT INTO user_daily_rollups") == 2
+        assert task_count(session) == 1200
+
+    def test_unknown_user_rejects_the_whole_batch(self, client, session, test_user):
+        payload = {"tasks": [
+            {"user_id": test_user.telegram_id, "description": "Fine"},
+            {"user_id": "missing-user", "description": "Orphan"},
+        ]}
+
+        response = client.post("/tasks/bulk", json=payload)
+
+        assert response.status_code == 404
+        assert task_count(session) == 0
+
+    def test_goal_of_another_user_is_rejected(self, client, session, test_user, test_goal):
+        session.add(User(telegram_id="other-user", name="Other"))
+        session.commit()
+        payload = {"tasks": [{"user_id": "other-user", "goal_id": test_goal.goal_id, "description": "Borrowed goal"}]}
+
+        response = client.post("/tasks/bulk", json=payload)
+
+        assert response.status_code == 400
+        assert task_count(session) == 0
+
+    def test_batch_size_is_capped(self, client, test_user):
+        payload = {"tasks": [
+            {"user_id": test_user.telegram_id, "description": f"Task {i}"}
+            for i in range(task_service.MAX_BULK_TASKS + 1)
+        ]}
+
+        response = client.post("/tasks/bulk", json=payload)
+
+        assert response.status_code == 422
+
+
+def test_bulk_create_drops_cached_ai_responses(session, test_user):
+    from app.schemas.task import TaskCreate
+    from app.services.ai_cache import ai_response_cache
+
+    ai_response_cache.set("weekly", "cached", user_ids=[test_user.telegram_id])
+
+    task_service.create_tasks_bulk(session, [TaskCreate(user_id=test_user.telegram_id, description="New")])
+
+    assert ai_response_cache.get("weekly") is None
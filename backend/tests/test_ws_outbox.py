@@ -0,0 +1,131 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import app.api.v1.routes.websocket as ws
+from app.services.ws_outbox import DISCONNECT, DROP_OLDEST, SLOW_CONSUMER_CLOSE_CODE, Outbox
+
+
+class FakeSocket:
+    """Records frames; ``gate`` (when set) holds every send until it is opened."""
+
+    def __init__(self, delay=0.0, gate=None):
+        self.delay = delay
+        self.gate = gate
+        self.messages = []
+        self.closed_with = None
+
+    async def send_text(self, text):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.messages.append(text)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def settle(outbox):
+    """Wait until the writer has drained the queue."""
+    for _ in range(100):
+        if outbox.queue.empty():
+            await asyncio.sleep(0)
+            return
+        await asyncio.sleep(0.001)
+
+
+@pytest.fixture(autouse=True)
+def clear_connections():
+    ws.connections.clear()
+    yield
+    ws.connections.clear()
+
+
+@pytest.mark.asyncio
+class TestOutbox:
+    async def test_broadcast_does_not_wait_for_slow_clients(self):
+        slow = Outbox(FakeSocket(delay=1), "slow")
+        fast = Outbox(FakeSocket(), "fast")
+
+        started = time.perf_counter()
+        delivered, failed = await ws.broadcast_text({"slow": slow, "fast": fast}, "hello")
+        elapsed = time.perf_counter() - started
+        await settle(fast)
+
+        assert elapsed < 0.1
+        assert sorted(delivered) == ["fast", "slow"] and failed == []
+        assert fast.websocket.messages == ["hello"]
+        await slow.close()
+        await fast.close()
+
+    async def test_drop_oldest_keeps_the_newest_frames(self):
+        gate = asyncio.Event()
+        outbox = Outbox(FakeSocket(gate=gate), "u1", maxsize=2, policy=DROP_OLDEST)
+
+        for i in range(5):
+            await outbox.send_text(str(i))
+            await asyncio.sleep(0)
+        gate.set()
+        await settle(outbox)
+
+        # Frame 0 was already in flight; 1 and 2 were pushed out by 3 and 4
+        assert outbox.websocket.messages == ["0", "3", "4"]
+        assert outbox.dropped == 2
+        await outbox.close()
+
+    async def test_disconnect_policy_closes_slow_consumer(self):
+        outbox = Outbox(FakeSocket(gate=asyncio.Event()), "u1", maxsize=1, policy=DISCONNECT)
+        ws.connections["u1"] = outbox
+        await outbox.send_text("first")
+        await asyncio.sleep(0)
+        await outbox.send_text("second")
+
+        result = await ws.deliver_notification({"user_id": "u1", "message": "third"})
+
+        assert result == {"sent": 0, "disconnected": 1}
+        assert outbox.websocket.closed_with == SLOW_CONSUMER_CLOSE_CODE
+        assert "u1" not in ws.connections
+
+    async def test_send_timeout_closes_the_outbox(self):
+        outbox = Outbox(FakeSocket(gate=asyncio.Event()), "u1", send_timeout=0.01)
+
+        await outbox.send_text("stuck")
+        await asyncio.sleep(0.05)
+
+        assert outbox.closed
+        with pytest.raises(ConnectionError):
+            await outbox.send_text("next")
+
+    async def test_unknown_policy_is_rejected(self):
+        with pytest.raises(ValueError):
+            Outbox(FakeSocket(), "u1", policy="ignore")
+
+
+@pytest.mark.asyncio
+async def test_chat_broadcast_skips_failed_clients():
+    class Broken(FakeSocket):
+        async def send_text(self, text):
+            raise RuntimeError("socket gone")
+
+    ws.connections["ok"] = Outbox(FakeSocket(), "ok")
+    ws.connections["broken"] = Broken()
+
+    await ws.handle_chat_message(None, "ok", {"message": "hi"})
+    await settle(ws.connections["ok"])
+
+    assert json.loads(ws.connections["ok"].websocket.messages[0])["message"] == "hi"
+    assert "broken" not in ws.connections
+    await ws.connections["ok"].close()
+
+
+def test_endpoint_replies_through_its_outbox(client):
+    with client.websocket_connect("/api/v1/ws/u1") as socket:
+        socket.send_text("not json")
+        reply = json.loads(socket.receive_text())
+        status = client.get("/api/v1/ws/status").json()
+
+    assert reply["type"] == "error"
+    assert set(status["send_queues"]["u1"]) == {"queued", "sent", "dropped"}